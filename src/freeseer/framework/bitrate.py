@@ -0,0 +1,118 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import logging
+
+import gobject
+
+log = logging.getLogger(__name__)
+
+
+class BitrateController(object):
+    """Adapts the video bitrate of a stream output to what its network connection keeps up with.
+
+    The queues at the entrance of a stream output fill up when its sink cannot send as fast as the encoder
+    produces. Every interval seconds get_fill() returns how full the fullest of them is, from 0 to 1. Above
+    HIGH_FILL the bitrate is lowered by DECREASE, and after STABLE_CHECKS checks in a row below LOW_FILL it is
+    raised by INCREASE, always within minimum and maximum kbit/s. set_bitrate(kbps) applies a new bitrate.
+
+    When the queues stay full for AUDIO_ONLY_CHECKS checks at the minimum bitrate, set_video(False) restarts
+    the output without video. Video comes back at the minimum bitrate with set_video(True) once the queues stayed
+    below LOW_FILL for RECOVERY_CHECKS checks. set_video may be None for outputs that cannot stream audio only.
+    """
+
+    HIGH_FILL = 0.5
+    LOW_FILL = 0.1
+    DECREASE = 0.75
+    INCREASE = 1.1
+    STABLE_CHECKS = 5
+    AUDIO_ONLY_CHECKS = 3
+    RECOVERY_CHECKS = 15
+
+    def __init__(self, get_fill, set_bitrate, set_video, minimum, maximum, interval=2):
+        self.get_fill = get_fill
+        self.set_bitrate = set_bitrate
+        self.set_video = set_video
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = interval
+
+        self.bitrate = maximum
+        self.video = True
+        self._full_checks = 0  # Checks in a row above HIGH_FILL at the minimum bitrate
+        self._empty_checks = 0  # Checks in a row below LOW_FILL
+        self._timer = None
+
+    def start(self):
+        """Starts checking the queues every interval seconds."""
+        if self._timer is None:
+            self._timer = gobject.timeout_add_seconds(self.interval, self._on_timeout)
+
+    def stop(self):
+        if self._timer is not None:
+            gobject.source_remove(self._timer)
+            self._timer = None
+
+    def _on_timeout(self):
+        self.check(self.get_fill())
+        return True
+
+    def check(self, fill):
+        """Adapts the bitrate to a fill level of the queues of the output."""
+        if fill > self.HIGH_FILL:
+            self._empty_checks = 0
+            if not self.video:
+                return
+            if self.bitrate > self.minimum:
+                self._change_bitrate(max(int(self.bitrate * self.DECREASE), self.minimum))
+                return
+
+            self._full_checks += 1
+            if self._full_checks >= self.AUDIO_ONLY_CHECKS and self.set_video is not None:
+                log.warning("Stream falls behind at %d kbit/s, streaming audio only.", self.minimum)
+                self._full_checks = 0
+                self.video = False
+                self.set_video(False)
+        elif fill < self.LOW_FILL:
+            self._full_checks = 0
+            self._empty_checks += 1
+            if not self.video:
+                if self._empty_checks >= self.RECOVERY_CHECKS:
+                    log.info("Stream caught up, streaming video again.")
+                    self._empty_checks = 0
+                    self.video = True
+                    self.bitrate = self.minimum
+                    self.set_video(True)
+                    self.set_bitrate(self.bitrate)
+            elif self._empty_checks >= self.STABLE_CHECKS and self.bitrate < self.maximum:
+                self._empty_checks = 0
+                self._change_bitrate(min(int(self.bitrate * self.INCREASE) + 1, self.maximum))
+        else:
+            self._full_checks = 0
+            self._empty_checks = 0
+
+    def _change_bitrate(self, bitrate):
+        log.info("Stream video bitrate changed from %d to %d kbit/s.", self.bitrate, bitrate)
+        self.bitrate = bitrate
+        self.set_bitrate(bitrate)
@@ -0,0 +1,185 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import logging
+import os
+import tempfile
+import threading
+
+import gobject
+import pygst
+pygst.require("0.10")
+import gst
+
+log = logging.getLogger(__name__)
+
+
+class BufferPolicy(object):
+    """Limits and leaky mode of the queues of an output bin.
+
+    A queue holds at most max_time seconds and max_bytes bytes of data, 0 meaning unlimited. Once full, a queue that
+    is not leaky blocks the tee feeding it, and with it every other output, until it has room again. A leaky queue
+    drops its newest ('upstream') or oldest ('downstream') data instead, so the other outputs never wait for it.
+    """
+
+    def __init__(self, max_time, max_bytes=0, leaky='no'):
+        self.max_time = max_time
+        self.max_bytes = max_bytes
+        self.leaky = leaky
+
+    def apply(self, bin):
+        """Sets the policy on every queue of an output bin."""
+        for element in bin.recurse():
+            factory = element.get_factory()
+            if factory is not None and factory.get_name() == 'queue':
+                self.apply_queue(element)
+
+    def apply_queue(self, queue):
+        """Sets the policy on a single queue."""
+        queue.set_property('max-size-buffers', 0)
+        queue.set_property('max-size-bytes', self.max_bytes)
+        queue.set_property('max-size-time', self.max_time * gst.SECOND)
+        queue.set_property('leaky', self.leaky)
+
+
+class StreamGuard(gst.Element):
+    """Passes a stream to its network sink, holding it instead of failing when the sink loses its connection.
+
+    A sink that cannot send returns an error which, left alone, would travel upstream through the tees and stop
+    every other output. The guard swallows it, stops pushing and calls on_disconnect(guard) from the main loop. The
+    stream then waits in the buffer before the guard until resume() is called once a new sink is linked.
+    """
+
+    __gstdetails__ = ('Stream guard', 'Generic', 'Holds a stream while its network sink reconnects', 'Freeseer')
+
+    _sinktemplate = gst.PadTemplate('sink', gst.PAD_SINK, gst.PAD_ALWAYS, gst.caps_new_any())
+    _srctemplate = gst.PadTemplate('src', gst.PAD_SRC, gst.PAD_ALWAYS, gst.caps_new_any())
+    __gsttemplates__ = (_sinktemplate, _srctemplate)
+
+    LIVE_MARGIN = gst.SECOND  # How far behind the clock a buffer may be to be considered live
+
+    def __init__(self, on_disconnect):
+        gst.Element.__init__(self)
+        self.on_disconnect = on_disconnect
+
+        self.sinkpad = gst.Pad(self._sinktemplate, 'sink')
+        self.sinkpad.set_chain_function(self.chain)
+        self.add_pad(self.sinkpad)
+        self.srcpad = gst.Pad(self._srctemplate, 'src')
+        self.add_pad(self.srcpad)
+
+        self.connected = True
+        self._condition = threading.Condition()
+        self._flushing = False
+        self._skipping = False
+
+    def resume(self, catch_up=True):
+        """Starts pushing to the sink linked in place of the failed one.
+
+        With catch_up the data buffered during the outage is sent first, otherwise it is dropped up to the first
+        keyframe that is live again.
+        """
+        with self._condition:
+            self.connected = True
+            self._skipping = not catch_up
+            self._condition.notify_all()
+
+    def chain(self, pad, buffer):
+        # Called from the streaming thread of the buffer before the guard
+        with self._condition:
+            while not self.connected and not self._flushing:
+                self._condition.wait()
+            if self._flushing:
+                return gst.FLOW_WRONG_STATE
+
+        if self._skipping:
+            if not self._is_live(buffer):
+                return gst.FLOW_OK
+            self._skipping = False
+
+        result = self.srcpad.push(buffer)
+        if result == gst.FLOW_OK or result == gst.FLOW_UNEXPECTED or self._flushing:
+            return result
+
+        with self._condition:
+            self.connected = False
+        gobject.idle_add(self.on_disconnect, self)
+        return gst.FLOW_OK
+
+    def _is_live(self, buffer):
+        if buffer.flag_is_set(gst.BUFFER_FLAG_DELTA_UNIT) or buffer.timestamp == gst.CLOCK_TIME_NONE:
+            return False
+        clock = self.get_clock()
+        if clock is None:
+            return True
+        return buffer.timestamp >= clock.get_time() - self.get_base_time() - self.LIVE_MARGIN
+
+    def do_change_state(self, transition):
+        # A chain call waiting for a new sink must return before the pads can be deactivated
+        if transition == gst.STATE_CHANGE_PAUSED_TO_READY:
+            with self._condition:
+                self._flushing = True
+                self._condition.notify_all()
+        elif transition == gst.STATE_CHANGE_READY_TO_PAUSED:
+            with self._condition:
+                self._flushing = False
+        return gst.Element.do_change_state(self, transition)
+
+
+gobject.type_register(StreamGuard)
+
+
+def insert_stream_buffer(bin, size, on_disconnect):
+    """Inserts a buffer of size bytes and a StreamGuard before every sink of a stream output bin.
+
+    The buffer is a ring buffer in a temporary file where queue2 supports it, so an outage of several minutes does
+    not fill up memory. Once it is full the queues at the entrance of the bin drop data as their BufferPolicy says.
+    Returns the guards.
+    """
+    guards = []
+    sinks = [element for element in bin.recurse()
+             if not isinstance(element, gst.Bin) and element.flags() & gst.ELEMENT_IS_SINK]
+    for sink in sinks:
+        sinkpad = sink.get_pad('sink')
+        peer = sinkpad.get_peer()
+        if peer is None:
+            continue
+
+        buffer = gst.element_factory_make('queue2')
+        buffer.set_property('max-size-buffers', 0)
+        buffer.set_property('max-size-time', 0)
+        buffer.set_property('max-size-bytes', size)
+        try:
+            buffer.set_property('ring-buffer-max-size', size)
+            buffer.set_property('temp-template', os.path.join(tempfile.gettempdir(), 'freeseer-stream-XXXXXX'))
+        except TypeError:
+            log.debug("queue2 has no ring buffer, the stream is buffered in memory.")
+
+        guard = StreamGuard(on_disconnect)
+        bin.add(buffer, guard)
+        peer.unlink(sinkpad)
+        peer.link(buffer.get_pad('sink'))
+        gst.element_link_many(buffer, guard, sink)
+        guards.append(guard)
+    return guards
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import bisect
+
+from PyQt4.QtCore import QAbstractListModel
+from PyQt4.QtCore import QModelIndex
+from PyQt4.QtCore import Qt
+from PyQt4.QtCore import QVariant
+
+
+class CompletionModel(QAbstractListModel):
+    """List model of the distinct non-empty values of a presentations column, for QCompleters.
+
+    Every value is reference counted by the number of talks using it, so adding or removing a talk only inserts or
+    removes the rows of values that appear or disappear. Rows are kept sorted case insensitively, which lets a
+    QCompleter using QCompleter.CaseInsensitivelySortedModel binary search them.
+    """
+
+    def __init__(self, parent=None):
+        super(CompletionModel, self).__init__(parent)
+        self._keys = []  # Sorted (value.lower(), value) tuples
+        self._counts = {}  # value -> number of talks using it
+
+    def reset(self, counts):
+        """Replaces every value with the values of counts, a dictionary of value -> number of talks using it."""
+        self.beginResetModel()
+        self._counts = dict((unicode(value), count) for value, count in counts.iteritems() if value and count > 0)
+        self._keys = sorted((value.lower(), value) for value in self._counts)
+        self.endResetModel()
+
+    def add(self, value):
+        """Counts one more talk using value."""
+        value = unicode(value)
+        if not value:
+            return
+
+        if value in self._counts:
+            self._counts[value] += 1
+        else:
+            self._counts[value] = 1
+            key = (value.lower(), value)
+            row = bisect.bisect_left(self._keys, key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._keys.insert(row, key)
+            self.endInsertRows()
+
+    def remove(self, value):
+        """Counts one less talk using value, removing it when no talk uses it anymore."""
+        value = unicode(value)
+        if value not in self._counts:
+            return
+
+        self._counts[value] -= 1
+        if self._counts[value] == 0:
+            del self._counts[value]
+            row = bisect.bisect_left(self._keys, (value.lower(), value))
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._keys[row]
+            self.endRemoveRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return QVariant()
+        return QVariant(self._keys[index.row()][1])
@@ -27,6 +27,7 @@ import shutil
 
 from freeseer.framework.config.persist import ConfigParserStorage
 from freeseer.framework.config.persist import JSONConfigStorage
+from freeseer.framework.database import DatabaseConfig
 from freeseer.framework.database import QtDBConnector
 from freeseer.framework.plugin import PluginManager
 
@@ -187,10 +188,12 @@ class Profile(object):
     def get_database(self, name='presentations.db'):
         """Returns an instance of QtDBConnector for a specific database file.
 
+        The connection profile is read from the Database section of freeseer.conf.
         It is also cached for future gets.
         """
         if name not in self._databases:
-            self._databases[name] = QtDBConnector(self.get_filepath(name), PluginManager(self))
+            config = self.get_config('freeseer.conf', DatabaseConfig, storage_args=['Database'], read_only=True)
+            self._databases[name] = QtDBConnector(self.get_filepath(name), PluginManager(self), config)
         return self._databases[name]
 
 
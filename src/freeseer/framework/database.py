@@ -23,16 +23,27 @@
 # http://wiki.github.com/Freeseer/freeseer/
 
 import csv
+import gzip
+import itertools
 import logging
+import threading
 
 from PyQt4 import QtSql
 from PyQt4.QtCore import QDate
+from PyQt4.QtCore import QDateTime
 from PyQt4.QtCore import QTime
 from PyQt4.QtCore import QStringList
+from PyQt4.QtCore import QThread
+from PyQt4.QtCore import Qt
 
 from freeseer import SCHEMA_VERSION
-from freeseer.framework.presentation import Presentation
+from freeseer.framework.completion import CompletionModel
+from freeseer.framework.config import Config, options
 from freeseer.framework.failure import Failure, Report
+from freeseer.framework.presentation import Presentation
+from freeseer.framework.presentation_model import PresentationsTableModel
+from freeseer.framework.schedule import ScheduleIndex
+from freeseer.framework.schedule import ScheduleModel
 
 log = logging.getLogger(__name__)
 
@@ -62,6 +73,47 @@ PRESENTATIONS_SCHEMA_310 = '''CREATE TABLE IF NOT EXISTS presentations
                                         EndTime timestamp,
                                         UNIQUE (Speaker, Title) ON CONFLICT IGNORE)'''
 
+# Date, StartTime and EndTime hold ISO 8601 text (yyyy-MM-dd, hh:mm:ss), which sorts and compares in time order.
+# The TEXT declaration keeps SQLite from converting values that look like numbers.
+PRESENTATIONS_SCHEMA_320 = '''CREATE TABLE IF NOT EXISTS presentations
+                                       (Id INTEGER PRIMARY KEY,
+                                        Title varchar(255),
+                                        Speaker varchar(100),
+                                        Description text,
+                                        Category varchar(25),
+                                        Event varchar(100),
+                                        Room varchar(25),
+                                        Date text,
+                                        StartTime text,
+                                        EndTime text,
+                                        UNIQUE (Speaker, Title) ON CONFLICT IGNORE)'''
+
+# Indexes serving the event / room / date lookups of the record UI and auto-record
+PRESENTATIONS_INDEXES_320 = ('''CREATE INDEX IF NOT EXISTS presentations_event_room_date
+                                ON presentations (Event, Room, Date, StartTime)''',
+                             '''CREATE INDEX IF NOT EXISTS presentations_room_date
+                                ON presentations (Room, Date, StartTime)''')
+
+# Full-text index over the searchable presentations columns, kept in sync with presentations by triggers.
+# It is derived data: it is dropped when the presentations table is upgraded and rebuilt when missing.
+PRESENTATIONS_SEARCH_SCHEMA = ('''CREATE VIRTUAL TABLE presentations_fts USING fts4
+                                    (content="presentations", Title, Speaker, Description, Category, Event, Room)''',
+                               '''CREATE TRIGGER presentations_fts_before_update BEFORE UPDATE ON presentations BEGIN
+                                    DELETE FROM presentations_fts WHERE docid=old.Id;
+                                  END''',
+                               '''CREATE TRIGGER presentations_fts_before_delete BEFORE DELETE ON presentations BEGIN
+                                    DELETE FROM presentations_fts WHERE docid=old.Id;
+                                  END''',
+                               '''CREATE TRIGGER presentations_fts_after_update AFTER UPDATE ON presentations BEGIN
+                                    INSERT INTO presentations_fts(docid, Title, Speaker, Description, Category, Event, Room)
+                                    VALUES (new.Id, new.Title, new.Speaker, new.Description, new.Category, new.Event, new.Room);
+                                  END''',
+                               '''CREATE TRIGGER presentations_fts_after_insert AFTER INSERT ON presentations BEGIN
+                                    INSERT INTO presentations_fts(docid, Title, Speaker, Description, Category, Event, Room)
+                                    VALUES (new.Id, new.Title, new.Speaker, new.Description, new.Category, new.Event, new.Room);
+                                  END''',
+                               '''INSERT INTO presentations_fts(presentations_fts) VALUES ('rebuild')''')
+
 REPORTS_SCHEMA_300 = '''CREATE TABLE IF NOT EXISTS failures
                                         (Id INTERGER PRIMARY KEY,
                                         Comments TEXT,
@@ -69,30 +121,127 @@ REPORTS_SCHEMA_300 = '''CREATE TABLE IF NOT EXISTS failures
                                         Release INTEGER,
                                         UNIQUE (ID) ON CONFLICT REPLACE)'''
 
+# Number of Presentation fields, stored in the presentations columns following Id
+PRESENTATION_FIELDS = len(Presentation.__slots__)
+
+# Number of rows written to csv per chunk, and the buffer size of exported files
+EXPORT_CHUNK_SIZE = 500
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+# Default limit of SQLite on the number of values bound to one statement
+MAX_BOUND_VALUES = 999
+
+
+class DatabaseConfig(Config):
+    """Connection profile applied to the talk database when it is opened.
+
+    The defaults let the record app, talk editor and REST server read the database while another one writes to it.
+    """
+    journal_mode = options.ChoiceOption(['WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY'], 'WAL')
+    synchronous = options.ChoiceOption(['OFF', 'NORMAL', 'FULL'], 'NORMAL')
+    cache_size = options.IntegerOption(-8000)  # Negative values are in KiB, positive values in pages
+    mmap_size = options.IntegerOption(64 * 1024 * 1024)  # bytes
+    busy_timeout = options.IntegerOption(5000)  # milliseconds
+
 
 class QtDBConnector(object):
-    def __init__(self, db_filepath, plugman):
+    # Columns of the presentations table, in order
+    PRESENTATIONS_COLUMNS = ('Id', 'Title', 'Speaker', 'Description', 'Category', 'Event', 'Room', 'Date', 'StartTime',
+                             'EndTime')
+
+    # Columns with autocompletion and the matching Presentation attributes
+    COMPLETION_FIELDS = (('Title', 'title'), ('Speaker', 'speaker'), ('Category', 'category'), ('Event', 'event'),
+                         ('Room', 'room'))
+
+    def __init__(self, db_filepath, plugman, config=None):
         """
         Initialize the QtDBConnector
+
+        config is a DatabaseConfig, the DatabaseConfig defaults are used if it is not given.
         """
         self.talkdb_file = db_filepath
         self.plugman = plugman
+        self.config = config if config is not None else DatabaseConfig()
 
         self.presentationsModel = None
         self.failuresModel = None
         self.recentconnModel = None
+
+        # Built on first use by the event / room / date / talk models
+        self._schedule = None
+
+        # CompletionModels keyed by column, created on first use by get_completion_model
+        self._completions = {}
+        self._completions_stale = False
+
+        # Whether the full-text index exists, set when the database is opened
+        self.search_enabled = False
+
+        # Every thread gets its own connection, QSqlDatabase connections can only be used by the thread that opened them
+        self._local = threading.local()
+        self._connection_ids = itertools.count(1)
+        self._connection_ids_lock = threading.Lock()
         self.__open_table()
 
-    def __open_table(self):
-        """Opens a connection to the database. Uses by the init function."""
-        self.talkdb = QtSql.QSqlDatabase.addDatabase("QSQLITE")
-        self.talkdb.setDatabaseName(self.talkdb_file)
+    @property
+    def talkdb(self):
+        """The connection to the database owned by the calling thread. It is opened on first use."""
+        if not hasattr(self._local, 'talkdb'):
+            with self._connection_ids_lock:
+                connection_id = next(self._connection_ids)
+            self.__connect('freeseer-talkdb-{}-{}'.format(id(self), connection_id))
+        return self._local.talkdb
+
+    @property
+    def _prepared_queries(self):
+        """Prepared QSqlQuery objects of the calling thread's connection keyed by their SQL statement"""
+        return self._local.prepared_queries
+
+    def __connect(self, connection_name=None):
+        """Adds and opens a connection to the database for the calling thread.
 
-        if self.talkdb.open():
+        The default Qt connection is used if connection_name is None. Returns True if the connection was opened.
+        """
+        if connection_name is None:
+            talkdb = QtSql.QSqlDatabase.addDatabase("QSQLITE")
+        else:
+            talkdb = QtSql.QSqlDatabase.addDatabase("QSQLITE", connection_name)
+        talkdb.setDatabaseName(self.talkdb_file)
+        talkdb.setConnectOptions('QSQLITE_BUSY_TIMEOUT=%i' % self.config.busy_timeout)
 
+        self._local.talkdb = talkdb
+        self._local.connection_name = connection_name
+        self._local.prepared_queries = {}
+
+        if talkdb.open():
+            self.__apply_pragmas()
+            return True
+        else:
+            log.error("Unable to open talkdb file: %s", talkdb.lastError().text())
+            return False
+
+    def close_connection(self):
+        """Closes the calling thread's connection to the database.
+
+        Threads other than the one that created the QtDBConnector should call this before they exit.
+        """
+        if not hasattr(self._local, 'talkdb'):
+            return
+
+        self._local.prepared_queries.clear()
+        self._local.talkdb.close()
+        connection_name = self._local.connection_name
+        del self._local.talkdb
+        if connection_name is not None:
+            QtSql.QSqlDatabase.removeDatabase(connection_name)
+
+    def __open_table(self):
+        """Opens the default connection to the database and creates or upgrades the tables. Used by the init function."""
+        if self.__connect():
             # check if presentations table exists and if not create it.
             if not self.talkdb.tables().contains("presentations"):
                 self.__create_presentations_table()
+                self.__create_presentations_indexes()
                 self.__insert_default_talk()
 
                 # If presentations table did not exist, it is safe to say that the reports table needs to be reset
@@ -101,7 +250,7 @@ class QtDBConnector(object):
                 self.__create_failures_table()
 
                 # Set the database version (so the updater does not update)
-                QtSql.QSqlQuery('PRAGMA user_version = %i' % SCHEMA_VERSION)
+                QtSql.QSqlQuery('PRAGMA user_version = %i' % SCHEMA_VERSION, self.talkdb)
 
             # check if recentConnections table exists and if not create it.
             if not self.talkdb.tables().contains("recentconn"):
@@ -109,16 +258,63 @@ class QtDBConnector(object):
 
             # verify that correct version of database exists
             self.__update_version()
+
+            # check if the full-text search index exists and if not build it.
+            self.search_enabled = self.talkdb.tables().contains("presentations_fts")
+            if not self.search_enabled:
+                self.search_enabled = self.__create_search_table()
         else:
             log.error("Unable to create talkdb file.")
 
-    def __close_table(self):
-        """Closes the connection the the database."""
-        self.talkdb.close()
+    def __apply_pragmas(self):
+        """Applies the connection profile from self.config to the open database."""
+        query = QtSql.QSqlQuery('PRAGMA journal_mode = %s' % self.config.journal_mode, self.talkdb)
+        if query.next() and unicode(query.value(0).toString()).upper() != self.config.journal_mode:
+            log.warning("Unable to set journal mode %s, using %s.", self.config.journal_mode, query.value(0).toString())
+
+        QtSql.QSqlQuery('PRAGMA synchronous = %s' % self.config.synchronous, self.talkdb)
+        QtSql.QSqlQuery('PRAGMA cache_size = %i' % self.config.cache_size, self.talkdb)
+        QtSql.QSqlQuery('PRAGMA mmap_size = %i' % self.config.mmap_size, self.talkdb)
+
+    def __prepare(self, statement, cached=True):
+        """Returns a QSqlQuery prepared for statement.
+
+        Prepared queries are cached by statement so SQLite only parses and plans each statement once.
+        Pass cached=False for queries that must outlive the next call using the same statement (e.g. queries
+        handed over to a QSqlQueryModel).
+        """
+        query = self._prepared_queries.get(statement) if cached else None
+        if query is None:
+            query = QtSql.QSqlQuery(self.talkdb)
+            if not query.prepare(statement):
+                log.error("Unable to prepare query: %s", query.lastError().text())
+            if cached:
+                self._prepared_queries[statement] = query
+        return query
+
+    def __execute(self, statement, values=(), cached=True):
+        """Binds values to the prepared statement's placeholders in order, executes it and returns the query.
+
+        Queries returned from the cache are reused by the next call with the same statement.
+        """
+        query = self.__prepare(statement, cached)
+        for value in values:
+            query.addBindValue(value)
+        if not query.exec_():
+            log.error("Query failed: %s", query.lastError().text())
+        return query
+
+    def __finish_queries(self):
+        """Releases the result sets held by cached queries.
+
+        SQLite refuses to alter or drop tables while a statement on them is still active.
+        """
+        for query in self._prepared_queries.values():
+            query.finish()
 
     def __get_db_version_int(self):
         """Gets the database's current version. Default is 0 if unset (for 2x and older)"""
-        query = QtSql.QSqlQuery('PRAGMA user_version')
+        query = QtSql.QSqlQuery('PRAGMA user_version', self.talkdb)
         query.first()
         return query.value(0).toInt()[0]
 
@@ -129,6 +325,8 @@ class QtDBConnector(object):
         if db_version == SCHEMA_VERSION:
             return
 
+        self.__finish_queries()
+
         #
         # Define functions for upgrading between schema versions
         #
@@ -142,106 +340,313 @@ class QtDBConnector(object):
                 return  # No update needed
 
             log.debug('Updating to schema 300.')
-            QtSql.QSqlQuery('ALTER TABLE presentations RENAME TO presentations_old')  # temporary table
+            QtSql.QSqlQuery('ALTER TABLE presentations RENAME TO presentations_old', self.talkdb)  # temporary table
             self.__create_presentations_table(PRESENTATIONS_SCHEMA_300)
             QtSql.QSqlQuery("""INSERT INTO presentations
-                            SELECT Id, Title, Speaker, Description, Level, Event, Room, Time FROM presentations_old""")
-            QtSql.QSqlQuery('DROP TABLE presentations_old')
+                            SELECT Id, Title, Speaker, Description, Level, Event, Room, Time FROM presentations_old""", self.talkdb)
+            QtSql.QSqlQuery('DROP TABLE presentations_old', self.talkdb)
 
         def update_30to31():
             """Performs incremental update of database from 3.0 and older to 3.1."""
-            QtSql.QSqlQuery('ALTER TABLE presentations RENAME TO presentations_old')
+            if db_version >= 310:
+                log.debug('Database newer than schema version 310.')
+                return  # No update needed
+
+            log.debug('Updating to schema 310.')
+            QtSql.QSqlQuery('ALTER TABLE presentations RENAME TO presentations_old', self.talkdb)
             self.__create_presentations_table(PRESENTATIONS_SCHEMA_310)
             QtSql.QSqlQuery("""INSERT INTO presentations
                             SELECT Id, Title, Speaker, Description, Level, Event, Room, Time, Time, Time
-                            FROM presentations_old""")
-            QtSql.QSqlQuery('DROP TABLE presentations_old')
+                            FROM presentations_old""", self.talkdb)
+            QtSql.QSqlQuery('DROP TABLE presentations_old', self.talkdb)
+
+        def update_31to32():
+            """Performs incremental update of database from 3.1 to 3.2.
+
+            Stores Date, StartTime and EndTime as ISO 8601 text and indexes the event, room and date lookups.
+            Dates and times SQLite can parse, including the timestamps copied by update_30to31, are rewritten in the
+            ISO 8601 format. Other values are kept as they are.
+            """
+            if db_version >= 320:
+                log.debug('Database newer than schema version 320.')
+                return  # No update needed
+
+            log.debug('Updating to schema 320.')
+            QtSql.QSqlQuery('ALTER TABLE presentations RENAME TO presentations_old', self.talkdb)
+            self.__create_presentations_table(PRESENTATIONS_SCHEMA_320)
+            QtSql.QSqlQuery("""INSERT INTO presentations
+                            SELECT Id, Title, Speaker, Description, Category, Event, Room,
+                                   CASE WHEN typeof(Date) = 'text' THEN COALESCE(date(Date), Date)
+                                        ELSE CAST(Date AS TEXT) END,
+                                   CASE WHEN typeof(StartTime) = 'text' THEN COALESCE(time(StartTime), StartTime)
+                                        ELSE CAST(StartTime AS TEXT) END,
+                                   CASE WHEN typeof(EndTime) = 'text' THEN COALESCE(time(EndTime), EndTime)
+                                        ELSE CAST(EndTime AS TEXT) END
+                            FROM presentations_old""", self.talkdb)
+            QtSql.QSqlQuery('DROP TABLE presentations_old', self.talkdb)
+            self.__create_presentations_indexes()
 
         #
         # Perform the upgrade
         #
-        updaters = [update_2xto30, update_30to31]
+        updaters = [update_2xto30, update_30to31, update_31to32]
         for updater in updaters:
             updater()
 
-        QtSql.QSqlQuery('PRAGMA user_version = %i' % SCHEMA_VERSION)
+        # The full-text index is rebuilt against the upgraded table
+        QtSql.QSqlQuery('DROP TABLE IF EXISTS presentations_fts', self.talkdb)
+
+        QtSql.QSqlQuery('PRAGMA user_version = %i' % SCHEMA_VERSION, self.talkdb)
         log.info('Upgraded presentations database from version {} to {}'.format(db_version, SCHEMA_VERSION))
 
-    def __create_presentations_table(self, schema=PRESENTATIONS_SCHEMA_310):
+    def __create_presentations_table(self, schema=PRESENTATIONS_SCHEMA_320):
         """Creates the presentations table in the database. Should be used to initialize a new table."""
         log.info("table created")
-        QtSql.QSqlQuery(schema)
+        QtSql.QSqlQuery(schema, self.talkdb)
+
+    def __create_presentations_indexes(self, indexes=PRESENTATIONS_INDEXES_320):
+        """Creates the indexes on the presentations table. Requires the latest presentations schema."""
+        for index in indexes:
+            QtSql.QSqlQuery(index, self.talkdb)
+
+    def __create_search_table(self, schema=PRESENTATIONS_SEARCH_SCHEMA):
+        """Creates and fills the full-text index of the presentations table.
+
+        Returns False if SQLite was built without FTS4, in which case searches fall back to LIKE matching.
+        """
+        if not self.talkdb.transaction():
+            log.warning("Unable to start a transaction: %s", self.talkdb.lastError().text())
+
+        for statement in schema:
+            query = QtSql.QSqlQuery(statement, self.talkdb)
+            if query.lastError().isValid():
+                self.talkdb.rollback()
+                log.warning("Full-text search is unavailable: %s", query.lastError().text())
+                return False
+
+        self.talkdb.commit()
+        log.info("Full-text search index created.")
+        return True
 
     def __insert_default_talk(self):
         """Inserts the required placeholder talk into the database.At least one talk must exist"""
         self.insert_presentation(Presentation("", "", "", "", "", "", "", "", ""))
 
+    # The queries below are handed over to the caller, they are not cached so the next call does not reset them
+
     def get_talks(self):
         """Gets all the talks from the database including all columns"""
-        return QtSql.QSqlQuery('''SELECT * FROM presentations''')
+        return self.__execute('''SELECT * FROM presentations''', cached=False)
 
     def get_events(self):
         """Gets all the talk events from the database"""
-        return QtSql.QSqlQuery('''SELECT DISTINCT Event FROM presentations''')
+        return self.__execute('''SELECT DISTINCT Event FROM presentations''', cached=False)
 
     def get_talk_ids(self):
         """Gets all the talk events from the database"""
-        return QtSql.QSqlQuery('''SELECT Id FROM presentations''')
+        return self.__execute('''SELECT Id FROM presentations''', cached=False)
 
     def get_talks_by_event(self, event):
         """Gets the talks signed in a specific event from the database"""
-        return QtSql.QSqlQuery('''SELECT * FROM presentations WHERE Event=%s''' % event)
+        return self.__execute('''SELECT * FROM presentations WHERE Event=?''', (event,), cached=False)
 
     def get_talks_by_room(self, room):
         """Gets the talks hosted in a specific room from the database"""
-        return QtSql.QSqlQuery('''SELECT * FROM presentations WHERE Room=%s''' % room)
+        return self.__execute('''SELECT * FROM presentations WHERE Room=?''', (room,), cached=False)
 
     def get_talks_by_room_and_time(self, room):
         """Returns the talks hosted in a specified room, starting from the current date and time"""
         current_date = QDate.currentDate().toString(1)  # yyyy-mm-dd
         current_time = QTime.currentTime().toString()  # hh:mm:ss
-        return QtSql.QSqlQuery('''SELECT * FROM presentations
-                                  WHERE Room='{}' AND Date='{}'
-                                  AND StartTime >= '{}' ORDER BY StartTime ASC'''.format(room, current_date, current_time))
+        return self.__execute('''SELECT * FROM presentations
+                                 WHERE Room=? AND Date=?
+                                 AND StartTime >= ? ORDER BY StartTime ASC''', (room, current_date, current_time),
+                              cached=False)
+
+    def get_next_talk_by_room(self, room, after=None, event=None):
+        """Returns (talk_id, start, end) for the next talk hosted in room on the day of after, None if there is none.
+
+        after is a QDateTime and defaults to now. start and end are QTimes. Only talks of event are considered if
+        event is given. Talks that started before after are skipped with a binary search of the schedule index
+        instead of a query.
+        """
+        if after is None:
+            after = QDateTime.currentDateTime()
+
+        time = QTime(0, 0).secsTo(after.time())
+        talk = self.__get_schedule().next_talk(room, after.date().toString(Qt.ISODate), time,
+                                              None if event is None else unicode(event))
+        if talk is None:
+            return None
+
+        talk_id, start, end = talk
+        return talk_id, QTime(0, 0).addSecs(start), QTime(0, 0).addSecs(end)
 
     def get_presentation(self, talk_id):
         """Returns a Presentation object associated to a talk_id"""
-        result = QtSql.QSqlQuery('''SELECT * FROM presentations WHERE Id="%s"''' % talk_id)
+        result = self.__execute('''SELECT * FROM presentations WHERE Id=?''', (talk_id,))
         if result.next():
-            return Presentation(title=unicode(result.value(1).toString()),
-                             speaker=unicode(result.value(2).toString()),
-                             description=unicode(result.value(3).toString()),
-                             category=unicode(result.value(4).toString()),
-                             event=unicode(result.value(5).toString()),
-                             room=unicode(result.value(6).toString()),
-                             date=unicode(result.value(7).toString()),
-                             startTime=unicode(result.value(8).toString()),
-                             endTime=unicode(result.value(9).toString()))
+            presentation = self.__presentation_from_result(result)
         else:
-            return None
+            presentation = None
+        result.finish()
+        return presentation
+
+    def get_presentation_rows(self, after_id=-1, limit=-1):
+        """Returns up to limit presentations with an Id greater than after_id, ordered by Id.
+
+        Each presentation is a list of QVariant values, one per column of PRESENTATIONS_COLUMNS.
+        Paging on Id uses the primary key, so every page costs the same however far into the table it is.
+        """
+        result = self.__execute('''SELECT * FROM presentations WHERE Id > ? ORDER BY Id ASC LIMIT ?''',
+                                (after_id, limit))
+        columns = range(len(self.PRESENTATIONS_COLUMNS))
+        rows = []
+        while result.next():
+            rows.append([result.value(column) for column in columns])
+        return rows
+
+    def get_presentation_rows_by_ids(self, talk_ids):
+        """Returns the presentations with the given talk ids as lists of QVariant values, ordered by Id.
+
+        The ids are looked up in chunks of at most MAX_BOUND_VALUES, the number of values SQLite binds to a statement.
+        Ids of talks that do not exist are ignored.
+        """
+        talk_ids = list(talk_ids)
+        columns = range(len(self.PRESENTATIONS_COLUMNS))
+        rows = []
+        for start in xrange(0, len(talk_ids), MAX_BOUND_VALUES):
+            chunk = talk_ids[start:start + MAX_BOUND_VALUES]
+            result = self.__execute('''SELECT * FROM presentations WHERE Id IN ({})'''.format(', '.join('?' * len(chunk))),
+                                    chunk, cached=False)
+            while result.next():
+                rows.append([result.value(column) for column in columns])
+        rows.sort(key=lambda row: row[0].toInt()[0])
+        return rows
+
+    def get_presentation_row(self, talk_id):
+        """Returns the presentation with talk_id as a list of QVariant values like get_presentation_rows, or None."""
+        result = self.__execute('''SELECT * FROM presentations WHERE Id=?''', (talk_id,))
+        if result.next():
+            row = [result.value(column) for column in range(len(self.PRESENTATIONS_COLUMNS))]
+        else:
+            row = None
+        result.finish()
+        return row
 
     def get_string_list(self, column):
         """Returns a column as a QStringList"""
         tempList = QStringList()
-        result = QtSql.QSqlQuery('''SELECT DISTINCT %s FROM presentations''' % column)
+        result = self.__execute('''SELECT DISTINCT %s FROM presentations''' % column)
         while result.next():
             tempList.append(result.value(0).toString())
         return tempList
 
+    def search_presentations(self, query, limit=50):
+        """Returns up to limit (talk_id, Presentation) tuples of the talks matching query, best matches first.
+
+        Every word of query must prefix-match a word in the title, speaker, description, category, event or room.
+        Talks matching more words, or the same words more often, rank first. A negative limit returns every match.
+        """
+        result = self.__search('presentations.*', query, limit)
+        if result is None:
+            return []
+        return list(self.__decode_presentations(result))
+
+    def search_presentation_ids(self, query, limit=-1):
+        """Returns the talk ids of the talks matching query as unicode strings, ranked like search_presentations.
+
+        Only the ids are read, so every match of a large table can be returned cheaply. By default there is no limit.
+        """
+        result = self.__search('presentations.Id', query, limit)
+        talk_ids = []
+        while result is not None and result.next():
+            talk_ids.append(unicode(result.value(0).toString()))
+        return talk_ids
+
+    def __search(self, columns, query, limit):
+        """Executes a search for query selecting columns of the presentations table, or returns None if query is empty."""
+        terms = [term for term in unicode(query).replace('"', ' ').split()]
+        if not terms:
+            return None
+
+        if self.search_enabled:
+            # offsets() lists 4 space separated integers per hit
+            return self.__execute('''SELECT {} FROM presentations
+                                  JOIN (SELECT docid, (length(offsets) - length(replace(offsets, ' ', '')) + 1) / 4 AS hits
+                                        FROM (SELECT docid, offsets(presentations_fts) AS offsets
+                                              FROM presentations_fts WHERE presentations_fts MATCH ?)) AS matches
+                                  ON presentations.Id = matches.docid
+                                  ORDER BY matches.hits DESC, presentations.Id ASC LIMIT ?'''.format(columns),
+                                  (u' '.join(u'"{}*"'.format(term) for term in terms), limit))
+
+        pattern = u' AND '.join(["(Title || ' ' || Speaker || ' ' || Description || ' ' || Category || ' ' ||"
+                                 " Event || ' ' || Room) LIKE ?"] * len(terms))
+        return self.__execute(u'''SELECT {} FROM presentations WHERE {} ORDER BY Id ASC LIMIT ?'''.format(columns, pattern),
+                              [u'%{}%'.format(term) for term in terms] + [limit])
+
+    def __presentation_from_result(self, result, first=1):
+        """Returns the Presentation stored in the presentations columns of result, starting at column first.
+
+        The columns are decoded in one pass and passed positionally, in the order of Presentation.__slots__.
+        """
+        value = result.value
+        return Presentation(*[unicode(value(column).toString()) for column in xrange(first, first + PRESENTATION_FIELDS)])
+
+    def __decode_presentations(self, result):
+        """Yields a (talk_id, Presentation) tuple for every remaining row of a query selecting presentations.*"""
+        while result.next():
+            yield unicode(result.value(0).toString()), self.__presentation_from_result(result)
+
+    def iter_presentations(self):
+        """Yields a (talk_id, Presentation) tuple for every talk, ordered by talk id.
+
+        The talks are read with a forward only query, so memory use does not grow with the size of the table.
+        """
+        result = QtSql.QSqlQuery(self.talkdb)
+        result.setForwardOnly(True)
+        if not result.exec_('''SELECT * FROM presentations ORDER BY Id ASC'''):
+            log.error("Query failed: %s", result.lastError().text())
+        return self.__decode_presentations(result)
+
     def presentation_exists(self, presentation):
         """Checks if there's a presentation with the same Speaker and Title already stored"""
-        result = QtSql.QSqlQuery('''SELECT * FROM presentations''')
-        while result.next():
-            if (unicode(presentation.title) == unicode(result.value(1).toString())
-            and unicode(presentation.speaker) == unicode(result.value(2).toString())):
-                return True
-        return False
+        return self.__speaker_title_exists(presentation.speaker, presentation.title)
+
+    def presentations_exist(self, speaker_titles):
+        """Returns the set of (speaker, title) pairs from speaker_titles that are already stored
+
+        The pairs are looked up in chunks of MAX_BOUND_VALUES / 2, one query per chunk matching the speakers and titles
+        of the chunk through the index backing the (Speaker, Title) uniqueness constraint. Rows pairing a speaker and
+        a title of different pairs of the chunk are left out afterwards.
+        """
+        pairs = list(set((unicode(speaker), unicode(title)) for speaker, title in speaker_titles))
+        existing = set()
+        size = MAX_BOUND_VALUES // 2
+        for start in xrange(0, len(pairs), size):
+            chunk = pairs[start:start + size]
+            speakers = list(set(speaker for speaker, title in chunk))
+            titles = list(set(title for speaker, title in chunk))
+            result = self.__execute('''SELECT Speaker, Title FROM presentations WHERE Speaker IN ({}) AND Title IN ({})'''
+                                    .format(', '.join('?' * len(speakers)), ', '.join('?' * len(titles))),
+                                    speakers + titles, cached=False)
+            while result.next():
+                existing.add((unicode(result.value(0).toString()), unicode(result.value(1).toString())))
+        return existing.intersection(pairs)
+
+    def __speaker_title_exists(self, speaker, title):
+        """Checks the (Speaker, Title) unique key for a stored presentation"""
+        result = self.__execute('''SELECT 1 FROM presentations WHERE Speaker=? AND Title=? LIMIT 1''',
+                                (unicode(speaker), unicode(title)))
+        exists = result.next()
+        result.finish()
+        return exists
 
     #
     # Presentation Create, Update, Delete
     #
-    def insert_presentation(self, presentation):
-        """Inserts a passed Presentation into the database."""
+    def __insert(self, presentation):
+        """Executes the insert statement for a Presentation and returns the query."""
         # Duplicate time to date field for older RSS / CSV formats
         # If date is empty, and time has a full DateTime, split the DateTime to
         # both Date and Time
@@ -249,8 +654,8 @@ class QtDBConnector(object):
         if not presentation.date and presentation.startTime and len(presentation.startTime) == 16:
             presentation.date, presentation.startTime = presentation.startTime[:-6], presentation.startTime[11:]
 
-        QtSql.QSqlQuery(
-            '''INSERT INTO presentations VALUES (NULL, "%s", "%s", "%s", "%s", "%s", "%s", "%s", "%s", "%s")''' %
+        return self.__execute(
+            '''INSERT INTO presentations VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
             (presentation.title,
              presentation.speaker,
              presentation.description,
@@ -260,14 +665,64 @@ class QtDBConnector(object):
              presentation.date,
              presentation.startTime,
              presentation.endTime))
+
+    def insert_presentation(self, presentation):
+        """Inserts a passed Presentation into the database.
+
+        Returns the talk id of the new talk, or None if a talk with the same Speaker and Title already exists.
+        """
+        query = self.__insert(presentation)
+        talk_id = None
+        if query.numRowsAffected() > 0:
+            talk_id = unicode(query.lastInsertId().toString())
+            self.__talk_changed(talk_id, new=presentation)
         log.info("Talk added: %s - %s, Time: %s - %s" % (presentation.speaker, presentation.title, presentation.startTime, presentation.endTime))
+        return talk_id
+
+    def insert_presentations(self, presentations):
+        """Inserts an iterable of Presentations into the database in a single transaction.
+
+        Every row is bound to the same prepared insert statement, so a large import costs one commit instead of
+        one per talk. Returns a tuple (inserted, skipped) where skipped counts the talks ignored because a talk
+        with the same Speaker and Title already exists. If any insert fails the whole batch is rolled back and
+        (0, 0) is returned.
+        """
+        if not self.talkdb.transaction():
+            log.warning("Unable to start a transaction: %s", self.talkdb.lastError().text())
+
+        added = []
+        skipped = 0
+        for presentation in presentations:
+            query = self.__insert(presentation)
+            if query.lastError().isValid():
+                self.talkdb.rollback()
+                log.error("Talk import failed, no talks were added: %s", query.lastError().text())
+                return 0, 0
+
+            if query.numRowsAffected() > 0:
+                added.append((query.lastInsertId().toString(), presentation))
+            else:
+                skipped += 1
+
+        if not self.talkdb.commit():
+            log.error("Talk import failed, no talks were added: %s", self.talkdb.lastError().text())
+            self.talkdb.rollback()
+            return 0, 0
+
+        for talk_id, presentation in added:
+            self.__talk_changed(talk_id, new=presentation)
+        inserted = len(added)
+
+        log.info("Talks imported: %d added, %d duplicates skipped.", inserted, skipped)
+        return inserted, skipped
 
     def update_presentation(self, talk_id, presentation):
         """Updates an existing Presentation in the database."""
-        QtSql.QSqlQuery(
-            '''UPDATE presentations SET Title="%s", Speaker="%s", Description="%s", Category="%s",
-                Event="%s", Room="%s", Date="%s", StartTime="%s", EndTime="%s"
-                WHERE Id="%s"''' %
+        old = self.get_presentation(talk_id) if self._completions else None
+        self.__execute(
+            '''UPDATE presentations SET Title=?, Speaker=?, Description=?, Category=?,
+                Event=?, Room=?, Date=?, StartTime=?, EndTime=?
+                WHERE Id=?''',
             (presentation.title,
              presentation.speaker,
              presentation.description,
@@ -278,70 +733,163 @@ class QtDBConnector(object):
              presentation.startTime,
              presentation.endTime,
              talk_id))
+        self.__talk_changed(talk_id, old, presentation)
         log.info("Talk %s updated: %s - %s" % (talk_id, presentation.speaker, presentation.title))
 
+    def update_presentation_field(self, talk_id, field, value):
+        """Updates a single field of an existing Presentation in the database.
+
+        field is one of PRESENTATIONS_COLUMNS other than Id.
+        """
+        if field not in self.PRESENTATIONS_COLUMNS[1:]:
+            raise ValueError('Unknown presentation field: {}'.format(field))
+
+        old = self.get_presentation(talk_id) if self._completions else None
+        self.__execute('''UPDATE presentations SET {}=? WHERE Id=?'''.format(field), (value, talk_id))
+        if self._schedule is not None or self._completions:
+            self.__talk_changed(talk_id, old, self.get_presentation(talk_id))
+        log.info("Talk %s updated: %s = %s" % (talk_id, field, value))
+
     def delete_presentation(self, talk_id):
         """Removes a Presentation from the database"""
-        QtSql.QSqlQuery('''DELETE FROM presentations WHERE Id="%s"''' % talk_id)
+        old = self.get_presentation(talk_id) if self._completions else None
+        self.__execute('''DELETE FROM presentations WHERE Id=?''', (talk_id,))
+        self.__talk_changed(talk_id, old, None)
         log.info("Talk %s deleted." % talk_id)
 
     def clear_database(self):
         """Clears the presentations table"""
-        QtSql.QSqlQuery('''DELETE FROM presentations''')
+        self.__execute('''DELETE FROM presentations''')
+        if self._schedule is not None:
+            self._schedule.clear()
+        for model in self._completions.values():
+            model.reset({})
         log.info("Database cleared.")
 
+    #
+    # Schedule Index
+    #
+    def __get_schedule(self):
+        """Returns the ScheduleIndex serving the event / room / date / talk models, building it if needed."""
+        if self._schedule is None:
+            schedule = ScheduleIndex()
+            result = self.__execute('''SELECT Id, Title, Speaker, Event, Room, Date, StartTime, EndTime
+                                       FROM presentations''')
+            while result.next():
+                schedule.add(result.value(0).toString(),
+                             result.value(3).toString(),
+                             result.value(4).toString(),
+                             result.value(5).toString(),
+                             result.value(6).toString(),
+                             result.value(7).toString(),
+                             u"{} - {}".format(unicode(result.value(2).toString()),
+                                               unicode(result.value(1).toString())))
+            self._schedule = schedule
+        return self._schedule
+
+    def __talk_changed(self, talk_id, old=None, new=None):
+        """Keeps the schedule index and the completion models coherent with a talk that was added, updated or removed.
+
+        old and new are the talk's Presentation before and after the change, None if the talk did not exist then.
+        old is only needed once completion models have been created.
+        """
+        if self._schedule is not None:
+            if new is None:
+                self._schedule.remove(talk_id)
+            else:
+                self._schedule.add(talk_id, new.event, new.room, new.date, new.startTime, new.endTime,
+                                   u"{} - {}".format(new.speaker, new.title))
+
+        if not self._completions:
+            return
+
+        # Qt models may only be changed by the thread they belong to, others reload them on next use
+        if QThread.currentThread() != self._completions.values()[0].thread():
+            self._completions_stale = True
+            return
+
+        for column, attribute in self.COMPLETION_FIELDS:
+            model = self._completions.get(column)
+            if model is not None:
+                if old is not None:
+                    model.remove(getattr(old, attribute))
+                if new is not None:
+                    model.add(getattr(new, attribute))
+
+    def invalidate_schedule(self, *args):
+        """Drops the schedule index so it is rebuilt from the database on next use.
+
+        Call this after changing the presentations table without going through QtDBConnector.
+        """
+        self._schedule = None
+
+    #
+    # Autocompletion
+    #
+    def get_completion_model(self, column):
+        """Returns the CompletionModel of the distinct values of column, one of the COMPLETION_FIELDS columns.
+
+        The model is loaded on first use and then updated incrementally as talks are added, updated and removed.
+        """
+        if column not in dict(self.COMPLETION_FIELDS):
+            raise ValueError('Column has no completion model: {}'.format(column))
+
+        if self._completions_stale:
+            for stale_column, model in self._completions.iteritems():
+                self.__load_completions(stale_column, model)
+            self._completions_stale = False
+
+        if column not in self._completions:
+            model = CompletionModel()
+            self.__load_completions(column, model)
+            self._completions[column] = model
+        return self._completions[column]
+
+    def __load_completions(self, column, model):
+        """Fills a CompletionModel with the distinct values of column and the number of talks using each one."""
+        result = self.__execute('''SELECT {0}, COUNT(*) FROM presentations GROUP BY {0}'''.format(column))
+        counts = {}
+        while result.next():
+            counts[unicode(result.value(0).toString())] = result.value(1).toInt()[0]
+        model.reset(counts)
+
     #
     # Data Model Retrieval
     #
     def get_presentations_model(self):
         """Gets the Presentation Table Model. Useful for Qt GUI based Frontends to load the Model in Table Views"""
         if self.presentationsModel is None:
-            self.presentationsModel = QtSql.QSqlTableModel()
-            self.presentationsModel.setTable("presentations")
-            self.presentationsModel.setEditStrategy(QtSql.QSqlTableModel.OnFieldChange)
+            self.presentationsModel = PresentationsTableModel(self)
             self.presentationsModel.select()
         return self.presentationsModel
 
     def get_events_model(self):
         """Gets the Events Model. Useful for Qt GUI based Frontends to load the Model into Views"""
-        self.eventsModel = QtSql.QSqlQueryModel()
-        self.eventsModel.setQuery("SELECT DISTINCT Event FROM presentations ORDER BY Event ASC")
+        self.eventsModel = ScheduleModel([(event,) for event in self.__get_schedule().events()])
         return self.eventsModel
 
     def get_dates_from_event_room_model(self, event, room):
         """Gets the Dates Model. Useful for Qt GUI based Frontends to load the Model into Views."""
-        self.datesModel = QtSql.QSqlQueryModel()
-        self.datesModel.setQuery(
-            "SELECT DISTINCT date FROM presentations WHERE Event='%s' and Room='%s' ORDER BY Date ASC"
-            % (event, room))
+        self.datesModel = ScheduleModel([(date,) for date in self.__get_schedule().dates(event, room)])
         return self.datesModel
 
     def get_rooms_model(self, event):
         """Gets the Rooms Model. Useful for Qt GUI based Frontends to load the Model into Views"""
-        self.roomsModel = QtSql.QSqlQueryModel()
-        self.roomsModel.setQuery("SELECT DISTINCT Room FROM presentations WHERE Event='%s' ORDER BY Room ASC" % event)
+        self.roomsModel = ScheduleModel([(room,) for room in self.__get_schedule().rooms(event)])
         return self.roomsModel
 
     def get_talks_model(self, event, room, date=None):
         """Gets the Talks Model. A talk is defined as "<presenter> - <talk_title>"
         Useful for Qt GUI based Frontends to load the Model into Views"""
-        self.talksModel = QtSql.QSqlQueryModel()
-        if date == "":
-            self.talksModel.setQuery("SELECT (Speaker || ' - ' || Title), Id FROM presentations \
-                                   WHERE Event='%s' and Room='%s' ORDER BY Date ASC" % (event, room))
-        else:
-            self.talksModel.setQuery("SELECT (Speaker || ' - ' || Title), Id FROM presentations \
-                                   WHERE Event='%s' and Room='%s' and date(Date) LIKE '%s' ORDER BY Date ASC"
-                                   % (event, room, date))
+        self.talksModel = ScheduleModel(self.__get_schedule().talks(event, room, date))
         return self.talksModel
 
     def get_talk_between_time(self, event, room, startTime, endTime):
         """Returns the talkID of the first talk found between a startTime, and endTime for a specified event/room.
         Else return None"""
-        query = QtSql.QSqlQuery("SELECT Id, Date FROM presentations \
-                                 WHERE Event='%s' AND Room='%s' \
-                                 AND Date BETWEEN '%s' \
-                                              AND '%s' ORDER BY Date ASC" % (event, room, startTime, endTime))
+        query = self.__execute("SELECT Id, Date FROM presentations \
+                                WHERE Event=? AND Room=? \
+                                AND Date BETWEEN ? AND ? ORDER BY Date ASC", (event, room, startTime, endTime))
         query.next()
         if query.isValid():
             return query.value(0)
@@ -352,52 +900,51 @@ class QtDBConnector(object):
     # Import / Export Functions
     #
     # Needs to be updated for category field, separate date and time fields
+    def __imported_presentations(self, presentations):
+        """Yields Presentations built from the dictionaries returned by Importer plugins."""
+        for presentation in presentations:
+            yield Presentation(presentation["Title"],
+                               presentation["Speaker"],
+                               presentation["Abstract"],  # Description
+                               presentation["Level"],
+                               presentation["Event"],
+                               presentation["Room"],
+                               presentation["Time"],
+                               presentation["Time"])
+
     def add_talks_from_rss(self, feed_url):
-        """Adds talks from an rss feed."""
+        """Adds talks from an rss feed.
+
+        Returns a tuple (inserted, skipped) as reported by insert_presentations.
+        """
         plugin = self.plugman.get_plugin_by_name("Rss FeedParser", "Importer")
         feedparser = plugin.plugin_object
         presentations = feedparser.get_presentations(feed_url)
 
         if presentations:
-            for presentation in presentations:
-                talk = Presentation(presentation["Title"],
-                                    presentation["Speaker"],
-                                    presentation["Abstract"],  # Description
-                                    presentation["Level"],
-                                    presentation["Event"],
-                                    presentation["Room"],
-                                    presentation["Time"],
-                                    presentation["Time"])
-                self.insert_presentation(talk)
-
+            return self.insert_presentations(self.__imported_presentations(presentations))
         else:
             log.info("RSS: No data found.")
+            return 0, 0
 
     def add_talks_from_csv(self, fname):
         """Adds talks from a csv file.
 
         Title and speaker must be present.
+        Returns a tuple (inserted, skipped) as reported by insert_presentations.
         """
         plugin = self.plugman.get_plugin_by_name("CSV Importer", "Importer")
         importer = plugin.plugin_object
         presentations = importer.get_presentations(fname)
 
         if presentations:
-            for presentation in presentations:
-                talk = Presentation(presentation["Title"],
-                                    presentation["Speaker"],
-                                    presentation["Abstract"],  # Description
-                                    presentation["Level"],
-                                    presentation["Event"],
-                                    presentation["Room"],
-                                    presentation["Time"],
-                                    presentation["Time"])
-                self.insert_presentation(talk)
-
+            return self.insert_presentations(self.__imported_presentations(presentations))
         else:
             log.info("CSV: No data found.")
+            return 0, 0
 
-    def export_talks_to_csv(self, fname):
+    def export_talks_to_csv(self, fname, compress=False, progress=None):
+        """Exports all talks to a csv file. See __export_to_csv for the arguments and return value."""
         fieldNames = ('Title',
                       'Speaker',
                       'Abstract',
@@ -408,28 +955,13 @@ class QtDBConnector(object):
                       'StartTime',
                       'EndTime')
 
-        try:
-            file = open(fname, 'w')
-            writer = csv.DictWriter(file, fieldnames=fieldNames)
-            headers = dict((n, n) for n in fieldNames)
-            writer.writerow(headers)
-
-            result = self.get_talks()
-            while result.next():
-                log.debug(unicode(result.value(1).toString()))
-                writer.writerow({'Title': unicode(result.value(1).toString()),
-                                 'Speaker': unicode(result.value(2).toString()),
-                                 'Abstract': unicode(result.value(3).toString()),
-                                 'Category': unicode(result.value(4).toString()),
-                                 'Event': unicode(result.value(5).toString()),
-                                 'Room': unicode(result.value(6).toString()),
-                                 'Date': unicode(result.value(7).toString()),
-                                 'StartTime': unicode(result.value(8).toString()),
-                                 'EndTime': unicode(result.value(9).toString())})
-        finally:
-            file.close()
+        return self.__export_to_csv(fname, fieldNames,
+                                    '''SELECT Title, Speaker, Description, Category, Event, Room, Date, StartTime, EndTime
+                                       FROM presentations''',
+                                    compress, progress)
 
-    def export_reports_to_csv(self, fname):
+    def export_reports_to_csv(self, fname, compress=False, progress=None):
+        """Exports all failure reports to a csv file. See __export_to_csv for the arguments and return value."""
         fieldNames = ('Title',
                       'Speaker',
                       'Abstract',
@@ -441,42 +973,80 @@ class QtDBConnector(object):
                       'EndTime',
                       'Problem',
                       'Error')
+
+        return self.__export_to_csv(fname, fieldNames,
+                                    '''SELECT presentations.Title, presentations.Speaker, presentations.Description,
+                                              presentations.Category, presentations.Event, presentations.Room,
+                                              presentations.Date, presentations.StartTime, presentations.EndTime,
+                                              failures.Indicator, failures.Comments
+                                       FROM failures LEFT JOIN presentations ON presentations.Id = failures.Id''',
+                                    compress, progress)
+
+    def __export_to_csv(self, fname, fieldNames, statement, compress=False, progress=None):
+        """Streams the rows selected by statement to a csv file.
+
+        Rows are read with a forward only query and written in chunks of EXPORT_CHUNK_SIZE through a buffered
+        file, so memory use does not grow with the size of the table. The file is gzip compressed if compress
+        is True or fname ends with .gz. If given, progress is called with the number of rows written so far
+        after every chunk.
+
+        Returns the number of rows written.
+        """
+        query = QtSql.QSqlQuery(self.talkdb)
+        query.setForwardOnly(True)
+        if not query.exec_(statement):
+            log.error("Export failed: %s", query.lastError().text())
+            return 0
+
+        fname = unicode(fname)
+        columns = range(len(fieldNames))
+        rows = 0
+        file = open(fname, 'wb', EXPORT_BUFFER_SIZE)
+        if compress or fname.endswith('.gz'):
+            file = gzip.GzipFile(fileobj=file, mode='wb')
+
         try:
-            file = open(fname, 'w')
-            writer = csv.DictWriter(file, fieldnames=fieldNames)
-            headers = dict((n, n) for n in fieldNames)
-            writer.writerow(headers)
-
-            result = self.get_reports()
-            for report in result:
-                writer.writerow({'Title': report.presentation.title,
-                                 'Speaker': report.presentation.speaker,
-                                 'Abstract': report.presentation.description,
-                                 'Category': report.presentation.category,
-                                 'Event': report.presentation.event,
-                                 'Room': report.presentation.room,
-                                 'Date': report.presentation.date,
-                                 'StartTime': report.presentation.startTime,
-                                 'EndTime': report.presentation.endTime,
-                                 'Problem': report.failure.indicator,
-                                 'Error': report.failure.comment})
+            writer = csv.writer(file)
+            writer.writerow(fieldNames)
+
+            chunk = []
+            while query.next():
+                chunk.append([unicode(query.value(column).toString()).encode('utf-8') for column in columns])
+                if len(chunk) == EXPORT_CHUNK_SIZE:
+                    writer.writerows(chunk)
+                    rows += len(chunk)
+                    chunk = []
+                    if progress is not None:
+                        progress(rows)
+
+            writer.writerows(chunk)
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows)
         finally:
+            query.finish()
             file.close()
+            if isinstance(file, gzip.GzipFile):
+                file.fileobj.close()
+
+        log.info("Exported %d rows to %s", rows, fname)
+        return rows
 
     #
     # Reporting Feature
     #
     def __create_failures_table(self, schema=REPORTS_SCHEMA_300):
         """Creates the failures table in the database. Should be used to initialize a new table"""
-        QtSql.QSqlQuery(schema)
+        QtSql.QSqlQuery(schema, self.talkdb)
 
     def clear_report_db(self):
         """Drops the failures (reports) table from the database"""
-        QtSql.QSqlQuery('''DROP TABLE IF EXISTS failures''')
+        self.__finish_queries()
+        QtSql.QSqlQuery('''DROP TABLE IF EXISTS failures''', self.talkdb)
 
     def get_report(self, talkid):
         """Returns a failure from a given talkid. Returned value is a Failure object"""
-        result = QtSql.QSqlQuery('''SELECT * FROM failures WHERE Id = "%s"''' % talkid)
+        result = self.__execute('''SELECT * FROM failures WHERE Id = ?''', (talkid,))
         if result.next():
             failure = Failure(unicode(result.value(0).toString()),  # id
                               unicode(result.value(1).toString()),  # comment
@@ -484,47 +1054,63 @@ class QtDBConnector(object):
                               result.value(3).toBool())             # release
         else:
             failure = None
+        result.finish()
         return failure
 
     def get_reports(self):
         """Returns a list of failures in Report format"""
-        result = QtSql.QSqlQuery('''Select * FROM failures''')
-        list = []
+        return list(self.iter_reports())
+
+    def iter_reports(self):
+        """Yields every failure in Report format.
+
+        Failures and their presentations are loaded by a single JOIN instead of one query per failure.
+        The presentation of a Report is None if its talk no longer exists. The query is not cached, so several
+        iterations may run at once.
+        """
+        result = self.__execute('''SELECT failures.Id, failures.Comments, failures.Indicator, failures.Release,
+                                        presentations.Id, presentations.Title, presentations.Speaker,
+                                        presentations.Description, presentations.Category, presentations.Event,
+                                        presentations.Room, presentations.Date, presentations.StartTime,
+                                        presentations.EndTime
+                                 FROM failures LEFT JOIN presentations ON presentations.Id = failures.Id''',
+                                cached=False)
         while result.next():
             failure = Failure(unicode(result.value(0).toString()),    # id
                               unicode(result.value(1).toString()),    # comment
                               unicode(result.value(2).toString()),    # indicator
-                              bool(result.value(3)))                  # release
-            p = self.get_presentation(failure.talkId)
-            r = Report(p, failure)
-            list.append(r)
-        return list
+                              result.value(3).toBool())               # release
+            if result.isNull(4):
+                presentation = None
+            else:
+                presentation = self.__presentation_from_result(result, 5)
+            yield Report(presentation, failure)
 
     def insert_failure(self, failure):
         """Inserts a failure into the database"""
-        QtSql.QSqlQuery(
-            '''INSERT INTO failures VALUES ("%d", "%s", "%s", %d)''' %
-            (int(failure.talkId), failure.comment, failure.indicator, failure.release))
+        self.__execute(
+            '''INSERT INTO failures VALUES (?, ?, ?, ?)''',
+            (int(failure.talkId), failure.comment, failure.indicator, int(failure.release)))
         log.info("Failure added: %s - %s" % (failure.talkId, failure.comment))
 
     def update_failure(self, talk_id, failure):
         """Updates an existing Failure in the database"""
-        QtSql.QtSqlQuery('''UPDATE failures SET Comments="%s", Indicator="%s", Release="%d" WHERE Id="%s"''' %
+        self.__execute('''UPDATE failures SET Comments=?, Indicator=?, Release=? WHERE Id=?''',
             (failure.comment,
              failure.indicator,
-             failure.release,
+             int(failure.release),
              failure.talkId))
         log.info("Failure updated: %s %s" % (failure.talkId, failure.comment))
 
     def delete_failure(self, talk_id):
         """Removes a Presentation from the database"""
-        QtSql.QSqlQuery('''DELETE FROM failures WHERE Id="%s"''' % talk_id)
+        self.__execute('''DELETE FROM failures WHERE Id=?''', (talk_id,))
         log.info("Failure %s deleted." % talk_id)
 
     def get_failures_model(self):
         """Gets the Failure reports table Model. Useful for QT GUI based Frontends to load the Model in Table Views"""
         if self.failuresModel is None:
-            self.failuresModel = QtSql.QSqlTableModel()
+            self.failuresModel = QtSql.QSqlTableModel(None, self.talkdb)
             self.failuresModel.setTable("failures")
             self.failuresModel.setEditStrategy(QtSql.QSqlTableModel.OnFieldChange)
             self.failuresModel.select()
@@ -540,21 +1126,22 @@ class QtDBConnector(object):
                                         (host varchar(255),
                                          port int,
                                          passphrase varchar(255),
-                                         UNIQUE (host, port) ON CONFLICT REPLACE)''')
+                                         UNIQUE (host, port) ON CONFLICT REPLACE)''', self.talkdb)
 
     def clear_recentconn_table(self):
         """Drops the recentconn (Controller) table from the database"""
-        QtSql.QSqlQuery('''DROP TABLE IF EXISTS recentconn''')
+        self.__finish_queries()
+        QtSql.QSqlQuery('''DROP TABLE IF EXISTS recentconn''', self.talkdb)
 
     def insert_recentconn(self, chost, cport, cpass):
         """Insert a failure into the database"""
-        QtSql.QSqlQuery('''INSERT INTO recentconn VALUES("%s", "%d", "%s")''' % (chost, cport, cpass))
+        self.__execute('''INSERT INTO recentconn VALUES(?, ?, ?)''', (chost, cport, cpass))
         log.info("Recent connection added: %s:%d" % (chost, cport))
 
     def get_recentconn_model(self):
         """Gets the Recent Connections table Model
         Useful for QT GUI based Frontends to load the Model in Table Views"""
-        self.recentconnModel = QtSql.QSqlTableModel()
+        self.recentconnModel = QtSql.QSqlTableModel(None, self.talkdb)
         self.recentconnModel.setTable("recentconn")
         self.recentconnModel.setEditStrategy(QtSql.QSqlTableModel.OnFieldChange)
         self.recentconnModel.select()
@@ -0,0 +1,171 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import logging
+import multiprocessing
+
+log = logging.getLogger(__name__)
+
+RATE_CONTROL_VALUES = ['cbr', 'quality']
+X264_SPEED_VALUES = ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow']
+
+
+def cpu_count():
+    """Returns the number of CPUs of this machine, or 1 if it cannot be found."""
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def default_threads():
+    """Returns the number of encoder threads to use when none is configured.
+
+    One core is left to the sources, mixers and muxers of the pipeline, which run in their own streaming threads.
+    """
+    return max(cpu_count() - 1, 1)
+
+
+class EncoderProfile(object):
+    """Threads, speed, keyframe interval and rate control of a video encoder, mapped to the encoder's properties.
+
+    Subclasses name the properties of one GStreamer encoder element. threads of 0 picks default_threads(),
+    a keyframe_interval of 0 (in frames) keeps the encoder's own default, bitrate is in kbit/s and quality is in the
+    encoder's own scale. Properties an installed encoder does not have are skipped, so one profile works with the
+    encoder versions shipped by different distributions.
+    """
+
+    factory = None
+    threads_property = None  # None when the encoder cannot use more than one thread
+    speed_property = None
+    keyframe_property = None
+
+    def __init__(self, threads=0, speed=None, keyframe_interval=0, rate_control='cbr', bitrate=2400, quality=None):
+        self.threads = threads or default_threads()
+        self.speed = speed
+        self.keyframe_interval = keyframe_interval
+        self.rate_control = rate_control
+        self.bitrate = bitrate
+        self.quality = quality
+
+    def properties(self):
+        """Returns the (name, value) encoder properties of this profile, in the order they should be set."""
+        properties = []
+        if self.threads_property is not None:
+            properties.append((self.threads_property, self.threads))
+        if self.speed is not None:
+            properties.append((self.speed_property, self.speed))
+        if self.keyframe_interval > 0:
+            properties.append((self.keyframe_property, self.keyframe_interval))
+        if self.rate_control == 'quality' and self.quality is not None:
+            properties.extend(self.quality_properties())
+        else:
+            properties.extend(self.bitrate_properties())
+        return properties
+
+    def bitrate_properties(self):
+        raise NotImplementedError
+
+    def quality_properties(self):
+        raise NotImplementedError
+
+    def set_bitrate(self, encoder, bitrate):
+        """Changes the bitrate of a running encoder, in kbit/s, without touching its other properties."""
+        self.bitrate = bitrate
+        encoder.set_property('bitrate', dict(self.bitrate_properties())['bitrate'])
+
+    def apply(self, encoder):
+        """Sets the properties of this profile on an encoder element made from factory."""
+        for name, value in self.properties():
+            try:
+                encoder.set_property(name, value)
+            except TypeError:
+                log.debug("%s has no property '%s' or does not accept %r, skipping it.", self.factory, name, value)
+
+
+class TheoraProfile(EncoderProfile):
+    """theoraenc. libtheora encodes on a single thread, so speed-level is the only way to lower its CPU use."""
+
+    factory = 'theoraenc'
+    speed_property = 'speed-level'
+    keyframe_property = 'keyframe-freq'
+
+    def bitrate_properties(self):
+        return [('bitrate', self.bitrate)]
+
+    def quality_properties(self):
+        return [('bitrate', 0), ('quality', self.quality)]
+
+
+class VP8Profile(EncoderProfile):
+    """vp8enc, encoding in real time with one token partition per thread."""
+
+    factory = 'vp8enc'
+    threads_property = 'threads'
+    speed_property = 'speed'
+    keyframe_property = 'max-keyframe-distance'
+
+    MODE_VBR = 0
+    MODE_CBR = 1
+    DEADLINE_REALTIME = 1
+
+    def properties(self):
+        properties = super(VP8Profile, self).properties()
+        # token-partitions is a power of two, it is what lets the decoder, and the encoder, use several threads
+        partitions = 0
+        while partitions < 3 and 2 ** (partitions + 1) <= self.threads:
+            partitions += 1
+        properties.extend([('deadline', self.DEADLINE_REALTIME), ('token-partitions', partitions)])
+        return properties
+
+    def bitrate_properties(self):
+        return [('mode', self.MODE_CBR), ('bitrate', self.bitrate * 1000)]
+
+    def quality_properties(self):
+        return [('mode', self.MODE_VBR), ('quality', float(self.quality))]
+
+
+class X264Profile(EncoderProfile):
+    """x264enc. speed is the name of an x264 preset, one of X264_SPEED_VALUES, and tune an x264 tuning or 'none'."""
+
+    factory = 'x264enc'
+    threads_property = 'threads'
+    speed_property = 'speed-preset'
+    keyframe_property = 'key-int-max'
+
+    def __init__(self, tune='none', **kwargs):
+        super(X264Profile, self).__init__(**kwargs)
+        self.tune = tune
+
+    def properties(self):
+        properties = super(X264Profile, self).properties()
+        if self.tune != 'none':
+            properties.append(('tune', self.tune))
+        return properties
+
+    def bitrate_properties(self):
+        return [('pass', 'cbr'), ('bitrate', self.bitrate)]
+
+    def quality_properties(self):
+        return [('pass', 'qual'), ('quantizer', self.quality)]
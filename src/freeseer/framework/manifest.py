@@ -0,0 +1,70 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import datetime
+import json
+import os
+
+
+class RecordingManifest(object):
+    """List of the segment files of one recording, saved as JSON next to them.
+
+    The manifest is rewritten whenever a segment starts or is finalized, so finished segments can be picked up by
+    other tools while the recording continues. The file is replaced atomically so it is never read half written.
+    """
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.metadata = metadata or {}
+        self.segments = []  # Dictionaries of filename, started and complete
+
+    def add_segment(self, file_path):
+        """Lists a segment that started recording to file_path."""
+        self.segments.append({'filename': os.path.basename(file_path),
+                              'started': datetime.datetime.now().isoformat(),
+                              'complete': False})
+        self.save()
+
+    def finish_segment(self, file_path):
+        """Marks the segment recorded to file_path as complete, or drops it if the file was removed for being empty."""
+        filename = os.path.basename(file_path)
+        if os.path.exists(file_path):
+            for segment in self.segments:
+                if segment['filename'] == filename:
+                    segment['complete'] = True
+        else:
+            self.segments = [segment for segment in self.segments if segment['filename'] != filename]
+        self.save()
+
+    def save(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as manifest_fd:
+            manifest_fd.write(json.dumps({'metadata': self.metadata, 'segments': self.segments},
+                                         sort_keys=True,
+                                         indent=4,
+                                         separators=(',', ': ')))
+        if os.name == 'nt' and os.path.exists(self.path):
+            # Renaming does not replace an existing file on Windows
+            os.remove(self.path)
+        os.rename(temp_path, self.path)
@@ -0,0 +1,181 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import logging
+import threading
+
+import gobject
+import pygst
+pygst.require("0.10")
+import gst
+
+log = logging.getLogger(__name__)
+
+
+def queue_levels(queue):
+    """Returns the current level of a queue in buffers, bytes and time, and how full it is from 0 to 1.
+
+    A queue is full as soon as any of its limits is reached, a limit of 0 meaning unlimited.
+    """
+    levels = {'fill': 0.0}
+    for unit in ('buffers', 'bytes', 'time'):
+        level = queue.get_property('current-level-' + unit)
+        limit = queue.get_property('max-size-' + unit)
+        levels[unit] = level
+        if limit:
+            levels['fill'] = max(levels['fill'], float(level) / limit)
+    return levels
+
+
+class PipelineMonitor(object):
+    """Samples the health of a running pipeline to spot elements falling behind before a recording is ruined.
+
+    A sample holds the fill level and overrun count of every queue, the counters of every videorate element and
+    the latency of the pipeline. Samples are taken every interval seconds from the gobject main loop, and queues
+    close to full, queue overruns and dropped frames are logged as warnings. Overruns are counted for the queues
+    in the pipeline when it starts and for the elements passed to watch() afterwards, until forget() is called.
+    """
+
+    QUEUE_WARNING_FILL = 0.8  # Fraction of any of its limits above which a queue is reported
+
+    def __init__(self, pipeline, interval=10):
+        self.pipeline = pipeline
+        self.interval = interval
+        self.last_sample = None
+
+        self._timer = None
+        self._lock = threading.Lock()
+        self._overruns = {}  # Queue path -> number of overruns
+        self._handlers = {}  # Queue -> (queue path, id of its overrun handler)
+        self._reported = {}  # Element path -> overruns or dropped frames at the last report
+
+    def start(self):
+        """Starts sampling the pipeline every interval seconds."""
+        self.watch(self.pipeline)
+        if self._timer is None and self.interval > 0:
+            self._timer = gobject.timeout_add_seconds(self.interval, self._on_timeout)
+
+    def stop(self):
+        if self._timer is not None:
+            gobject.source_remove(self._timer)
+            self._timer = None
+        self.forget(self.pipeline)
+
+    def watch(self, element):
+        """Counts the overruns of a queue, or of every queue in a bin, added to the pipeline."""
+        for queue in self._elements(element):
+            factory = queue.get_factory()
+            if factory is None or factory.get_name() != 'queue' or queue in self._handlers:
+                continue
+            path = queue.get_path_string()
+            with self._lock:
+                self._overruns[path] = 0
+            self._handlers[queue] = path, queue.connect('overrun', self._on_overrun, path)
+
+    def forget(self, element):
+        """Drops the counters of an element, or of every element in a bin, before it leaves the pipeline."""
+        for child in self._elements(element):
+            if child in self._handlers:
+                path, handler = self._handlers.pop(child)
+                child.disconnect(handler)
+                with self._lock:
+                    del self._overruns[path]
+            else:
+                path = child.get_path_string()
+            self._reported.pop(path, None)
+
+    def _elements(self, element):
+        if isinstance(element, gst.Bin):
+            return [element] + list(element.recurse())
+        return [element]
+
+    def _on_timeout(self):
+        self.report(self.sample())
+        return True
+
+    def sample(self):
+        """Returns a dictionary of the queue levels, videorate counters and latency of the pipeline.
+
+        queues and videorates map the path of each element in the pipeline to its counters. latency is None if
+        the pipeline could not answer the latency query, which happens until it is PLAYING.
+        """
+        queues = {}
+        videorates = {}
+        for element in self.pipeline.recurse():
+            factory = element.get_factory()
+            if factory is None:
+                continue
+
+            if factory.get_name() == 'queue':
+                queues[element.get_path_string()] = self._sample_queue(element)
+            elif factory.get_name() == 'videorate':
+                videorates[element.get_path_string()] = dict(
+                    (name, element.get_property(name)) for name in ('in', 'out', 'drop', 'duplicate'))
+
+        self.last_sample = {'queues': queues, 'videorates': videorates, 'latency': self._sample_latency()}
+        return self.last_sample
+
+    def _sample_queue(self, queue):
+        with self._lock:
+            counters = {'overruns': self._overruns.get(queue.get_path_string(), 0)}
+
+        counters.update(queue_levels(queue))
+        return counters
+
+    def _on_overrun(self, queue, path):
+        # Called from the streaming thread of the queue, possibly right after forget()
+        with self._lock:
+            if path in self._overruns:
+                self._overruns[path] += 1
+
+    def _sample_latency(self):
+        query = gst.query_new_latency()
+        if not self.pipeline.query(query):
+            return None
+        live, min_latency, max_latency = query.parse_latency()
+        return {'live': live, 'min': min_latency, 'max': max_latency}
+
+    def _increase(self, path, count):
+        """Returns how much count increased since the last report of the element at path."""
+        increase = count - self._reported.get(path, 0)
+        self._reported[path] = count
+        return increase
+
+    def report(self, sample):
+        """Logs the problems found in a sample."""
+        for path, counters in sorted(sample['queues'].iteritems()):
+            if counters['fill'] >= self.QUEUE_WARNING_FILL:
+                log.warning("Queue %s is %d%% full, the elements after it are falling behind.",
+                            path, counters['fill'] * 100)
+            overruns = self._increase(path, counters['overruns'])
+            if overruns > 0:
+                log.warning("Queue %s overran %d times, data was dropped or upstream was blocked.", path, overruns)
+
+        for path, counters in sorted(sample['videorates'].iteritems()):
+            dropped = self._increase(path, counters['drop'])
+            if dropped > 0:
+                log.warning("%s dropped %d frames.", path, dropped)
+
+        if sample['latency'] is not None:
+            log.debug("Pipeline latency: %d to %d ns.", sample['latency']['min'], sample['latency']['max'])
@@ -25,6 +25,7 @@
 import datetime
 import logging
 import os
+import time
 
 import gobject
 gobject.threads_init()
@@ -32,8 +33,16 @@ import pygst
 pygst.require("0.10")
 import gst
 
+from freeseer.framework.bitrate import BitrateController
+from freeseer.framework.buffering import BufferPolicy
+from freeseer.framework.buffering import StreamGuard
+from freeseer.framework.buffering import insert_stream_buffer
+from freeseer.framework.manifest import RecordingManifest
+from freeseer.framework.monitor import PipelineMonitor
+from freeseer.framework.monitor import queue_levels
 from freeseer.framework.presentation import Presentation
 from freeseer.framework.plugin import IOutput
+from freeseer.framework.reconnect import StreamReconnector
 from freeseer.framework.util import get_record_name
 
 log = logging.getLogger(__name__)
@@ -45,6 +54,10 @@ class Multimedia:
     PAUSE = 'PAUSE'
     STOP = 'STOP'
 
+    SEGMENT_CHECK_INTERVAL = 5  # Seconds between two checks of the length of the current segment
+    DETACH_TIMEOUT = 5  # Seconds shutdown() waits for the outputs being detached to be finalized
+    AUDIO_LEVEL_INTERVAL = 100 * gst.MSECOND  # Time between two audio level messages, the UI refresh rate
+
     def __init__(self, config, plugman, window_id=None, audio_feedback=None, cli=False):
         self.config = config
         self.plugman = plugman
@@ -56,6 +69,40 @@ class Multimedia:
         self.record_video = False
 
         self.current_state = Multimedia.NULL
+        # Lists of the RMS and peak level in dB of every audio channel, updated by level messages
+        self.audio_levels = {'rms': [], 'peak': []}
+        self.presentation = None
+        # Name the recording was started with when it records to a filename rather than a presentation
+        self.record_filename = None
+        self.file_path = None
+
+        self.output_plugins = []
+        # Output plugin name -> bin of the outputs linked to the tees
+        self.output_names = {}
+        # Output bins recording to file, replaced at every recording in preroll mode
+        self.file_outputs = []
+        # (plugin, bin) of the file outputs built by load_backend while prerolled, attached by record()
+        self.pending_outputs = []
+        # Sinks keeping the tees flowing while no file output is attached in preroll mode
+        self.preroll_sinks = []
+        # Output bins unlinked from the tees that are finishing their recording
+        self.detaching_outputs = set()
+        # True while the sources and mixers keep running between two recordings in preroll mode
+        self.prerolled = False
+        # (encoder factory, encoder properties) -> (queue, encoder, tee) encoding the video once for every output
+        # using that codec with the same settings
+        self.video_encoders = {}
+        # Output plugin name -> BitrateController of the stream outputs adapting their bitrate to their connection
+        self.bitrate_controllers = {}
+        # StreamGuard -> StreamReconnector of the stream outputs buffering through network outages
+        self.stream_guards = {}
+
+        # Manifest of the current segmented recording, None if recordings are not segmented
+        self.manifest = None
+        # Segment file path -> manifest, for the segments still being recorded or finalized
+        self.manifests = {}
+        self.segment_started = None
+        self.segment_timer = None
 
         # Initialize Player
         self.player = gst.Pipeline('player')
@@ -65,12 +112,21 @@ class Multimedia:
         bus.connect('message', self.on_message)
         bus.connect('sync-message::element', self.on_sync_message)
 
+        self.monitor = PipelineMonitor(self.player, self.config.health_check_interval)
+
         # Initialize Entry Points
         self.audio_tee = gst.element_factory_make('tee', 'audio_tee')
         self.video_tee = gst.element_factory_make('tee', 'video_tee')
         self.player.add(self.audio_tee)
         self.player.add(self.video_tee)
 
+        # Audio levels are measured once, before the audio is split between the outputs
+        self.audio_level = gst.element_factory_make('level', 'audio_level')
+        self.audio_level.set_property('interval', Multimedia.AUDIO_LEVEL_INTERVAL)
+        self.audio_level.set_property('message', audio_feedback is not None)
+        self.player.add(self.audio_level)
+        self.audio_level.link(self.audio_tee)
+
         log.debug("Gstreamer initialized.")
 
     ##
@@ -80,7 +136,7 @@ class Multimedia:
         t = message.type
 
         if t == gst.MESSAGE_EOS:
-            self.stop()
+            self.shutdown()
 
         elif t == gst.MESSAGE_ERROR:
             err, debug = message.parse_error()
@@ -90,13 +146,15 @@ class Multimedia:
             s = message.structure.get_name()
 
             if s == 'level' and self.audio_feedback_event is not None:
-                msg = message.structure.to_string()
-                rms_dB = float(msg.split(',')[6].split('{')[1].rstrip('}'))
+                self.audio_levels = {'rms': list(message.structure['rms']),
+                                     'peak': list(message.structure['peak'])}
+                if not self.audio_levels['rms']:
+                    return
 
                 # This is an inaccurate representation of decibels into percent
                 # conversion, this code should be revisited.
                 try:
-                    percent = (int(round(rms_dB)) + 50) * 2
+                    percent = (int(round(max(self.audio_levels['rms']))) + 50) * 2
                 except OverflowError:
                     percent = 0
                 self.audio_feedback_event(percent)
@@ -118,6 +176,8 @@ class Multimedia:
     def set_audio_feedback_handler(self, audio_feedback):
         """Sets the handler for Audio Feedback levels"""
         self.audio_feedback_event = audio_feedback
+        # Level messages are only posted while someone listens to them
+        self.audio_level.set_property('message', audio_feedback is not None)
 
     ##
     ## Recording functions
@@ -126,7 +186,17 @@ class Multimedia:
         """
         Start recording.
         """
+        for plugin, bin in self.pending_outputs:
+            self.attach_output(plugin, bin)
+            self.file_outputs.append(bin)
+        self.pending_outputs = []
+
+        if self.manifest is not None and self.segment_timer is None:
+            self.segment_started = time.time()
+            self.segment_timer = gobject.timeout_add_seconds(Multimedia.SEGMENT_CHECK_INTERVAL, self.check_segment)
+
         self.player.set_state(gst.STATE_PLAYING)
+        self.monitor.start()
         self.current_state = Multimedia.RECORD
         log.debug("Recording started.")
 
@@ -141,23 +211,72 @@ class Multimedia:
     def stop(self):
         """
         Stop recording.
+
+        In preroll mode only the file outputs are stopped. The sources and mixers keep running so the next
+        recording starts without reopening the devices, until shutdown() is called.
         """
-        if self.current_state != Multimedia.NULL and self.current_state != Multimedia.STOP:
-            self.player.set_state(gst.STATE_NULL)
+        if self.current_state == Multimedia.NULL or self.current_state == Multimedia.STOP:
+            return
 
-            self.unload_audiomixer()
-            self.unload_videomixer()
-            self.unload_output_plugins()
+        if not self.config.preroll:
+            self.shutdown()
+            return
 
-            self.current_state = Multimedia.STOP
+        self.stop_segment_timer()
 
-            try:
-                if not os.path.getsize(self.file_path):
-                    os.remove(self.file_path)
-            except OSError:
-                pass
+        # Data must flow through the tees for the file outputs to be unlinked and finalized
+        self.player.set_state(gst.STATE_PLAYING)
+        for bin in self.file_outputs:
+            self.detach_output(bin, self.file_path)
+        self.file_outputs = []
+
+        self.prerolled = True
+        self.current_state = Multimedia.STOP
+        log.debug("File outputs stopped, sources still running.")
 
-            log.debug("Gstreamer stopped.")
+    def shutdown(self):
+        """
+        Stop recording and every source, releasing the devices.
+
+        Outputs detached by a previous stop() are given up to DETACH_TIMEOUT seconds to receive their end of stream
+        before the pipeline stops, so their files are finalized.
+        """
+        if self.current_state == Multimedia.NULL or (self.current_state == Multimedia.STOP and not self.prerolled):
+            return
+
+        self.wait_for_detached_outputs(Multimedia.DETACH_TIMEOUT)
+        self.stop_segment_timer()
+        self.monitor.stop()
+        self.player.set_state(gst.STATE_NULL)
+
+        self.unload_audiomixer()
+        self.unload_videomixer()
+        self.unload_output_plugins()
+        self.unload_preroll_sinks()
+        for bin in list(self.detaching_outputs):
+            self.release_output(bin)
+        self.pending_outputs = []
+        self.prerolled = False
+
+        self.current_state = Multimedia.STOP
+        self.remove_empty_file(self.file_path)
+        for file_path, manifest in self.manifests.items():
+            manifest.finish_segment(file_path)
+        self.manifests = {}
+
+        log.debug("Gstreamer stopped.")
+
+    def get_health(self):
+        """Returns a PipelineMonitor sample of the queue levels, dropped frames and latency of the pipeline."""
+        return self.monitor.sample()
+
+    def remove_empty_file(self, file_path):
+        """Removes a recording that did not receive any data."""
+        try:
+            if not os.path.getsize(file_path):
+                os.remove(file_path)
+        except (OSError, TypeError):
+            pass
 
     def prepare_metadata(self, presentation):
         """Returns a dictionary of tags and tag values.
@@ -177,9 +296,10 @@ class Multimedia:
     ##
 
     def load_backend(self, presentation=None, filename=None):
-        log.debug("Loading Output plugins...")
+        if self.prerolled:
+            return self.load_file_outputs(presentation, filename)
 
-        filename_for_frontend = None
+        log.debug("Loading Output plugins...")
 
         load_plugins = []
 
@@ -199,37 +319,10 @@ class Multimedia:
             p = self.plugman.get_plugin_by_name("Video Preview", "Output")
             load_plugins.append(p)
 
-        plugins = []
-        for plugin in load_plugins:
-            log.debug("Loading Output: %s", plugin.plugin_object.get_name())
-
-            extension = plugin.plugin_object.get_extension()
-
-            # Create a filename to record to.
-            if presentation is None and filename is not None:
-                record_name = get_record_name(extension, filename=filename, path=self.config.videodir)
-                presentation = Presentation(filename)
-            elif presentation is not None:
-                record_name = get_record_name(extension, presentation=presentation, path=self.config.videodir)
-            else:
-                # Invalid combination you must pass in a presentation or a filename
-                logging.error("Failed to configure recording name. No presentation or filename provided.")
-                return False
-
-            # This is to ensure that we don't log a message when extension is None
-            if extension is not None:
-                log.info('Set record name to %s', record_name)
-                filename_for_frontend = record_name
-
-            # Prepare metadata.
-            metadata = self.prepare_metadata(presentation)
-            #self.populate_metadata(data)
-
-            record_location = os.path.abspath(self.config.videodir + '/' + record_name)
-            plugin.plugin_object.set_recording_location(record_location)
-
-            plugin.plugin_object.load_config(self.plugman)
-            plugins.append(plugin.plugin_object)
+        prepared = self.prepare_output_plugins(load_plugins, presentation, filename)
+        if not prepared:
+            return False
+        plugins, metadata, filename_for_frontend = prepared
 
         if not self.load_output_plugins(plugins,
                                         self.config.enable_audio_recording,
@@ -283,39 +376,186 @@ class Multimedia:
                     self.unload_audiomixer()
                     return False
 
+        if self.config.preroll:
+            self.load_preroll_sinks()
+
+        if filename_for_frontend is not None:
+            self.file_path = os.path.join(self.config.videodir, filename_for_frontend)
+        self.load_manifest(metadata)
+        return True, filename_for_frontend
+
+    def prepare_output_plugins(self, load_plugins, presentation=None, filename=None):
+        """Sets the recording location and configuration of Output plugins.
+
+        Returns a tuple of the plugin objects, the recording metadata and the name of the file recorded to,
+        or False if neither a presentation nor a filename is given.
+        """
+        filename_for_frontend = None
+        metadata = None
+
+        plugins = []
+        for plugin in load_plugins:
+            log.debug("Loading Output: %s", plugin.plugin_object.get_name())
+
+            extension = plugin.plugin_object.get_extension()
+
+            # Create a filename to record to.
+            if presentation is None and filename is not None:
+                record_name = get_record_name(extension, filename=filename, path=self.config.videodir)
+                presentation = Presentation(filename)
+            elif presentation is not None:
+                record_name = get_record_name(extension, presentation=presentation, path=self.config.videodir)
+            else:
+                # Invalid combination you must pass in a presentation or a filename
+                logging.error("Failed to configure recording name. No presentation or filename provided.")
+                return False
+
+            # This is to ensure that we don't log a message when extension is None
+            if extension is not None:
+                log.info('Set record name to %s', record_name)
+                filename_for_frontend = record_name
+
+            # Prepare metadata.
+            metadata = self.prepare_metadata(presentation)
+            #self.populate_metadata(data)
+
+            record_location = os.path.abspath(self.config.videodir + '/' + record_name)
+            plugin.plugin_object.set_recording_location(record_location)
+
+            plugin.plugin_object.load_config(self.plugman)
+            plugins.append(plugin.plugin_object)
+
+        if presentation is not None:
+            # Outputs added while recording record the same presentation
+            self.presentation = presentation
+            self.record_filename = filename
+        return plugins, metadata, filename_for_frontend
+
+    def prepare_running_output(self, plugin):
+        """Prepares an Output plugin added to the current recording.
+
+        The output is named after the presentation or the filename the recording was started with.
+        """
+        if self.record_filename is not None:
+            return self.prepare_output_plugins([plugin], filename=self.record_filename)
+        return self.prepare_output_plugins([plugin], self.presentation)
+
+    def load_file_outputs(self, presentation=None, filename=None):
+        """Builds the file output of the next recording while the sources keep running in preroll mode.
+
+        The output is attached to the running pipeline by record().
+        """
+        log.debug("Loading file Output plugin...")
+
+        load_plugins = []
+        if self.config.record_to_file:
+            load_plugins.append(self.plugman.get_plugin_by_name(self.config.record_to_file_plugin, "Output"))
+
+        prepared = self.prepare_output_plugins(load_plugins, presentation, filename)
+        if not prepared:
+            return False
+        plugins, metadata, filename_for_frontend = prepared
+
+        self.pending_outputs = []
+        for plugin in plugins:
+            bin = self.get_output_bin(plugin, self.record_audio, self.record_video, metadata)
+            if not bin:
+                log.error("Failed to load Output plugin: bin returned None")
+                self.pending_outputs = []
+                return False
+            self.pending_outputs.append((plugin, bin))
+
         if filename_for_frontend is not None:
             self.file_path = os.path.join(self.config.videodir, filename_for_frontend)
+        self.load_manifest(metadata)
         return True, filename_for_frontend
 
     def load_output_plugins(self, plugins, record_audio, record_video, metadata):
         self.output_plugins = []
+        self.file_outputs = []
         for plugin in plugins:
-            type = plugin.get_type()
-            bin = plugin.get_output_bin(record_audio, record_video, metadata)
+            bin = self.get_output_bin(plugin, record_audio, record_video, metadata)
 
             if not bin:
                 log.error("Failed to load Output plugin: bin returned None")
                 self.unload_output_plugins()
                 return False
 
-            if type == IOutput.AUDIO:
-                if record_audio:
-                    self.player.add(bin)
-                    self.audio_tee.link(bin)
-                    self.output_plugins.append(bin)
-            elif type == IOutput.VIDEO:
-                if record_video:
-                    self.player.add(bin)
-                    self.video_tee.link(bin)
-                    self.output_plugins.append(bin)
-            elif type == IOutput.BOTH:
-                self.player.add(bin)
-                if record_audio:
-                    self.audio_tee.link_pads("src%d", bin, "audiosink")
-                if record_video:
-                    self.video_tee.link_pads("src%d", bin, "videosink")
+            if self.link_output(plugin, bin, record_audio, record_video):
                 self.output_plugins.append(bin)
+                self.output_names[plugin.get_name()] = bin
+                if plugin.get_recordto() == IOutput.FILE:
+                    self.file_outputs.append(bin)
+                self.start_bitrate_controller(plugin, record_audio, record_video)
+
+        return True
+
+    def get_output_bin(self, plugin, record_audio, record_video, metadata):
+        """Returns the output bin of an Output plugin with its buffer policy set on its queues.
+
+        The video encoder of the bin is left out if the encoder is shared.
+        """
+        shared = self.get_shared_encoder_profile(plugin, record_video) is not None
+        if shared:
+            bin = plugin.get_output_bin(record_audio, record_video, metadata, encode_video=False)
+        else:
+            bin = plugin.get_output_bin(record_audio, record_video, metadata)
 
+        policy = self.get_buffer_policy(plugin)
+        if bin and policy is not None:
+            policy.apply(bin)
+            if shared and policy.leaky != 'no':
+                # The video reaching the bin is already encoded, dropping some of it would corrupt the frames
+                # depending on it. link_video_encoder drops raw video in front of the encoder instead.
+                queue = bin.get_pad('videosink').get_target().get_parent_element()
+                BufferPolicy(policy.max_time, policy.max_bytes).apply_queue(queue)
+
+        if bin and plugin.get_recordto() == IOutput.STREAM and self.config.stream_buffer_size > 0:
+            for guard in insert_stream_buffer(bin, self.config.stream_buffer_size * 1024 * 1024,
+                                              self._on_stream_disconnected):
+                self.stream_guards[guard] = StreamReconnector()
+        return bin
+
+    def get_buffer_policy(self, plugin):
+        """Returns the BufferPolicy of an Output plugin, or None to leave its queues as the plugin set them.
+
+        Unless the plugin has its own, file outputs never drop data while stream outputs drop data once their
+        buffer is full, so a slow network never stalls the tees and with them the recording to file.
+        """
+        policy = plugin.get_buffer_policy()
+        if policy is None:
+            if plugin.get_recordto() == IOutput.FILE:
+                policy = BufferPolicy(self.config.file_buffer_time)
+            elif plugin.get_recordto() == IOutput.STREAM:
+                policy = BufferPolicy(self.config.stream_buffer_time, leaky=self.config.stream_buffer_leaky)
+        return policy
+
+    def link_output(self, plugin, bin, record_audio, record_video):
+        """Adds an output bin to the pipeline and links it to the tees. Returns False if the bin is not used."""
+        type = plugin.get_type()
+        profile = self.get_shared_encoder_profile(plugin, record_video)
+        if profile is not None:
+            self.player.add(bin)
+            if record_audio and type == IOutput.BOTH:
+                self.audio_tee.link_pads("src%d", bin, "audiosink")
+            policy = self.get_buffer_policy(plugin)
+            self.link_video_encoder(profile, bin, 'no' if policy is None else policy.leaky)
+        elif type == IOutput.AUDIO:
+            if not record_audio:
+                return False
+            self.player.add(bin)
+            self.audio_tee.link(bin)
+        elif type == IOutput.VIDEO:
+            if not record_video:
+                return False
+            self.player.add(bin)
+            self.video_tee.link(bin)
+        elif type == IOutput.BOTH:
+            self.player.add(bin)
+            if record_audio:
+                self.audio_tee.link_pads("src%d", bin, "audiosink")
+            if record_video:
+                self.video_tee.link_pads("src%d", bin, "videosink")
         return True
 
     def unload_output_plugins(self):
@@ -323,6 +563,520 @@ class Multimedia:
             self.video_tee.unlink(plugin)
             self.audio_tee.unlink(plugin)
             self.player.remove(plugin)
+        self.output_plugins = []
+        self.output_names = {}
+        self.file_outputs = []
+        self.unload_video_encoders()
+        for controller in self.bitrate_controllers.values():
+            controller.stop()
+        self.bitrate_controllers = {}
+        for reconnector in self.stream_guards.values():
+            reconnector.stop()
+        self.stream_guards = {}
+
+    ##
+    ## Shared encoders
+    ##
+
+    def get_shared_encoder_profile(self, plugin, record_video):
+        """Returns the EncoderProfile of an Output plugin if its video is encoded by a shared encoder, else None."""
+        if not (self.config.share_encoders and record_video):
+            return None
+        if plugin.get_adaptive_bitrate() is not None:
+            # The bitrate of the output changes with its connection, it cannot be shared with other outputs
+            return None
+        return plugin.get_encoder_profile()
+
+    def link_video_encoder(self, profile, bin, leaky='no'):
+        """Links the videosink pad of an output bin to the shared encoder of the codec of profile.
+
+        The first output using a codec adds its encoder to the pipeline and configures it, outputs using the same
+        codec with the same settings afterwards record what it encodes. An output joining an encoder that is already
+        in use asks it for a keyframe, so its recording starts with one.
+
+        Encoded video cannot be dropped, so an output whose queues are leaky makes the queue in front of the encoder
+        drop raw video instead. The outputs sharing the encoder then lose frames rather than stalling the pipeline.
+        """
+        key = (profile.factory, tuple(profile.properties()))
+        encoder = self.video_encoders.get(key)
+        joined = encoder is not None
+        if not joined:
+            queue = gst.element_factory_make('queue')
+            # The queue feeds the file outputs as well, it must not drop data
+            BufferPolicy(self.config.file_buffer_time).apply_queue(queue)
+            codec = gst.element_factory_make(profile.factory)
+            profile.apply(codec)
+            tee = gst.element_factory_make('tee')
+            self.player.add(queue, codec, tee)
+            gst.element_link_many(queue, codec, tee)
+            self.video_tee.link(queue)
+            self.monitor.watch(queue)
+            encoder = self.video_encoders[key] = (queue, codec, tee)
+            log.debug("Shared %s encoder added to pipeline.", profile.factory)
+
+        queue, codec, tee = encoder
+        if leaky != 'no':
+            queue.set_property('leaky', leaky)
+        tee.link_pads("src%d", bin, "videosink")
+        for element in encoder:
+            element.sync_state_with_parent()
+
+        if joined and (self.current_state == Multimedia.RECORD or self.prerolled):
+            structure = gst.Structure('GstForceKeyUnit')
+            structure['all-headers'] = True
+            codec.get_pad('src').send_event(gst.event_new_custom(gst.EVENT_CUSTOM_UPSTREAM, structure))
+
+    def release_video_encoders(self):
+        """Removes the shared encoders no output records from anymore."""
+        for key, encoder in self.video_encoders.items():
+            queue, codec, tee = encoder
+            if [pad for pad in tee.src_pads() if pad.is_linked()]:
+                continue
+
+            del self.video_encoders[key]
+            tee_pad = queue.get_pad('sink').get_peer()
+            if self.current_state == Multimedia.RECORD or self.prerolled:
+                # Video keeps flowing through the video tee, the pad is blocked before the encoder is unlinked
+                tee_pad.set_blocked_async(True, self._on_video_encoder_blocked, encoder)
+            else:
+                tee_pad.unlink(queue.get_pad('sink'))
+                self._remove_video_encoder(tee_pad, encoder)
+
+    def unload_video_encoders(self):
+        for queue, codec, tee in self.video_encoders.values():
+            self.video_tee.unlink(queue)
+            for element in (queue, codec, tee):
+                self.player.remove(element)
+        self.video_encoders = {}
+
+    def _on_video_encoder_blocked(self, tee_pad, blocked, encoder):
+        # Called from the streaming thread of the video tee pad
+        if not blocked:
+            return
+        tee_pad.unlink(encoder[0].get_pad('sink'))
+        tee_pad.set_blocked_async(False, lambda *args: None)
+        gobject.idle_add(self._remove_video_encoder, tee_pad, encoder)
+
+    def _remove_video_encoder(self, tee_pad, encoder):
+        self._release_tee_pad(tee_pad)
+        for element in encoder:
+            self.monitor.forget(element)
+            element.set_state(gst.STATE_NULL)
+            self.player.remove(element)
+        log.debug("Shared encoder removed from pipeline.")
+        return False
+
+    ##
+    ## Preroll
+    ##
+
+    def load_preroll_sinks(self):
+        """Links a fakesink to every tee in use so data keeps flowing while no file output is attached."""
+        for tee, used in ((self.audio_tee, self.record_audio), (self.video_tee, self.record_video)):
+            if used:
+                sink = gst.element_factory_make('fakesink')
+                sink.set_property('sync', False)
+                sink.set_property('async', False)
+                self.player.add(sink)
+                tee.link(sink)
+                self.preroll_sinks.append(sink)
+
+    def unload_preroll_sinks(self):
+        for sink in self.preroll_sinks:
+            self.audio_tee.unlink(sink)
+            self.video_tee.unlink(sink)
+            self.player.remove(sink)
+        self.preroll_sinks = []
+
+    ##
+    ## Live outputs
+    ##
+
+    def add_output(self, name):
+        """Starts an Output plugin, such as a stream or the preview, without restarting the sources.
+
+        The output records the presentation of the current recording. It may be added once the backend is loaded,
+        before or while recording. Returns False if the backend is not loaded, the plugin is already running or
+        fails to load.
+        """
+        if not (self.record_audio or self.record_video):
+            # load_backend would start over with its own outputs and leave this one out
+            log.warning("Output %s cannot be added before the backend is loaded.", name)
+            return False
+
+        if name in self.output_names:
+            log.warning("Output %s is already running.", name)
+            return False
+
+        plugin = self.plugman.get_plugin_by_name(name, "Output")
+        if plugin is None:
+            log.error("Failed to load Output plugin: %s not found", name)
+            return False
+
+        prepared = self.prepare_running_output(plugin)
+        if not prepared:
+            return False
+        plugins, metadata, filename_for_frontend = prepared
+
+        bin = self.get_output_bin(plugin.plugin_object, self.record_audio, self.record_video, metadata)
+        if not bin:
+            log.error("Failed to load Output plugin: bin returned None")
+            return False
+
+        self.attach_output(plugin.plugin_object, bin)
+        if plugin.plugin_object.get_recordto() == IOutput.FILE:
+            self.file_outputs.append(bin)
+        log.info("Output %s added.", name)
+        return True
+
+    def remove_output(self, name):
+        """Stops an Output plugin without restarting the sources or the other outputs.
+
+        While recording the output is finalized with an end of stream, so a file it records to stays playable.
+        Returns False if the plugin is not running.
+        """
+        bin = self.output_names.get(name)
+        if bin is None:
+            log.warning("Output %s is not running.", name)
+            return False
+
+        plugin = self.plugman.get_plugin_by_name(name, "Output").plugin_object
+        file_path = plugin.location if plugin.get_recordto() == IOutput.FILE else None
+        controller = self.bitrate_controllers.pop(name, None)
+        if controller is not None:
+            controller.stop()
+        if bin in self.file_outputs:
+            self.file_outputs.remove(bin)
+
+        if self.current_state == Multimedia.RECORD or self.prerolled:
+            self.detach_output(bin, file_path)
+        else:
+            # No data flows to block the tee pads on, so the output is unlinked right away
+            self._forget_output(bin)
+            for tee_pad, sink_pad in self._output_links(bin):
+                tee_pad.unlink(sink_pad)
+                tee_pad.get_parent_element().release_request_pad(tee_pad)
+            self.release_output(bin, file_path)
+        log.info("Output %s removed.", name)
+        return True
+
+    def attach_output(self, plugin, bin, video=True):
+        """Links the output bin of an Output plugin to the tees, starting it if the pipeline is running.
+
+        The videosink pad of the bin is left unlinked if video is False.
+        """
+        if self.link_output(plugin, bin, self.record_audio, self.record_video and video):
+            self.output_plugins.append(bin)
+            self.output_names[plugin.get_name()] = bin
+            self.monitor.watch(bin)
+            bin.sync_state_with_parent()
+            self.start_bitrate_controller(plugin, self.record_audio, self.record_video)
+
+    def detach_output(self, bin, file_path=None):
+        """Unlinks an output bin from the tees of a running pipeline, finalizing it with an end of stream.
+
+        Each tee pad feeding the bin is blocked, so no buffer is cut in half, before it is unlinked and an EOS
+        is sent in its place. The bin is removed from the pipeline once every sink in it has received the EOS,
+        then file_path is deleted if nothing was recorded to it.
+        """
+        links = self._output_links(bin)
+        self._forget_output(bin)
+        self.detaching_outputs.add(bin)
+        self._settle_stream_guards(bin)
+
+        sinks = [element for element in bin.recurse()
+                 if not isinstance(element, gst.Bin) and element.flags() & gst.ELEMENT_IS_SINK]
+        if not links or not sinks:
+            self.release_output(bin, file_path)
+            return
+
+        pending_sinks = set(sinks)
+        for sink in sinks:
+            for pad in sink.sink_pads():
+                pad.add_event_probe(self._on_output_event, bin, sink, pending_sinks, file_path)
+        for tee_pad, sink_pad in links:
+            tee_pad.set_blocked_async(True, self._on_output_blocked, sink_pad)
+
+    def wait_for_detached_outputs(self, timeout):
+        """Runs the gobject main loop until every output being detached is released, or for timeout seconds."""
+        context = gobject.main_context_default()
+        deadline = time.time() + timeout
+        while self.detaching_outputs and time.time() < deadline:
+            if not context.iteration(False):
+                time.sleep(0.01)
+        if self.detaching_outputs:
+            log.warning("Outputs still detaching after %d seconds, they may not be finalized.", timeout)
+
+    def _output_links(self, bin):
+        """Returns the (tee pad, bin pad) pairs linking the tees to an output bin."""
+        links = []
+        tees = [self.audio_tee, self.video_tee] + [tee for queue, codec, tee in self.video_encoders.values()]
+        for tee in tees:
+            for tee_pad in tee.src_pads():
+                peer = tee_pad.get_peer()
+                if peer is not None and peer.get_parent_element() == bin:
+                    links.append((tee_pad, peer))
+        return links
+
+    def _forget_output(self, bin):
+        if bin in self.output_plugins:
+            self.output_plugins.remove(bin)
+        for name, output in self.output_names.items():
+            if output == bin:
+                del self.output_names[name]
+
+    def _on_output_blocked(self, tee_pad, blocked, sink_pad):
+        # Called from the streaming thread of the tee pad
+        if not blocked:
+            return
+        tee_pad.unlink(sink_pad)
+        sink_pad.send_event(gst.event_new_eos())
+        tee_pad.set_blocked_async(False, lambda *args: None)
+        gobject.idle_add(self._release_tee_pad, tee_pad)
+
+    def _release_tee_pad(self, tee_pad):
+        tee_pad.get_parent_element().release_request_pad(tee_pad)
+        return False
+
+    def _on_output_event(self, pad, event, bin, sink, pending_sinks, file_path):
+        # Called from the streaming thread of the sink
+        if event.type == gst.EVENT_EOS:
+            gobject.idle_add(self._on_output_eos, bin, sink, pending_sinks, file_path)
+        return True
+
+    def _on_output_eos(self, bin, sink, pending_sinks, file_path):
+        pending_sinks.discard(sink)
+        if not pending_sinks and bin in self.detaching_outputs:
+            self.release_output(bin, file_path)
+        return False
+
+    def release_output(self, bin, file_path=None):
+        """Stops an output bin that is no longer linked and removes it from the pipeline."""
+        self.detaching_outputs.discard(bin)
+        self.monitor.forget(bin)
+        bin.set_state(gst.STATE_NULL)
+        self.player.remove(bin)
+        self.remove_empty_file(file_path)
+        self.release_video_encoders()
+        self._forget_stream_guards(bin)
+
+        manifest = self.manifests.pop(file_path, None)
+        if manifest is not None:
+            manifest.finish_segment(file_path)
+        log.debug("Output removed from pipeline.")
+
+    ##
+    ## Adaptive bitrate
+    ##
+
+    def start_bitrate_controller(self, plugin, record_audio, record_video):
+        """Starts adapting the video bitrate of an output to its connection, if the Output plugin allows it."""
+        bounds = plugin.get_adaptive_bitrate()
+        name = plugin.get_name()
+        if bounds is None or not record_video or name in self.bitrate_controllers:
+            return
+
+        minimum, maximum = bounds
+        # Without audio there is nothing left to stream once video is dropped
+        set_video = (lambda video: self.set_output_video(name, video)) if record_audio else None
+        controller = BitrateController(lambda: self.get_output_fill(name),
+                                       lambda bitrate: self.set_output_bitrate(plugin, bitrate),
+                                       set_video, minimum, maximum)
+        controller.start()
+        self.bitrate_controllers[name] = controller
+
+    def get_output_fill(self, name):
+        """Returns how full the fullest queue of a running output is, from 0 to 1.
+
+        The stream buffer before a network sink holds minutes of data and fills up first on a slow connection. It
+        counts as full once it holds stream_buffer_time seconds, as much as the queues of a stream output.
+        """
+        bin = self.output_names.get(name)
+        if bin is None:
+            return 0.0
+        fills = [0.0]
+        for element in bin.recurse():
+            factory = element.get_factory()
+            if factory is None:
+                continue
+            if factory.get_name() == 'queue':
+                fills.append(queue_levels(element)['fill'])
+            elif factory.get_name() == 'queue2' and self.config.stream_buffer_time > 0:
+                level = element.get_property('current-level-time')
+                fills.append(min(float(level) / (self.config.stream_buffer_time * gst.SECOND), 1.0))
+        return max(fills)
+
+    def set_output_bitrate(self, plugin, bitrate):
+        """Changes the bitrate of the video encoder of a running output, in kbit/s."""
+        bin = self.output_names.get(plugin.get_name())
+        encoder = bin.get_by_name('videocodec') if bin is not None else None
+        if encoder is not None:
+            plugin.get_encoder_profile().set_bitrate(encoder, bitrate)
+
+    def set_output_video(self, name, video):
+        """Restarts a running output with or without video, without interrupting the sources or other outputs."""
+        bin = self.output_names.get(name)
+        if bin is None:
+            return False
+
+        plugin = self.plugman.get_plugin_by_name(name, "Output")
+        prepared = self.prepare_running_output(plugin)
+        if not prepared:
+            return False
+        plugins, metadata, filename_for_frontend = prepared
+
+        new_bin = self.get_output_bin(plugin.plugin_object, self.record_audio, self.record_video and video, metadata)
+        if not new_bin:
+            log.error("Failed to load Output plugin: bin returned None")
+            return False
+
+        self.detach_output(bin)
+        self.attach_output(plugin.plugin_object, new_bin, video)
+        return True
+
+    ##
+    ## Stream reconnection
+    ##
+
+    def _on_stream_disconnected(self, guard):
+        # The network sink after the guard failed, the stream waits in the buffer before the guard
+        reconnector = self.stream_guards.get(guard)
+        if reconnector is None or guard.get_parent() is None:
+            return False
+
+        sink = self._remove_stream_sink(guard)
+        delay = reconnector.failed(lambda: self._reconnect_stream(guard, sink))
+        log.warning("Stream connection lost, reconnecting in %d seconds.", delay)
+        return False
+
+    def _remove_stream_sink(self, guard):
+        peer = guard.get_pad('src').get_peer()
+        if peer is None:
+            return None
+        sink = peer.get_parent_element()
+        guard.unlink(sink)
+        sink.set_state(gst.STATE_NULL)
+        guard.get_parent().remove(sink)
+        return sink
+
+    def _reconnect_stream(self, guard, old_sink):
+        """Links a copy of the failed sink of a stream to its guard, which starts sending again."""
+        bin = guard.get_parent()
+        if guard not in self.stream_guards or bin is None:
+            return
+
+        sink = self._copy_element(old_sink)
+        bin.add(sink)
+        guard.link(sink)
+        if not sink.sync_state_with_parent():
+            # Sinks connecting when they start, like shout2send, fail here
+            self._on_stream_disconnected(guard)
+            return
+
+        guard.resume(self.config.stream_catch_up)
+        log.info("Stream reconnecting.")
+
+    def _copy_element(self, element):
+        """Returns a new element of the same factory and with the same settings as element."""
+        copy = gst.element_factory_make(element.get_factory().get_name())
+        for spec in gobject.list_properties(type(element)):
+            if (spec.name != 'name' and spec.flags & gobject.PARAM_READABLE and spec.flags & gobject.PARAM_WRITABLE and
+                    not spec.flags & gobject.PARAM_CONSTRUCT_ONLY):
+                copy.set_property(spec.name, element.get_property(spec.name))
+        return copy
+
+    def _stream_guards(self, bin):
+        return [element for element in bin.recurse() if isinstance(element, StreamGuard)]
+
+    def _settle_stream_guards(self, bin):
+        """Stops reconnecting the streams of an output bin that is being detached.
+
+        A stream waiting for its connection is sent to a fakesink instead, so its end of stream gets through and the
+        bin can be released.
+        """
+        self._forget_stream_guards(bin)
+        for guard in self._stream_guards(bin):
+            if guard.connected:
+                continue
+            self._remove_stream_sink(guard)
+            sink = gst.element_factory_make('fakesink')
+            sink.set_property('sync', False)
+            sink.set_property('async', False)
+            bin.add(sink)
+            guard.link(sink)
+            sink.sync_state_with_parent()
+            guard.resume()
+
+    def _forget_stream_guards(self, bin):
+        for guard in self._stream_guards(bin):
+            reconnector = self.stream_guards.pop(guard, None)
+            if reconnector is not None:
+                reconnector.stop()
+
+    ##
+    ## Segmented recording
+    ##
+
+    def load_manifest(self, metadata):
+        """Starts the manifest of the recording to file_path if recordings are split into segments."""
+        self.manifest = None
+        if self.file_path is None or not (self.config.segment_duration or self.config.segment_size):
+            return
+
+        self.manifest = RecordingManifest(self.file_path + '.manifest', metadata)
+        self.manifest.add_segment(self.file_path)
+        self.manifests[self.file_path] = self.manifest
+
+    def check_segment(self):
+        """Rolls over to a new segment once the current one is long or large enough."""
+        if self.current_state == Multimedia.RECORD:
+            elapsed = time.time() - self.segment_started
+            try:
+                size = os.path.getsize(self.file_path)
+            except OSError:
+                size = 0
+
+            if ((self.config.segment_duration and elapsed >= self.config.segment_duration * 60) or
+                    (self.config.segment_size and size >= self.config.segment_size * 1024 * 1024)):
+                self.next_segment()
+        return True
+
+    def stop_segment_timer(self):
+        if self.segment_timer is not None:
+            gobject.source_remove(self.segment_timer)
+            self.segment_timer = None
+
+    def next_segment(self):
+        """Continues recording to a new file without interrupting the sources.
+
+        The new file output is linked to the tees before the old one is unlinked, so no frame is lost between
+        segments, and every segment starts with a keyframe, from a fresh encoder or from a shared encoder asked for
+        one. The new file is named by get_record_name, which numbers the name of the recording after its previous
+        segments.
+        """
+        plugin = self.plugman.get_plugin_by_name(self.config.record_to_file_plugin, "Output")
+        prepared = self.prepare_running_output(plugin)
+        if not prepared:
+            return False
+        plugins, metadata, filename_for_frontend = prepared
+
+        bin = self.get_output_bin(plugin.plugin_object, self.record_audio, self.record_video, metadata)
+        if not bin:
+            log.error("Failed to load Output plugin: bin returned None")
+            return False
+
+        old_outputs, old_file_path = self.file_outputs, self.file_path
+        self.attach_output(plugin.plugin_object, bin)
+        self.file_outputs = [bin]
+        self.file_path = os.path.join(self.config.videodir, filename_for_frontend)
+        self.manifest.add_segment(self.file_path)
+        self.manifests[self.file_path] = self.manifest
+        self.segment_started = time.time()
+
+        for old_bin in old_outputs:
+            self.detach_output(old_bin, old_file_path)
+        log.info("Recording continues in %s", filename_for_frontend)
+        return True
 
     def load_audiomixer(self, mixer, inputs):
         self.record_audio = True
@@ -335,7 +1089,7 @@ class Multimedia:
             return False
 
         self.player.add(self.audiomixer)
-        self.audiomixer.link(self.audio_tee)
+        self.audiomixer.link(self.audio_level)
 
         mixer.load_inputs(self.player, self.audiomixer, inputs)
 
@@ -347,7 +1101,7 @@ class Multimedia:
                 self.audio_tee.unlink(plugin)
                 self.player.remove(plugin)
 
-            self.audiomixer.unlink(self.audio_tee)
+            self.audiomixer.unlink(self.audio_level)
             self.player.remove(self.audiomixer)
         self.record_audio = False
 
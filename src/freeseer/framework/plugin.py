@@ -451,13 +451,37 @@ class IOutput(IBackendPlugin):
     def get_type(self):
         return self.type
 
-    def get_output_bin(self, audio=True, video=True, metadata=None):
+    def get_output_bin(self, audio=True, video=True, metadata=None, encode_video=True):
         """
         Returns the Gstreamer Bin for the output plugin.
         MUST be overridded when creating an output plugin.
+
+        encode_video is only False for plugins with an encoder profile, when their
+        videosink pad receives video already encoded with that profile.
         """
         raise NotImplementedError
 
+    def get_encoder_profile(self):
+        """
+        Returns the EncoderProfile of the video encoder of the output plugin.
+        Plugins returning None always encode their video themselves.
+        """
+        return None
+
+    def get_buffer_policy(self):
+        """
+        Returns the BufferPolicy of the queues of the output bin, or None to use
+        the default policy of the outputs recording to the same kind of place.
+        """
+        return None
+
+    def get_adaptive_bitrate(self):
+        """
+        Returns the (minimum, maximum) video bitrate in kbit/s the output may be
+        adapted within while recording, or None if its bitrate is fixed.
+        """
+        return None
+
     def get_extension(self):
         return self.extension
 
@@ -29,7 +29,12 @@ class Presentation(object):
     '''
     This class is responsible for encapsulate data about presentations
     and its database related operations
+
+    Attributes are stored in __slots__ to keep large schedules compact in memory.
+    Their order matches the columns of the presentations table after Id.
     '''
+    __slots__ = ('title', 'speaker', 'description', 'category', 'event', 'room', 'date', 'startTime', 'endTime')
+
     def __init__(self, title, speaker="", description="", category="", event="Default", room="Default", date="", startTime="", endTime=""):
         '''
         Initialize a presentation instance
@@ -51,6 +56,7 @@ class PresentationFile(Presentation):
     This class represents a presentation that has been already been written
     to a file and the metadata that has been loaded from it
     '''
+    __slots__ = ('filename', 'album', 'tracknumber', 'filedate', 'duration', 'filesize')
 
     def __init__(self, title, speaker="", description="", category="", event="Default", room="Default", date="", startTime="", endTime=""):
         Presentation.__init__(
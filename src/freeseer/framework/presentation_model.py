@@ -0,0 +1,202 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+from PyQt4.QtCore import QAbstractTableModel
+from PyQt4.QtCore import QModelIndex
+from PyQt4.QtCore import Qt
+from PyQt4.QtCore import QVariant
+from PyQt4.QtGui import QSortFilterProxyModel
+
+
+class PresentationsTableModel(QAbstractTableModel):
+    """Table model of the presentations table that loads rows in pages as views scroll.
+
+    Pages of PAGE_SIZE rows are fetched in Id order when a view asks for more rows through canFetchMore / fetchMore.
+    Edits are written through the QtDBConnector and only the edited row is refreshed, so the model is never
+    reloaded as a whole after a change. The columns are the columns of the presentations table.
+    """
+
+    PAGE_SIZE = 256
+
+    def __init__(self, db, parent=None):
+        super(PresentationsTableModel, self).__init__(parent)
+        self._db = db
+        self._columns = db.PRESENTATIONS_COLUMNS
+        self._rows = []  # Lists of QVariant, one per column
+        self._last_id = -1  # Id of the last talk of the last page loaded
+        self._added = set()  # Ids of talks appended by add_rows before their page was loaded
+        self._exhausted = False
+
+    def select(self):
+        """Discards the loaded rows and loads the first page again."""
+        self.beginResetModel()
+        self._rows = []
+        self._last_id = -1
+        self._added = set()
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+        return True
+
+    def talk_id(self, row):
+        """Returns the talk id of a row as a unicode string."""
+        return unicode(self._rows[row][0].toString())
+
+    def refresh_row(self, row):
+        """Reloads a single row from the database, removing it if its talk no longer exists."""
+        values = self._db.get_presentation_row(self.talk_id(row))
+        if values is None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rows[row]
+            self.endRemoveRows()
+        else:
+            self._rows[row] = values
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._columns) - 1))
+
+    def fetch_new_rows(self):
+        """Appends talks added after the last loaded row if every page has already been loaded.
+
+        Otherwise new talks are loaded with the last page.
+        """
+        if self._exhausted:
+            self._exhausted = False
+            self.fetchMore()
+
+    def add_row(self, talk_id):
+        """Loads a talk just added to the database and returns its row, or -1 if the talk does not exist."""
+        return self.add_rows([talk_id]).get(unicode(talk_id), -1)
+
+    def add_rows(self, talk_ids):
+        """Loads the given talks and returns a dict mapping the id of every talk that exists to its row.
+
+        Talks whose page is not loaded yet are appended right away in one query, and skipped when their page is loaded.
+        """
+        self.fetch_new_rows()
+        rows = dict((self.talk_id(row), row) for row in range(len(self._rows)))
+        missing = set(unicode(talk_id) for talk_id in talk_ids).difference(rows)
+        if not missing:
+            return rows
+
+        values = self._db.get_presentation_rows_by_ids(missing)
+        if values:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(values) - 1)
+            self._rows.extend(values)
+            self.endInsertRows()
+            for row in range(first, len(self._rows)):
+                self._added.add(self.talk_id(row))
+                rows[self.talk_id(row)] = row
+        return rows
+
+    #
+    # QAbstractItemModel
+    #
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+
+        rows = self._db.get_presentation_rows(self._last_id, self.PAGE_SIZE)
+        if len(rows) < self.PAGE_SIZE:
+            self._exhausted = True
+        if rows:
+            self._last_id = rows[-1][0].toInt()[0]
+
+        if self._added:
+            ids = [unicode(row[0].toString()) for row in rows]
+            rows = [row for row, talk_id in zip(rows, ids) if talk_id not in self._added]
+            self._added.difference_update(ids)
+
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return QVariant()
+        return self._rows[index.row()][index.column()]
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole or index.column() == 0:
+            return False
+
+        value = QVariant(value)
+        self._db.update_presentation_field(self.talk_id(index.row()), self._columns[index.column()],
+                                           unicode(value.toString()))
+        self._rows[index.row()][index.column()] = value
+        self.dataChanged.emit(index, index)
+        return True
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or row < 0 or row + count > len(self._rows):
+            return False
+
+        for talk_row in range(row, row + count):
+            self._db.delete_presentation(self.talk_id(talk_row))
+
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        del self._rows[row:row + count]
+        self.endRemoveRows()
+        return True
+
+    def flags(self, index):
+        flags = super(PresentationsTableModel, self).flags(index)
+        if index.isValid() and index.column() > 0:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return QVariant(self._columns[section])
+        return QVariant(section + 1)
+
+
+class PresentationsFilterProxyModel(QSortFilterProxyModel):
+    """Proxy of a PresentationsTableModel that only shows the talks of a set of talk ids.
+
+    Each row is accepted by a set lookup of its talk id, so filtering costs the same however many talks match.
+    """
+
+    def __init__(self, parent=None):
+        super(PresentationsFilterProxyModel, self).__init__(parent)
+        self._talk_ids = None  # None shows every talk
+
+    def set_talk_ids(self, talk_ids):
+        """Shows only the talks whose ids are in talk_ids, or every talk if talk_ids is None."""
+        self._talk_ids = None if talk_ids is None else set(unicode(talk_id) for talk_id in talk_ids)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._talk_ids is None or self.sourceModel().talk_id(source_row) in self._talk_ids
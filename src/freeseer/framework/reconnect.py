@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import time
+
+import gobject
+
+
+class StreamReconnector(object):
+    """Schedules the reconnection of a stream whose network sink failed, waiting longer after every failed attempt.
+
+    The first attempt is made MIN_DELAY seconds after a failure, and the delay doubles up to MAX_DELAY while
+    attempts keep failing. A connection that held for longer than MAX_DELAY is reconnected quickly again.
+    """
+
+    MIN_DELAY = 1
+    MAX_DELAY = 60
+
+    def __init__(self, clock=time.time):
+        self.delay = self.MIN_DELAY
+        self._clock = clock
+        self._last_attempt = None
+        self._timer = None
+
+    def failed(self, reconnect):
+        """Calls reconnect() once the current delay has passed. Returns the delay in seconds."""
+        self.stop()
+        if self._last_attempt is None or self._clock() - self._last_attempt > self.MAX_DELAY:
+            self.delay = self.MIN_DELAY
+
+        delay = self.delay
+        self.delay = min(self.delay * 2, self.MAX_DELAY)
+        self._timer = gobject.timeout_add_seconds(delay, self._on_timeout, reconnect)
+        return delay
+
+    def stop(self):
+        """Cancels the scheduled reconnection, if any."""
+        if self._timer is not None:
+            gobject.source_remove(self._timer)
+            self._timer = None
+
+    def _on_timeout(self, reconnect):
+        self._timer = None
+        self._last_attempt = self._clock()
+        reconnect()
+        return False
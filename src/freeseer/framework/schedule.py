@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import bisect
+import threading
+
+from PyQt4.QtCore import QAbstractTableModel
+from PyQt4.QtCore import QModelIndex
+from PyQt4.QtCore import Qt
+from PyQt4.QtCore import QVariant
+
+
+def time_to_seconds(time):
+    """Returns the number of seconds since midnight of a hh:mm or hh:mm:ss time string, None if it is not one."""
+    try:
+        fields = [int(field) for field in unicode(time).split(':')]
+    except ValueError:
+        return None
+
+    if len(fields) == 2:
+        fields.append(0)
+    if len(fields) != 3 or not (0 <= fields[0] < 24 and 0 <= fields[1] < 60 and 0 <= fields[2] < 60):
+        return None
+    return fields[0] * 3600 + fields[1] * 60 + fields[2]
+
+
+class ScheduleIndex(object):
+    """In-memory index of the talk schedule: event -> room -> date -> talks sorted by start time.
+
+    A second index, room -> date -> (start, end) intervals sorted by start time, serves the auto-record scheduler
+    which follows a room across events. Talks without a valid start time are left out of it.
+
+    The index is kept coherent by QtDBConnector, which adds and removes talks as they are inserted, updated and
+    deleted. Talk ids are stored as unicode strings.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._schedule = {}  # event -> room -> date -> sorted list of (startTime, talk_id, label)
+        self._timeline = {}  # room -> date -> sorted list of (start, end, talk_id, event), times in seconds
+        self._talks = {}  # talk_id -> (event, room, date, entry, interval)
+
+    def add(self, talk_id, event, room, date, startTime, endTime, label):
+        """Adds a talk to the index, replacing any talk already indexed with the same talk_id."""
+        talk_id = unicode(talk_id)
+        entry = (unicode(startTime), talk_id, unicode(label))
+        event, room, date = unicode(event), unicode(room), unicode(date)
+
+        start = time_to_seconds(startTime)
+        if start is None:
+            interval = None
+        else:
+            # A talk without a valid end time is treated as ending when it starts
+            end = time_to_seconds(endTime)
+            if end is None or end < start:
+                end = start
+            interval = (start, end, talk_id, event)
+
+        with self._lock:
+            self.remove(talk_id)
+            talks = self._schedule.setdefault(event, {}).setdefault(room, {}).setdefault(date, [])
+            bisect.insort(talks, entry)
+            if interval is not None:
+                bisect.insort(self._timeline.setdefault(room, {}).setdefault(date, []), interval)
+            self._talks[talk_id] = (event, room, date, entry, interval)
+
+    def remove(self, talk_id):
+        """Removes a talk from the index. Does nothing if the talk is not indexed."""
+        with self._lock:
+            location = self._talks.pop(unicode(talk_id), None)
+            if location is None:
+                return
+
+            event, room, date, entry, interval = location
+            if interval is not None:
+                days = self._timeline[room]
+                intervals = days[date]
+                del intervals[bisect.bisect_left(intervals, interval)]
+                if not intervals:
+                    del days[date]
+                if not days:
+                    del self._timeline[room]
+
+            rooms = self._schedule[event]
+            dates = rooms[room]
+            talks = dates[date]
+            del talks[bisect.bisect_left(talks, entry)]
+
+            # Drop empty levels so they are not listed anymore
+            if not talks:
+                del dates[date]
+            if not dates:
+                del rooms[room]
+            if not rooms:
+                del self._schedule[event]
+
+    def clear(self):
+        """Removes every talk from the index."""
+        with self._lock:
+            self._schedule.clear()
+            self._timeline.clear()
+            self._talks.clear()
+
+    def events(self):
+        """Returns the sorted list of events."""
+        with self._lock:
+            return sorted(self._schedule)
+
+    def rooms(self, event):
+        """Returns the sorted list of rooms of an event."""
+        with self._lock:
+            return sorted(self._schedule.get(unicode(event), {}))
+
+    def dates(self, event, room):
+        """Returns the sorted list of dates with talks in a room of an event."""
+        with self._lock:
+            return sorted(self._schedule.get(unicode(event), {}).get(unicode(room), {}))
+
+    def talks(self, event, room, date=None):
+        """Returns a list of (label, talk_id) for the talks in a room of an event sorted by date and start time.
+
+        Only the talks of date are returned if date is given.
+        """
+        with self._lock:
+            dates = self._schedule.get(unicode(event), {}).get(unicode(room), {})
+            if date:
+                selected = [unicode(date)]
+            else:
+                selected = sorted(dates)
+
+            return [(label, talk_id) for day in selected for startTime, talk_id, label in dates.get(day, [])]
+
+    def next_talk(self, room, date, time, event=None):
+        """Returns (talk_id, start, end) for the first talk in room on date starting at or after time.
+
+        time, start and end are seconds since midnight. Only talks of event are considered if event is given.
+        Returns None if no talk is left that day. The talks that already started are skipped with a binary search,
+        however many of them there are.
+        """
+        with self._lock:
+            intervals = self._timeline.get(unicode(room), {}).get(unicode(date), [])
+            for start, end, talk_id, talk_event in intervals[bisect.bisect_left(intervals, (time,)):]:
+                if event is None or talk_event == event:
+                    return talk_id, start, end
+            return None
+
+
+class ScheduleModel(QAbstractTableModel):
+    """Read-only table model over a list of row tuples, used to serve ScheduleIndex lists to Qt views."""
+
+    def __init__(self, rows, parent=None):
+        super(ScheduleModel, self).__init__(parent)
+        self._rows = rows
+        self._columns = len(rows[0]) if rows else 1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._columns
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return QVariant()
+        return QVariant(self._rows[index.row()][index.column()])
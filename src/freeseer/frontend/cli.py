@@ -65,6 +65,7 @@ def setup_parser():
     # Configure Subparsers
     subparsers = parser.add_subparsers(dest='app', help='Command List')
     setup_parser_record(subparsers)
+    setup_parser_autorecord(subparsers)
     setup_parser_config(subparsers)
     setup_parser_talk(subparsers)
     setup_parser_report(subparsers)
@@ -82,6 +83,19 @@ def setup_parser_record(subparsers):
     parser.add_argument("-s", "--show-talks", help="Shows all talks", action="store_true")
 
 
+def setup_parser_autorecord(subparsers):
+    """Setup the autorecord command parser"""
+    parser = subparsers.add_parser('autorecord', help='Record the scheduled talks of one or more rooms without a GUI',
+        formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("-r", "--room", type=unicode, action="append", required=True, metavar="ROOM[=PROFILE]",
+        help="""Room to record, may be repeated to record several rooms at once
+
+        Each room is recorded with the settings of its own profile (Default: default),
+        so rooms recorded at the same time must each name a different profile.
+        """)
+    parser.add_argument("-e", "--event", type=unicode, help="Only record the talks of this event")
+
+
 ###
 ### Config Parser and Subparsers
 ###
@@ -194,6 +208,51 @@ def parse_args(parser, parse_args=None):
         elif args.show_talks:
             app.print_talks()
 
+    elif args.app == 'autorecord':
+        import gobject
+        # Must declare after argparse otherwise GStreamer will take over the cli help
+        from freeseer.frontend.record.AutoRecorder import AutoRecorder
+        from freeseer.frontend.record.RecordingController import RecordingController
+
+        rooms = []
+        for room in args.room:
+            room, _, profile_name = room.partition('=')
+            rooms.append((room, profile_name or 'default'))
+        if len(set(profile_name for room, profile_name in rooms)) != len(rooms):
+            print("Every room must be recorded with a different profile.")
+            sys.exit(1)
+
+        # XXX: There should only be 1 database per user. Workaround for this
+        #      is to put it in the 'default' profile.
+        db = settings.profile_manager.get().get_database()
+
+        recorders = []
+        for room, profile_name in rooms:
+            profile = settings.profile_manager.get(profile_name)
+            config = profile.get_config('freeseer.conf', settings.FreeseerConfig,
+                                        storage_args=['Global'], read_only=False)
+            app = RecordingController(profile, db, config, cli=True)
+            recorders.append(AutoRecorder(app, db, room, args.event))
+
+        loop = gobject.MainLoop()
+
+        def quit(signum, frame):
+            loop.quit()
+
+        # Stop cleanly so recordings in progress are finalized. Python only handles signals between two
+        # callbacks of the main loop, so it is woken up every second.
+        signal.signal(signal.SIGINT, quit)
+        signal.signal(signal.SIGTERM, quit)
+        gobject.timeout_add_seconds(1, lambda: True)
+
+        for recorder in recorders:
+            recorder.start()
+        try:
+            loop.run()
+        finally:
+            for recorder in recorders:
+                recorder.stop()
+
     elif args.app == 'config':
         if len(sys.argv) == 2:  # No 'config' arguments passed
             launch_configtool()
@@ -240,16 +299,8 @@ def parse_args(parser, parse_args=None):
             db.clear_database()
 
         elif args.action == "list":
-            talks_query = db.get_talks()
-            talks_table = []
-            while talks_query.next():
-                record = talks_query.record()
-                talks_table.append([
-                    talks_query.value(record.indexOf('id')).toString(),
-                    talks_query.value(record.indexOf('title')).toString(),
-                    talks_query.value(record.indexOf('speaker')).toString(),
-                    talks_query.value(record.indexOf('event')).toString(),
-                ])
+            talks_table = [[talk_id, presentation.title, presentation.speaker, presentation.event]
+                           for talk_id, presentation in db.iter_presentations()]
             if talks_table:
                 print(tabulate(talks_table, headers=["ID", "Title", "Speaker", "Event"]))
             else:
@@ -152,6 +152,18 @@ def get_specific_recording(recording_id):
     }
 
 
+@recording.route('/recordings/<int:recording_id>/health', methods=['GET'])
+@http_response(200)
+def get_recording_health(recording_id):
+    """Returns the queue levels, dropped frames and latency of a recording's pipeline."""
+    try:
+        retrieved_media = recording.media_dict[recording_id]
+    except KeyError:
+        raise HTTPError(404, 'No recording with id "{}" was found'.format(recording_id))
+
+    return retrieved_media.get_health()
+
+
 @recording.route('/recordings/<int:recording_id>', methods=['PATCH'])
 @http_response(200)
 @sync
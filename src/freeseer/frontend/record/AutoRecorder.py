@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import logging
+
+import gobject
+from PyQt4.QtCore import QDateTime
+from PyQt4.QtCore import QTime
+
+log = logging.getLogger(__name__)
+
+
+class AutoRecorder(object):
+    """Records every upcoming talk of a room with a RecordingController, without a GUI.
+
+    Start and stop times are scheduled as gobject timeouts, so any number of AutoRecorders, one per room and
+    pipeline, can share the gobject main loop of a headless process. Nothing runs between two scheduled times.
+    When no talk is left for the day the schedule is reloaded from the database at midnight.
+    """
+
+    def __init__(self, controller, db, room, event=None):
+        self.controller = controller
+        self.db = db
+        self.room = room
+        self.event = event
+
+        self.talk_id = None
+        self.duration = 0  # Seconds from the start to the end of the current talk
+        self.end = None  # QDateTime at which the current talk ends
+        self.recording = False
+        self._source = None
+
+    def start(self):
+        """Schedules the recording of the next talk."""
+        log.info("Auto-recording room '%s'.", self.room)
+        self._schedule_next_talk()
+
+    def stop(self):
+        """Cancels the scheduled start or stop time, stops the current recording, if any, and releases the sources."""
+        if self._source is not None:
+            gobject.source_remove(self._source)
+            self._source = None
+        self._stop_recording()
+        self.controller.shutdown()
+
+    def _schedule(self, seconds, callback):
+        # One extra second so the callback never runs before the time it waits for
+        self._source = gobject.timeout_add_seconds(max(seconds, 0) + 1, callback)
+
+    def _schedule_next_talk(self, after=None):
+        # A talk found after the end of the previous one may already have started, it is then recorded right away
+        now = QDateTime.currentDateTime()
+        if after is None:
+            after = now
+        talk = self.db.get_next_talk_by_room(self.room, after, self.event)
+        if talk is None:
+            log.info("No more talks to record today in room '%s'.", self.room)
+            self._schedule(now.time().secsTo(QTime(23, 59, 59)), self._next_day)
+            return
+
+        self.talk_id, start, end = talk
+        self.end = QDateTime(after.date(), end)
+        if now.secsTo(self.end) <= 0:
+            # Talks starting after now have not ended, so looking up from now finds the next one to record
+            log.info("Skipping talk %s in room '%s', it ended at %s.", self.talk_id, self.room, end.toString())
+            self._schedule_next_talk(now)
+            return
+
+        log.info("Recording talk %s in room '%s' at %s.", self.talk_id, self.room, start.toString())
+        wait = now.secsTo(QDateTime(after.date(), start))
+        if wait >= 0:
+            self.duration = start.secsTo(end)
+            self._schedule(wait, self._start_recording)
+        else:
+            self.duration = now.secsTo(self.end)
+            self._start_recording()
+
+    def _next_day(self):
+        # Pick up talks that were added or edited by other processes since the schedule was loaded
+        self.db.invalidate_schedule()
+        self._schedule_next_talk()
+        return False
+
+    def _start_recording(self):
+        if self.controller.record_talk_id(self.talk_id):
+            log.info("Auto-recording for talk %s started.", self.talk_id)
+            self.recording = True
+        self._schedule(self.duration, self._end_talk)
+        return False
+
+    def _stop_recording(self):
+        if self.recording:
+            self.controller.stop()
+            self.recording = False
+            log.info("Auto-recording for talk %s stopped.", self.talk_id)
+
+    def _end_talk(self):
+        self._stop_recording()
+        # Looking up from the end of the talk rather than from now finds the talk starting right after it
+        self._schedule_next_talk(self.end)
+        return False
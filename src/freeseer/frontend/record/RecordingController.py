@@ -49,32 +49,50 @@ class RecordingController:
         """Stop Recording"""
         self.media.stop()
 
+    def shutdown(self):
+        """Stop Recording and release the sources kept running in preroll mode"""
+        self.media.shutdown()
+
     def pause(self):
         """Pause Recording"""
         self.media.pause()
 
-    def load_backend(self, presentation=None):
-        """Prepares the backend for recording"""
-        initialized, filename_for_frontend = self.media.load_backend(presentation)
-        if initialized:
-            return True, filename_for_frontend
-        else:
-            return False  # Error something failed while loading the backend
+    def is_prerolled(self):
+        """Returns True if the sources kept running after the last recording stopped in preroll mode"""
+        return self.media.prerolled
 
-    def print_talks(self):
-        query = self.db.get_talks()
+    def get_health(self):
+        """Returns the queue levels, dropped frames and latency of the recording pipeline"""
+        return self.media.get_health()
+
+    def add_output(self, name):
+        """Starts an Output plugin without restarting the recording"""
+        return self.media.add_output(name)
+
+    def remove_output(self, name):
+        """Stops an Output plugin without restarting the recording"""
+        return self.media.remove_output(name)
+
+    def load_backend(self, presentation=None, filename=None):
+        """Prepares the backend for recording
 
+        Returns a (initialized, filename) tuple, filename is None if the backend failed to load.
+        """
+        loaded = self.media.load_backend(presentation, filename)
+        if not loaded:
+            return False, None  # Error something failed while loading the backend
+        initialized, filename_for_frontend = loaded
+        return initialized, filename_for_frontend
+
+    def print_talks(self):
         # Print the header
         print("\n")
         print("ID: Speaker - Title")
         print("-------------------")
 
-        while(query.next()):
-            talkid = unicode(query.value(0).toString())
-            title = unicode(query.value(1).toString())
-            speaker = unicode(query.value(2).toString())
-
-            print("{talkid}: {speaker} - {title}".format(talkid=talkid, speaker=speaker, title=title))
+        for talkid, presentation in self.db.iter_presentations():
+            print(u"{talkid}: {speaker} - {title}".format(talkid=talkid, speaker=presentation.speaker,
+                                                           title=presentation.title))
 
     ###
     ### Convenience commands
@@ -86,7 +104,8 @@ class RecordingController:
         Returns False if any issues arise
         """
         presentation = self.db.get_presentation(talk_id)
-        if self.media.load_backend(presentation):
+        initialized, filename = self.load_backend(presentation)
+        if initialized:
             # Only record if the backend successfully loaded
             # No need to print error on failure since load_backend already
             # prints an error message
@@ -102,7 +121,8 @@ class RecordingController:
         Returns True if recording is successfully started
         Returns False if any issues arise
         """
-        if self.media.load_backend(filename=filename):
+        initialized, filename = self.load_backend(filename=filename)
+        if initialized:
             self.record()
             return True
 
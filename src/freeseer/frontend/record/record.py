@@ -97,7 +97,7 @@ class RecordApp(FreeseerApp):
         self.singleID = None
         self.timeUntilStart = None
         self.timeUntilEnd = None
-        self.autoTalks = None
+        self.autoRoom = None
         self.recorded = False
         self.beforeStartTimer = QtCore.QTimer(self)
         self.beforeStartTimer.timeout.connect(self.start_single_record)
@@ -371,7 +371,7 @@ class RecordApp(FreeseerApp):
                 self.mainWidget.standbyButton.setChecked(False)
         else:
             toggle_gui(False)
-            self.controller.stop()
+            self.controller.shutdown()
             self.mainWidget.standbyButton.setChecked(False)
 
         self.mainWidget.playButton.setEnabled(False)
@@ -380,6 +380,13 @@ class RecordApp(FreeseerApp):
         """The logic for recording and stopping recording."""
 
         if self.mainWidget.is_recording:  # Start Recording.
+            if self.controller.is_prerolled():
+                # The sources kept running since the last recording, only the file output of this talk is loaded
+                if not self.load_backend():
+                    self.mainWidget.setRecordIcon()
+                    return
+                self.enable_talk_selection(False)
+
             logo_rec = QtGui.QPixmap(":/freeseer/logo_rec.png")
             sysIcon2 = QtGui.QIcon(logo_rec)
             self.systray.setIcon(sysIcon2)
@@ -413,8 +420,12 @@ class RecordApp(FreeseerApp):
                                                                         get_free_space(self.config.videodir),
                                                                         self.idleString))
 
-            # Finally set the standby button back to unchecked position.
-            self.standby(False)
+            if self.controller.is_prerolled():
+                # Stay in standby with the sources running, the next talk can be picked and recorded right away
+                self.enable_talk_selection(True)
+            else:
+                # Finally set the standby button back to unchecked position.
+                self.standby(False)
 
             # Stop and reset timer.
             self.timer.stop()
@@ -436,6 +447,13 @@ class RecordApp(FreeseerApp):
                         if talkid == self.mainWidget.talkComboBox.model().index(i, 1).data(QtCore.Qt.DisplayRole).toString():
                             self.mainWidget.talkComboBox.setCurrentIndex(i)
 
+    def enable_talk_selection(self, state):
+        """Enables the talk selection while in standby between two recordings in preroll mode"""
+        self.mainWidget.eventComboBox.setEnabled(state)
+        self.mainWidget.roomComboBox.setEnabled(state)
+        self.mainWidget.dateComboBox.setEnabled(state)
+        self.mainWidget.talkComboBox.setEnabled(state)
+
     def _enable_disable_gui(self, state):
         """Disables GUI components when Auto Record is pressed, and enables them when Auto Record is released"""
         self.mainWidget.standbyButton.setDisabled(state)
@@ -458,11 +476,9 @@ class RecordApp(FreeseerApp):
         if state:
             # If there is a room selected, then it's possible to auto-record
             if self.current_room:
-                self.autoTalks = self.db.get_talks_by_room_and_time(self.current_room)
+                self.autoRoom = self.current_room
                 # Start recording if there are talks in database that can be auto-recorded
-                if self.autoTalks.next():
-                    # Set the cursor back to before the first record so that single_auto_record works properly
-                    self.autoTalks.previous()
+                if self.db.get_next_talk_by_room(self.autoRoom) is not None:
                     self._enable_disable_gui(True)
                     self.single_auto_record()
                 else:
@@ -479,7 +495,8 @@ class RecordApp(FreeseerApp):
         else:
             self.beforeStartTimer.stop()
             self.beforeEndTimer.stop()
-            self.controller.stop()
+            self.controller.shutdown()
+            self.recorded = False
             self.stop_auto_record_gui()
 
         self.mainWidget.playButton.setEnabled(False)
@@ -492,39 +509,36 @@ class RecordApp(FreeseerApp):
         the end of the talk.
         """
         if self.recorded:
+            # In preroll mode the sources keep running for the next talk
             self.controller.stop()
             self.recorded = False
             log.debug("Auto-recording for the current talk stopped.")
 
-        if self.autoTalks.next():
-            starttime = QtCore.QTime.fromString(self.autoTalks.value(8).toString())
-            endtime = QtCore.QTime.fromString(self.autoTalks.value(9).toString())
-            currenttime = QtCore.QTime.currentTime()
-
-            if currenttime <= starttime:
-                self.singleID = self.autoTalks.value(0).toString()
-                title = self.autoTalks.value(1).toString()
-                speaker = self.autoTalks.value(2).toString()
-
-                # Time (in seconds) until recording for the talk starts
-                self.timeUntilStart = currenttime.secsTo(starttime)
-                # Time (in seconds) from the starttime to endtime of this talk
-                self.timeUntilEnd = starttime.secsTo(endtime)
-
-                # Display fullscreen countdown and talk info until talk starts
-                self.autoRecordWidget.set_recording(False)
-                self.autoRecordWidget.set_display_message(title, speaker)
-                self.autoRecordWidget.start_timer(self.timeUntilStart)
-                self.autoRecordWidget.showFullScreen()
-
-                # Wait for talk to start, then change display and start recording
-                self.beforeStartTimer.setInterval((self.timeUntilStart + 1) * 1000)
-                self.beforeStartTimer.setSingleShot(True)
-                self.beforeStartTimer.start()
-            else:
-                # Start time has already passed, so move on to next talk
-                self.single_auto_record()
+        # Talks whose start time has already passed are skipped by the schedule index
+        currenttime = QtCore.QDateTime.currentDateTime()
+        talk = self.db.get_next_talk_by_room(self.autoRoom, currenttime)
+        if talk is not None:
+            self.singleID, starttime, endtime = talk
+            presentation = self.db.get_presentation(self.singleID)
+
+            # Time (in seconds) until recording for the talk starts
+            self.timeUntilStart = currenttime.time().secsTo(starttime)
+            # Time (in seconds) from the starttime to endtime of this talk
+            self.timeUntilEnd = starttime.secsTo(endtime)
+
+            # Display fullscreen countdown and talk info until talk starts
+            self.autoRecordWidget.set_recording(False)
+            self.autoRecordWidget.set_display_message(presentation.title, presentation.speaker)
+            self.autoRecordWidget.start_timer(self.timeUntilStart)
+            self.autoRecordWidget.showFullScreen()
+
+            # Wait for talk to start, then change display and start recording
+            self.beforeStartTimer.setInterval((self.timeUntilStart + 1) * 1000)
+            self.beforeStartTimer.setSingleShot(True)
+            self.beforeStartTimer.start()
         else:
+            # No talk is left, release the sources
+            self.controller.shutdown()
             self.stop_auto_record_gui()
 
     def start_single_record(self):
@@ -27,7 +27,6 @@ import logging
 # PyQt modules
 from PyQt4.QtCore import SIGNAL
 from PyQt4.QtCore import QPersistentModelIndex
-from PyQt4.QtCore import QStringList
 from PyQt4.QtCore import Qt
 from PyQt4.QtGui import QAbstractItemView
 from PyQt4.QtGui import QAction
@@ -38,13 +37,13 @@ from PyQt4.QtGui import QHeaderView
 from PyQt4.QtGui import QIcon
 from PyQt4.QtGui import QMessageBox
 from PyQt4.QtGui import QPixmap
-from PyQt4.QtGui import QSortFilterProxyModel
 from PyQt4.QtGui import QTableView
 from PyQt4.QtGui import QVBoxLayout
 from PyQt4.QtGui import QWidget
 
 # Freeseer modules
 from freeseer.framework.presentation import Presentation
+from freeseer.framework.presentation_model import PresentationsFilterProxyModel
 from freeseer.frontend.qtcommon.FreeseerApp import FreeseerApp
 
 # TalkEditor modules
@@ -95,6 +94,8 @@ class TalkEditorApp(FreeseerApp):
 
         # Keep track of index of the most recently selected talk
         self.currentTalkIndex = QPersistentModelIndex()
+        # Talk id of the talk added by the New Talk window, None if it added none
+        self.newTalkId = None
 
         # Prompt user to "Continue Editing", "Discard Changes" or "Save Changes"
         self.savePromptBox = QMessageBox()
@@ -255,10 +256,9 @@ class TalkEditorApp(FreeseerApp):
     def load_presentations_model(self):
         # Load Presentation Model
         self.presentationModel = self.db.get_presentations_model()
-        self.proxy = QSortFilterProxyModel()
+        self.proxy = PresentationsFilterProxyModel()
         self.proxy.setSourceModel(self.presentationModel)
         self.tableView.setModel(self.proxy)
-        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
 
         # Fill table whitespace.
         self.tableView.horizontalHeader().setStretchLastSection(False)
@@ -283,20 +283,21 @@ class TalkEditorApp(FreeseerApp):
         self.mapper.addMapping(self.talkDetailsWidget.startTimeEdit, 8)
         self.mapper.addMapping(self.talkDetailsWidget.endTimeEdit, 9)
 
-        # Load StringLists
-        self.titleList = QStringList(self.db.get_string_list("Title"))
-        #self.speakerList = QStringList(self.db.get_speaker_list())
-        #self.categoryList = QStringList(self.db.get_category_list())
-        #self.eventList = QStringList(self.db.get_event_list())
-        #self.roomList = QStringList(self.db.get_room_list())
-
         #Disble input
         self.talkDetailsWidget.disable_input_fields()
 
     def search_talks(self):
-        # The default value is 0. If the value is -1, the keys will be read from all columns.
-        self.proxy.setFilterKeyColumn(-1)
-        self.proxy.setFilterFixedString(self.commandButtons.searchLineEdit.text())
+        """Shows only the talks matched by the full-text search of the talk database.
+
+        Matches whose page is not loaded yet are loaded first, so no match is hidden by paging.
+        """
+        text = unicode(self.commandButtons.searchLineEdit.text())
+        if text.strip():
+            talk_ids = self.db.search_presentation_ids(text)
+            self.presentationModel.add_rows(talk_ids)
+            self.proxy.set_talk_ids(talk_ids)
+        else:
+            self.proxy.set_talk_ids(None)
 
     def show_save_prompt(self):
         """Prompts the user to save or discard changes, or continue editing."""
@@ -378,7 +379,7 @@ class TalkEditorApp(FreeseerApp):
         presentation = self.create_presentation(self.newTalkWidget.talkDetailsWidget)
 
         if presentation:
-            self.db.insert_presentation(presentation)
+            self.newTalkId = self.db.insert_presentation(presentation)
             self.newTalkWidget.accept()  # Close the dialog
 
     def update_talk(self):
@@ -421,20 +422,27 @@ class TalkEditorApp(FreeseerApp):
         log.info('Opening Add Talk window...')
         self.clear_new_talk_fields()
         self.remove_new_talk_placeholder_text()
+        self.newTalkId = None
         self.newTalkWidget.talkDetailsWidget.titleLineEdit.setFocus()
         if self.newTalkWidget.exec_() == 1:
-            self.apply_changes()
+            self.apply_changes(new_talk_id=self.newTalkId)
             self.talkDetailsWidget.disable_input_fields()
         else:
             log.info('No talk added...')
 
-    def apply_changes(self, updated_talk=None):
+    def apply_changes(self, updated_talk=None, new_talk_id=None):
         """Repopulates the model to display the effective changes
 
         Updates the autocomplete fields.
         Displays the updated model in the table view, and selects the newly updated/added talk.
         """
-        self.presentationModel.select()
+        if updated_talk:
+            self.presentationModel.refresh_row(self.proxy.mapToSource(updated_talk).row())
+        elif new_talk_id is not None:
+            row = self.presentationModel.add_row(new_talk_id)
+            updated_talk = self.proxy.mapFromSource(self.presentationModel.index(row, 0))
+        else:
+            self.presentationModel.fetch_new_rows()
         self.select_talk(updated_talk)
         self.update_autocomplete_fields()
 
@@ -447,7 +455,7 @@ class TalkEditorApp(FreeseerApp):
             row = talk.row()
             column = talk.column()
         else:
-            row = self.presentationModel.rowCount() - 1  # Select last row
+            row = self.proxy.rowCount() - 1  # Select last row
             column = 0
 
         self.tableView.selectRow(row)
@@ -462,7 +470,7 @@ class TalkEditorApp(FreeseerApp):
 
         # Reversed because rows in list change position once row is removed
         for row in reversed(rows_selected):
-            self.presentationModel.removeRow(row.row())
+            self.presentationModel.removeRow(self.proxy.mapToSource(row).row())
         self.talkDetailsWidget.clear_input_fields()
         self.talkDetailsWidget.disable_input_fields()
 
@@ -562,28 +570,23 @@ class TalkEditorApp(FreeseerApp):
             self.db.export_talks_to_csv(fname)
 
     def update_autocomplete_fields(self):
-        self.titleList = QStringList(self.db.get_string_list("Title"))
-        self.speakerList = QStringList(self.db.get_string_list("Speaker"))
-        self.categoryList = QStringList(self.db.get_string_list("Category"))
-        self.eventList = QStringList(self.db.get_string_list("Event"))
-        self.roomList = QStringList(self.db.get_string_list("Room"))
-
-        self.titleCompleter = QCompleter(self.titleList)
-        self.titleCompleter.setCaseSensitivity(Qt.CaseInsensitive)
-        self.speakerCompleter = QCompleter(self.speakerList)
-        self.speakerCompleter.setCaseSensitivity(Qt.CaseInsensitive)
-        self.categoryCompleter = QCompleter(self.categoryList)
-        self.categoryCompleter.setCaseSensitivity(Qt.CaseInsensitive)
-        self.eventCompleter = QCompleter(self.eventList)
-        self.eventCompleter.setCaseSensitivity(Qt.CaseInsensitive)
-        self.roomCompleter = QCompleter(self.roomList)
-        self.roomCompleter.setCaseSensitivity(Qt.CaseInsensitive)
-
-        self.talkDetailsWidget.titleLineEdit.setCompleter(self.titleCompleter)
-        self.talkDetailsWidget.presenterLineEdit.setCompleter(self.speakerCompleter)
-        self.talkDetailsWidget.categoryLineEdit.setCompleter(self.categoryCompleter)
-        self.talkDetailsWidget.eventLineEdit.setCompleter(self.eventCompleter)
-        self.talkDetailsWidget.roomLineEdit.setCompleter(self.roomCompleter)
+        """Backs the talk detail fields' completers with the database's completion models.
+
+        The models are updated by the database as talks change, so completers are only created once.
+        """
+        fields = ((self.talkDetailsWidget.titleLineEdit, "Title"),
+                  (self.talkDetailsWidget.presenterLineEdit, "Speaker"),
+                  (self.talkDetailsWidget.categoryLineEdit, "Category"),
+                  (self.talkDetailsWidget.eventLineEdit, "Event"),
+                  (self.talkDetailsWidget.roomLineEdit, "Room"))
+
+        for lineEdit, column in fields:
+            model = self.db.get_completion_model(column)
+            if lineEdit.completer() is None or lineEdit.completer().model() is not model:
+                completer = QCompleter(model, self)
+                completer.setCaseSensitivity(Qt.CaseInsensitive)
+                completer.setModelSorting(QCompleter.CaseInsensitivelySortedModel)
+                lineEdit.setCompleter(completer)
 
     def are_fields_enabled(self):
         return (self.talkDetailsWidget.titleLineEdit.isEnabled() and
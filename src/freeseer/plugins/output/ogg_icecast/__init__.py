@@ -39,6 +39,8 @@ from PyQt4.QtCore import SIGNAL
 # Freeseer
 from freeseer.framework.plugin import IOutput
 from freeseer.framework.config import Config, options
+from freeseer.framework.encoders import RATE_CONTROL_VALUES
+from freeseer.framework.encoders import TheoraProfile
 
 # .freeseer-plugin custom
 import widget
@@ -50,6 +52,13 @@ class OggIcecastConfig(Config):
     port = options.IntegerOption(8000)
     password = options.StringOption("hackme")
     mount = options.StringOption("stream.ogg")
+    video_bitrate = options.IntegerOption(2400)
+    video_quality = options.IntegerOption(48)
+    video_rate_control = options.ChoiceOption(RATE_CONTROL_VALUES, 'cbr')  # As Ogg Output, so both share an encoder
+    video_speed = options.IntegerOption(2)
+    video_keyframe_interval = options.IntegerOption(0)
+    adaptive_bitrate = options.BooleanOption(False)
+    video_min_bitrate = options.IntegerOption(400)
 
 
 class OggIcecast(IOutput):
@@ -61,7 +70,7 @@ class OggIcecast(IOutput):
     tags = None
     CONFIG_CLASS = OggIcecastConfig
 
-    def get_output_bin(self, audio=True, video=True, metadata=None):
+    def get_output_bin(self, audio=True, video=True, metadata=None, encode_video=True):
         bin = gst.Bin()
 
         if metadata is not None:
@@ -120,15 +129,20 @@ class OggIcecast(IOutput):
             videoqueue = gst.element_factory_make("queue", "videoqueue")
             bin.add(videoqueue)
 
-            videocodec = gst.element_factory_make("theoraenc", "videocodec")
-            bin.add(videocodec)
-
             videopad = videoqueue.get_pad("sink")
             video_ghostpad = gst.GhostPad("videosink", videopad)
             bin.add_pad(video_ghostpad)
 
-            videoqueue.link(videocodec)
-            videocodec.link(muxer)
+            if encode_video:
+                videocodec = gst.element_factory_make("theoraenc", "videocodec")
+                self.get_encoder_profile().apply(videocodec)
+                bin.add(videocodec)
+
+                videoqueue.link(videocodec)
+                videocodec.link(muxer)
+            else:
+                # Video is encoded before it reaches the bin, by an encoder shared with other outputs
+                videoqueue.link(muxer)
 
         #
         # Link muxer to icecast
@@ -137,6 +151,20 @@ class OggIcecast(IOutput):
 
         return bin
 
+    def get_encoder_profile(self):
+        # Adapting the bitrate needs an encoder in bitrate mode
+        rate_control = 'cbr' if self.config.adaptive_bitrate else self.config.video_rate_control
+        return TheoraProfile(speed=self.config.video_speed,
+                             keyframe_interval=self.config.video_keyframe_interval,
+                             rate_control=rate_control,
+                             bitrate=self.config.video_bitrate,
+                             quality=self.config.video_quality)
+
+    def get_adaptive_bitrate(self):
+        if self.config.adaptive_bitrate:
+            return min(self.config.video_min_bitrate, self.config.video_bitrate), self.config.video_bitrate
+        return None
+
     def set_metadata(self, data):
         '''
         Populate global tag list variable with file metadata for
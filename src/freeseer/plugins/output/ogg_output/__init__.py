@@ -40,6 +40,8 @@ from PyQt4.QtCore import SIGNAL
 # Freeeseer
 from freeseer.framework.plugin import IOutput
 from freeseer.framework.config import Config, options
+from freeseer.framework.encoders import RATE_CONTROL_VALUES
+from freeseer.framework.encoders import TheoraProfile
 
 # .freeseer-plugin custom
 import widget
@@ -50,6 +52,10 @@ class OggOutputConfig(Config):
     matterhorn = options.IntegerOption(0)
     audio_quality = options.FloatOption(0.3)
     video_bitrate = options.IntegerOption(2400)
+    video_quality = options.IntegerOption(48)
+    video_rate_control = options.ChoiceOption(RATE_CONTROL_VALUES, 'cbr')
+    video_speed = options.IntegerOption(2)
+    video_keyframe_interval = options.IntegerOption(0)
 
 
 class OggOutput(IOutput):
@@ -61,7 +67,7 @@ class OggOutput(IOutput):
     tags = None
     CONFIG_CLASS = OggOutputConfig
 
-    def get_output_bin(self, audio=True, video=True, metadata=None):
+    def get_output_bin(self, audio=True, video=True, metadata=None, encode_video=True):
         bin = gst.Bin()
 
         if metadata is not None:
@@ -88,10 +94,6 @@ class OggOutput(IOutput):
             audioconvert = gst.element_factory_make("audioconvert", "audioconvert")
             bin.add(audioconvert)
 
-            audiolevel = gst.element_factory_make('level', 'audiolevel')
-            audiolevel.set_property('interval', 20000000)
-            bin.add(audiolevel)
-
             audiocodec = gst.element_factory_make("vorbisenc", "audiocodec")
             audiocodec.set_property("quality", self.config.audio_quality)
             bin.add(audiocodec)
@@ -114,8 +116,7 @@ class OggOutput(IOutput):
 
             # Link Elements
             audioqueue.link(audioconvert)
-            audioconvert.link(audiolevel)
-            audiolevel.link(audiocodec)
+            audioconvert.link(audiocodec)
             audiocodec.link(vorbistag)
             vorbistag.link(muxer)
 
@@ -126,18 +127,22 @@ class OggOutput(IOutput):
             videoqueue = gst.element_factory_make("queue", "videoqueue")
             bin.add(videoqueue)
 
-            videocodec = gst.element_factory_make("theoraenc", "videocodec")
-            videocodec.set_property("bitrate", self.config.video_bitrate)
-            bin.add(videocodec)
-
             # Setup ghost pads
             videopad = videoqueue.get_pad("sink")
             video_ghostpad = gst.GhostPad("videosink", videopad)
             bin.add_pad(video_ghostpad)
 
-            # Link Elements
-            videoqueue.link(videocodec)
-            videocodec.link(muxer)
+            if encode_video:
+                videocodec = gst.element_factory_make("theoraenc", "videocodec")
+                self.get_encoder_profile().apply(videocodec)
+                bin.add(videocodec)
+
+                # Link Elements
+                videoqueue.link(videocodec)
+                videocodec.link(muxer)
+            else:
+                # Video is encoded before it reaches the bin, by an encoder shared with other outputs
+                videoqueue.link(muxer)
 
         #
         # Link muxer to filesink
@@ -146,6 +151,13 @@ class OggOutput(IOutput):
 
         return bin
 
+    def get_encoder_profile(self):
+        return TheoraProfile(speed=self.config.video_speed,
+                             keyframe_interval=self.config.video_keyframe_interval,
+                             rate_control=self.config.video_rate_control,
+                             bitrate=self.config.video_bitrate,
+                             quality=self.config.video_quality)
+
     def set_metadata(self, data):
         '''
         Populate global tag list variable with file metadata for
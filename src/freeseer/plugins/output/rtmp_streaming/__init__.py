@@ -36,8 +36,9 @@ To enable streaming
 4. Click the "Setup" button to access more options
 5. Specify the "Stream URL" (the location you'll be streaming to)
 
-.. note:: All outputs must be set to "leaky mode".
-          Go to "Plugins" > "Output" > "Video Preview" > "Leaky Queue".
+.. note:: The stream drops data it cannot send in time, so a slow network never
+          stalls the recording to file. The Video Preview should be set to
+          "leaky mode" in "Plugins" > "Output" > "Video Preview" > "Leaky Queue".
 
 Justin.tv
 *********
@@ -95,6 +96,9 @@ from PyQt4 import QtGui, QtCore
 from freeseer.framework.plugin import IOutput
 from freeseer.framework.plugin import PluginError
 from freeseer.framework.config import Config, options
+from freeseer.framework.encoders import RATE_CONTROL_VALUES
+from freeseer.framework.encoders import X264_SPEED_VALUES
+from freeseer.framework.encoders import X264Profile
 
 log = logging.getLogger(__name__)
 
@@ -132,6 +136,13 @@ class RTMPOutputConfig(Config):
     audio_quality = options.IntegerOption(3)
     video_bitrate = options.IntegerOption(2400)
     video_tune = options.ChoiceOption(TUNE_VALUES, 'none')
+    video_quality = options.IntegerOption(21)
+    video_rate_control = options.ChoiceOption(RATE_CONTROL_VALUES, 'cbr')
+    video_threads = options.IntegerOption(0)
+    video_speed = options.ChoiceOption(X264_SPEED_VALUES, 'veryfast')
+    video_keyframe_interval = options.IntegerOption(60)
+    adaptive_bitrate = options.BooleanOption(False)
+    video_min_bitrate = options.IntegerOption(400)
     audio_codec = options.ChoiceOption(AUDIO_CODEC_VALUES, 'lame')
     streaming_destination = options.ChoiceOption(STREAMING_DESTINATION_VALUES, 'custom')
     streaming_key = options.StringOption('')
@@ -160,7 +171,7 @@ class RTMPOutput(IOutput):
     # Converts audio and video to flv with [flvmux] element
     # Streams flv content to [self.config.url]
     # TODO - Error handling - verify pad setup
-    def get_output_bin(self, audio=True, video=True, metadata=None):
+    def get_output_bin(self, audio=True, video=True, metadata=None, encode_video=True):
         bin = gst.Bin()
 
         if metadata is not None:
@@ -195,10 +206,6 @@ class RTMPOutput(IOutput):
             audioconvert = gst.element_factory_make("audioconvert", "audioconvert")
             bin.add(audioconvert)
 
-            audiolevel = gst.element_factory_make('level', 'audiolevel')
-            audiolevel.set_property('interval', 20000000)
-            bin.add(audiolevel)
-
             audiocodec = gst.element_factory_make(self.config.audio_codec, "audiocodec")
 
             if 'quality' in audiocodec.get_property_names():
@@ -215,8 +222,7 @@ class RTMPOutput(IOutput):
 
             # Link Elements
             audioqueue.link(audioconvert)
-            audioconvert.link(audiolevel)
-            audiolevel.link(audiocodec)
+            audioconvert.link(audiocodec)
             audiocodec.link(muxer)
 
         #
@@ -226,20 +232,22 @@ class RTMPOutput(IOutput):
             videoqueue = gst.element_factory_make("queue", "videoqueue")
             bin.add(videoqueue)
 
-            videocodec = gst.element_factory_make("x264enc", "videocodec")
-            videocodec.set_property("bitrate", self.config.video_bitrate)
-            if self.config.video_tune != 'none':
-                videocodec.set_property('tune', self.config.video_tune)
-            bin.add(videocodec)
-
             # Setup ghost pads
             videopad = videoqueue.get_pad("sink")
             video_ghostpad = gst.GhostPad("videosink", videopad)
             bin.add_pad(video_ghostpad)
 
-            # Link Elements
-            videoqueue.link(videocodec)
-            videocodec.link(muxer)
+            if encode_video:
+                videocodec = gst.element_factory_make("x264enc", "videocodec")
+                self.get_encoder_profile().apply(videocodec)
+                bin.add(videocodec)
+
+                # Link Elements
+                videoqueue.link(videocodec)
+                videocodec.link(muxer)
+            else:
+                # Video is encoded before it reaches the bin, by an encoder shared with other outputs
+                videoqueue.link(muxer)
 
         #
         # Link muxer to rtmpsink
@@ -262,6 +270,22 @@ class RTMPOutput(IOutput):
             return ""
         return metadata[self.DESCRIPTION_KEY]
 
+    def get_encoder_profile(self):
+        # Adapting the bitrate needs an encoder in bitrate mode
+        rate_control = 'cbr' if self.config.adaptive_bitrate else self.config.video_rate_control
+        return X264Profile(threads=self.config.video_threads,
+                           speed=self.config.video_speed,
+                           tune=self.config.video_tune,
+                           keyframe_interval=self.config.video_keyframe_interval,
+                           rate_control=rate_control,
+                           bitrate=self.config.video_bitrate,
+                           quality=self.config.video_quality)
+
+    def get_adaptive_bitrate(self):
+        if self.config.adaptive_bitrate:
+            return min(self.config.video_min_bitrate, self.config.video_bitrate), self.config.video_bitrate
+        return None
+
     def set_metadata(self, data):
         '''
         Populate global tag list variable with file metadata for
@@ -355,7 +379,7 @@ class RTMPOutput(IOutput):
         # Note
         #
 
-        self.label_note = QtGui.QLabel(self.gui.uiTranslator.translate('rtmp', "*For RTMP streaming, all other outputs must be set to leaky"))
+        self.label_note = QtGui.QLabel(self.gui.uiTranslator.translate('rtmp', "*For RTMP streaming, the video preview should be set to leaky"))
         self.stream_settings_widget_layout.addRow(self.label_note)
 
         return self.stream_settings_widget
@@ -36,6 +36,19 @@ import gst
 
 # Freeseer
 from freeseer.framework.plugin import IOutput
+from freeseer.framework.config import Config, options
+from freeseer.framework.encoders import RATE_CONTROL_VALUES
+from freeseer.framework.encoders import VP8Profile
+
+
+class WebMOutputConfig(Config):
+    """Configuration class for WebMOutput plugin."""
+    video_bitrate = options.IntegerOption(2400)
+    video_quality = options.FloatOption(5.0)
+    video_rate_control = options.ChoiceOption(RATE_CONTROL_VALUES, 'quality')
+    video_threads = options.IntegerOption(0)
+    video_speed = options.IntegerOption(2)
+    video_keyframe_interval = options.IntegerOption(0)
 
 
 class WebMOutput(IOutput):
@@ -45,8 +58,9 @@ class WebMOutput(IOutput):
     recordto = IOutput.FILE
     extension = "webm"
     tags = None
+    CONFIG_CLASS = WebMOutputConfig
 
-    def get_output_bin(self, audio=True, video=True, metadata=None):
+    def get_output_bin(self, audio=True, video=True, metadata=None, encode_video=True):
         bin = gst.Bin()
 
         if metadata is not None:
@@ -70,10 +84,6 @@ class WebMOutput(IOutput):
             audioconvert = gst.element_factory_make("audioconvert", "audioconvert")
             bin.add(audioconvert)
 
-            audiolevel = gst.element_factory_make('level', 'audiolevel')
-            audiolevel.set_property('interval', 20000000)
-            bin.add(audiolevel)
-
             audiocodec = gst.element_factory_make("vorbisenc", "audiocodec")
             bin.add(audiocodec)
 
@@ -95,8 +105,7 @@ class WebMOutput(IOutput):
 
             # Link Elements
             audioqueue.link(audioconvert)
-            audioconvert.link(audiolevel)
-            audiolevel.link(audiocodec)
+            audioconvert.link(audiocodec)
             audiocodec.link(vorbistag)
             vorbistag.link(muxer)
 
@@ -107,16 +116,21 @@ class WebMOutput(IOutput):
             videoqueue = gst.element_factory_make("queue", "videoqueue")
             bin.add(videoqueue)
 
-            videocodec = gst.element_factory_make("vp8enc", "videocodec")
-            bin.add(videocodec)
-
             videopad = videoqueue.get_pad("sink")
             video_ghostpad = gst.GhostPad("videosink", videopad)
             bin.add_pad(video_ghostpad)
 
-            # Link Elements
-            videoqueue.link(videocodec)
-            videocodec.link(muxer)
+            if encode_video:
+                videocodec = gst.element_factory_make("vp8enc", "videocodec")
+                self.get_encoder_profile().apply(videocodec)
+                bin.add(videocodec)
+
+                # Link Elements
+                videoqueue.link(videocodec)
+                videocodec.link(muxer)
+            else:
+                # Video is encoded before it reaches the bin, by an encoder shared with other outputs
+                videoqueue.link(muxer)
 
         #
         # Link muxer to filesink
@@ -125,6 +139,14 @@ class WebMOutput(IOutput):
 
         return bin
 
+    def get_encoder_profile(self):
+        return VP8Profile(threads=self.config.video_threads,
+                          speed=self.config.video_speed,
+                          keyframe_interval=self.config.video_keyframe_interval,
+                          rate_control=self.config.video_rate_control,
+                          bitrate=self.config.video_bitrate,
+                          quality=self.config.video_quality)
+
     def set_metadata(self, data):
         '''
         Populate global tag list variable with file metadata for
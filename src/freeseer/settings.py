@@ -64,4 +64,14 @@ class FreeseerConfig(Config):
     record_to_stream_plugin = options.StringOption('RTMP Streaming')
     audio_feedback = options.BooleanOption(False)
     video_preview = options.BooleanOption(True)
+    preroll = options.BooleanOption(False)
+    segment_duration = options.IntegerOption(0)  # Minutes per recorded file, 0 to disable
+    segment_size = options.IntegerOption(0)  # MiB per recorded file, 0 to disable
+    health_check_interval = options.IntegerOption(10)  # Seconds between pipeline health checks, 0 to disable
+    share_encoders = options.BooleanOption(False)  # Encode video once for the outputs using the same codec
+    file_buffer_time = options.IntegerOption(2)  # Seconds of data buffered by file outputs, never dropped
+    stream_buffer_time = options.IntegerOption(2)  # Seconds of data buffered by stream outputs before dropping any
+    stream_buffer_leaky = options.ChoiceOption(['upstream', 'downstream'], 'downstream')  # Drop newest or oldest data
+    stream_buffer_size = options.IntegerOption(64)  # MiB of stream kept on disk while reconnecting, 0 to disable
+    stream_catch_up = options.BooleanOption(True)  # Send what was kept after reconnecting, or skip to live
     default_language = options.StringOption(detect_system_language())
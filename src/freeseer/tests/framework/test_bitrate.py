@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import unittest
+
+from freeseer.framework.bitrate import BitrateController
+
+
+class TestBitrateController(unittest.TestCase):
+
+    def setUp(self):
+        self.bitrates = []
+        self.video = []
+        self.controller = BitrateController(lambda: 0.0, self.bitrates.append, self.video.append, 400, 2400)
+
+    def check(self, fill, times=1):
+        for i in range(times):
+            self.controller.check(fill)
+
+    def test_full_queues_lower_bitrate(self):
+        self.check(0.9)
+        self.assertEqual(self.bitrates, [1800])
+        self.check(0.9, 10)
+        self.assertEqual(self.controller.bitrate, 400)
+        self.assertTrue(all(bitrate >= 400 for bitrate in self.bitrates))
+
+    def test_empty_queues_raise_bitrate(self):
+        self.check(0.9, 2)
+        self.check(0.0, BitrateController.STABLE_CHECKS - 1)
+        self.assertEqual(self.controller.bitrate, 1350)
+        self.check(0.0)
+        self.assertEqual(self.controller.bitrate, 1486)
+
+        self.check(0.0, 100)
+        self.assertEqual(self.controller.bitrate, 2400)
+
+    def test_steady_queues_keep_bitrate(self):
+        self.check(0.3, 20)
+        self.assertEqual(self.bitrates, [])
+
+    def test_audio_only_and_back(self):
+        self.check(0.9, 7)
+        self.assertEqual(self.controller.bitrate, 400)
+        self.assertEqual(self.video, [])
+
+        self.check(0.9, BitrateController.AUDIO_ONLY_CHECKS)
+        self.assertEqual(self.video, [False])
+        self.check(0.9, 10)
+        self.assertEqual(self.video, [False])
+
+        self.check(0.0, BitrateController.RECOVERY_CHECKS)
+        self.assertEqual(self.video, [False, True])
+        self.assertEqual(self.bitrates[-1], 400)
+
+    def test_no_audio_only_without_audio(self):
+        controller = BitrateController(lambda: 0.0, self.bitrates.append, None, 400, 2400)
+        for i in range(20):
+            controller.check(0.9)
+        self.assertTrue(controller.video)
+        self.assertEqual(controller.bitrate, 400)
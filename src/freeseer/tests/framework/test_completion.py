@@ -0,0 +1,52 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+# Copyright (C) 2014 Free and Open Source Software Learning Centre
+# http://fosslc.org
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import unittest
+
+from freeseer.framework.completion import CompletionModel
+
+
+class TestCompletionModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = CompletionModel()
+        self.model.reset({"T105": 2, "lobby": 1, "": 4})
+
+    def values(self):
+        return [unicode(self.model.index(row, 0).data().toString()) for row in range(self.model.rowCount())]
+
+    def test_reset_sorts_case_insensitively_and_skips_empty_values(self):
+        self.assertEqual(self.values(), ["lobby", "T105"])
+
+    def test_add_inserts_new_values_in_order(self):
+        self.model.add("Main Hall")
+        self.model.add("T105")
+        self.assertEqual(self.values(), ["lobby", "Main Hall", "T105"])
+
+    def test_remove_keeps_values_still_in_use(self):
+        self.model.remove("T105")
+        self.assertEqual(self.values(), ["lobby", "T105"])
+        self.model.remove("T105")
+        self.assertEqual(self.values(), ["lobby"])
+        self.model.remove("Unknown")
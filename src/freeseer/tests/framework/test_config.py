@@ -117,6 +117,46 @@ class TestConfig(unittest.TestCase):
                     'default': True,
                     'type': 'boolean',
                 },
+                'preroll': {
+                    'default': False,
+                    'type': 'boolean',
+                },
+                'segment_duration': {
+                    'default': 0,
+                    'type': 'integer',
+                },
+                'segment_size': {
+                    'default': 0,
+                    'type': 'integer',
+                },
+                'health_check_interval': {
+                    'default': 10,
+                    'type': 'integer',
+                },
+                'share_encoders': {
+                    'default': False,
+                    'type': 'boolean',
+                },
+                'file_buffer_time': {
+                    'default': 2,
+                    'type': 'integer',
+                },
+                'stream_buffer_time': {
+                    'default': 2,
+                    'type': 'integer',
+                },
+                'stream_buffer_leaky': {
+                    'default': 'downstream',
+                    'enum': ['upstream', 'downstream'],
+                },
+                'stream_buffer_size': {
+                    'default': 64,
+                    'type': 'integer',
+                },
+                'stream_catch_up': {
+                    'default': True,
+                    'type': 'boolean',
+                },
                 'default_language': {
                     'default': 'tr_en_US.qm',
                     'type': 'string',
@@ -22,17 +22,31 @@
 # For support, questions, suggestions or any other inquiries, visit:
 # http://wiki.github.com/Freeseer/freeseer/
 
+import csv
+import gzip
 import os
 import shutil
+import sqlite3
 import tempfile
+import threading
 import unittest
 
 from PyQt4 import QtSql
+from PyQt4.QtCore import QAbstractItemModel
+from PyQt4.QtCore import QDate
+from PyQt4.QtCore import QDateTime
+from PyQt4.QtCore import QTime
+from PyQt4.QtCore import Qt
 
+from freeseer import SCHEMA_VERSION
 from freeseer.framework.config.profile import Profile
+from freeseer.framework.database import PRESENTATIONS_SCHEMA_310
 from freeseer.framework.database import QtDBConnector
+from freeseer.framework.failure import Failure
 from freeseer.framework.plugin import PluginManager
 from freeseer.framework.presentation import Presentation
+from freeseer.framework.presentation_model import PresentationsFilterProxyModel
+from freeseer.framework.presentation_model import PresentationsTableModel
 
 
 class TestDatabase(unittest.TestCase):
@@ -78,25 +92,36 @@ class TestDatabase(unittest.TestCase):
         """Simply test that a query is returned"""
         self.assertIsInstance(self.db.get_talks_by_room("T105"), QtSql.QSqlQuery)
 
+    def test_get_talks_queries_are_independent(self):
+        """Test that a query returned by get_talks is not reset by the next call"""
+        self.db.insert_presentation(Presentation("Building NetBSD", "David Maxwell"))
+        talks = self.db.get_talks()
+        self.assertTrue(talks.next())
+        first_id = talks.value(0).toString()
+
+        self.assertTrue(self.db.get_talks().next())
+        self.assertTrue(talks.next())
+        self.assertNotEqual(talks.value(0).toString(), first_id)
+
     def test_get_presentation(self):
         """Simply test that a presentation is returned"""
         self.assertIsInstance(self.db.get_presentation(1), Presentation)
 
     def test_get_presentations_model(self):
         """Simply test that a model is returned"""
-        self.assertIsInstance(self.db.get_presentations_model(), QtSql.QSqlTableModel)
+        self.assertIsInstance(self.db.get_presentations_model(), PresentationsTableModel)
 
     def test_get_events_model(self):
         """Simply test that a model is returned"""
-        self.assertIsInstance(self.db.get_events_model(), QtSql.QSqlQueryModel)
+        self.assertIsInstance(self.db.get_events_model(), QAbstractItemModel)
 
     def test_get_rooms_model(self):
         """Simply test that a model is returned"""
-        self.assertIsInstance(self.db.get_rooms_model("SC2011"), QtSql.QSqlQueryModel)
+        self.assertIsInstance(self.db.get_rooms_model("SC2011"), QAbstractItemModel)
 
     def test_get_talks_model(self):
         """Simply test that a model is returned"""
-        self.assertIsInstance(self.db.get_talks_model("SC2011", "T105"), QtSql.QSqlQueryModel)
+        self.assertIsInstance(self.db.get_talks_model("SC2011", "T105"), QAbstractItemModel)
 
     def test_add_talks_from_rss(self):
         """Test that talks are retrieved from the RSS feed"""
@@ -122,3 +147,299 @@ class TestDatabase(unittest.TestCase):
 
         self.db.add_talks_from_csv(fname)
         self.assertTrue(self.db.presentation_exists(presentation))
+
+    def test_insert_presentation_with_quotes(self):
+        """Test that values containing quotes are bound rather than breaking the query"""
+        presentation = Presentation('Python\'s "Zen"', "Tim O'Brien", room='T"105')
+        self.db.insert_presentation(presentation)
+        self.assertTrue(self.db.presentation_exists(presentation))
+
+        query = self.db.get_talks_by_room('T"105')
+        self.assertTrue(query.next())
+        self.assertEqual(unicode(query.value(1).toString()), 'Python\'s "Zen"')
+
+    def test_insert_presentations(self):
+        """Test that a batch insert reports inserted and skipped duplicate talks"""
+        presentations = [Presentation("Building NetBSD", "David Maxwell"),
+                         Presentation("Managing map data in a database", "Andrew Ross"),
+                         Presentation("Building NetBSD", "David Maxwell")]
+
+        self.assertEqual(self.db.insert_presentations(presentations), (2, 1))
+        self.assertTrue(self.db.presentation_exists(presentations[0]))
+        self.assertTrue(self.db.presentation_exists(presentations[1]))
+
+    def test_iter_presentations(self):
+        """Test that every talk is decoded in talk id order"""
+        self.db.insert_presentations([Presentation("Building NetBSD", "David Maxwell", room="T105"),
+                                      Presentation("Managing map data in a database", "Andrew Ross")])
+
+        talks = list(self.db.iter_presentations())
+        self.assertEqual([talk_id for talk_id, presentation in talks], [u'1', u'2', u'3'])
+        self.assertEqual(talks[1][1].title, u'Building NetBSD')
+        self.assertEqual(talks[1][1].speaker, u'David Maxwell')
+        self.assertEqual(talks[1][1].room, u'T105')
+        self.assertEqual(talks[2][1].speaker, u'Andrew Ross')
+
+    def test_update_31to32(self):
+        """Test that a 3.1 database keeps its talks, stores dates as ISO 8601 text and gains the lookup indexes"""
+        db_file = os.path.join(self.profile_path, 'presentations310.db')
+        connection = sqlite3.connect(db_file)
+        connection.execute(PRESENTATIONS_SCHEMA_310)
+        connection.execute("""INSERT INTO presentations VALUES
+                              (NULL, 'Building NetBSD', 'David Maxwell', '', '', 'SC2011', 'T105',
+                               '2011-08-14', '10:00', '11:00')""")
+        connection.execute("""INSERT INTO presentations VALUES
+                              (NULL, 'Managing map data in a database', 'Andrew Ross', '', '', 'SC2011', 'T105',
+                               '2011-08-14 12:00', '2011-08-14 12:00', 1300)""")
+        connection.execute('PRAGMA user_version = 310')
+        connection.commit()
+        connection.close()
+
+        QtDBConnector(db_file, PluginManager(Profile(self.profile_path, 'testing')))
+
+        connection = sqlite3.connect(db_file)
+        self.assertEqual(connection.execute('PRAGMA user_version').fetchone()[0], SCHEMA_VERSION)
+        self.assertEqual(connection.execute('SELECT Title FROM presentations').fetchone()[0], 'Building NetBSD')
+        self.assertEqual(connection.execute('SELECT Date, StartTime, EndTime FROM presentations ORDER BY Id').fetchall(),
+                         [('2011-08-14', '10:00:00', '11:00:00'), ('2011-08-14', '12:00:00', '1300')])
+        types = connection.execute('SELECT DISTINCT typeof(Date), typeof(StartTime), typeof(EndTime) FROM presentations')
+        self.assertEqual(types.fetchall(), [('text', 'text', 'text')])
+        indexes = [row[1] for row in connection.execute('PRAGMA index_list(presentations)')]
+        self.assertIn('presentations_event_room_date', indexes)
+        self.assertIn('presentations_room_date', indexes)
+        connection.close()
+
+    def test_presentations_exist(self):
+        """Test that only the stored (speaker, title) pairs are returned"""
+        self.db.insert_presentation(Presentation("Building NetBSD", "David Maxwell"))
+
+        existing = self.db.presentations_exist([("David Maxwell", "Building NetBSD"),
+                                                ("Andrew Ross", "Managing map data in a database")])
+        self.assertEqual(existing, set([("David Maxwell", "Building NetBSD")]))
+
+    def test_presentations_exist_in_chunks(self):
+        """Test that more pairs than SQLite binds to one statement are looked up, without mixing up pairs"""
+        self.db.insert_presentations(Presentation("Talk {}".format(i), "Speaker {}".format(i)) for i in range(600))
+
+        pairs = [("Speaker {}".format(i), "Talk {}".format(i)) for i in range(1200)]
+        pairs.append(("Speaker 1", "Talk 2"))
+        self.assertEqual(self.db.presentations_exist(pairs), set(pairs[:600]))
+
+    def test_get_reports(self):
+        """Test that reports are loaded with their presentations"""
+        self.db.insert_failure(Failure(1, "No audio", "Audio"))
+        self.db.insert_failure(Failure(999, "Talk was removed", "Other"))
+
+        reports = dict((report.failure.talkId, report) for report in self.db.get_reports())
+        self.assertEqual(len(reports), 2)
+        self.assertIsInstance(reports['1'].presentation, Presentation)
+        self.assertEqual(reports['1'].failure.comment, "No audio")
+        self.assertIsNone(reports['999'].presentation)
+
+        # Nested iterations do not share their query
+        pairs = [(outer.failure.talkId, inner.failure.talkId)
+                 for outer in self.db.iter_reports() for inner in self.db.iter_reports()]
+        self.assertEqual(len(pairs), 4)
+
+    def test_export_talks_to_csv(self):
+        """Test that talks are exported to a gzip compressed csv file with progress reports"""
+        self.db.insert_presentation(Presentation(u"Caf\xe9 \"talk\"", "David Maxwell"))
+        fname = os.path.join(self.profile_path, 'talks.csv.gz')
+        progress = []
+
+        self.assertEqual(self.db.export_talks_to_csv(fname, progress=progress.append), 2)
+        self.assertEqual(progress, [2])
+
+        with gzip.open(fname) as csv_file:
+            rows = list(csv.reader(csv_file))
+        self.assertEqual(rows[0][:2], ['Title', 'Speaker'])
+        self.assertEqual(rows[2][:2], [u"Caf\xe9 \"talk\"".encode('utf-8'), 'David Maxwell'])
+
+    def test_connection_profile(self):
+        """Test that the DatabaseConfig pragmas are applied when the database is opened"""
+        query = QtSql.QSqlQuery('PRAGMA journal_mode')
+        self.assertTrue(query.next())
+        self.assertEqual(unicode(query.value(0).toString()).upper(), 'WAL')
+
+        query = QtSql.QSqlQuery('PRAGMA synchronous')
+        self.assertTrue(query.next())
+        self.assertEqual(query.value(0).toInt()[0], 1)  # NORMAL
+
+    def test_worker_thread_connection(self):
+        """Test that a worker thread uses its own connection to the same database"""
+        presentation = Presentation("Building NetBSD", "David Maxwell")
+        connections = []
+
+        def worker():
+            connections.append(self.db.talkdb.connectionName())
+            self.db.insert_presentation(presentation)
+            self.db.close_connection()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertNotEqual(connections[0], self.db.talkdb.connectionName())
+        self.assertTrue(self.db.presentation_exists(presentation))
+
+    def test_talks_model_follows_changes(self):
+        """Test that inserted, updated and deleted talks are reflected by the schedule models"""
+        model = self.db.get_talks_model("SC2011", "T105")
+        self.assertEqual(model.rowCount(), 0)
+
+        self.db.insert_presentation(Presentation("Building NetBSD", "David Maxwell", event="SC2011", room="T105",
+                                                 date="2011-08-14", startTime="10:00"))
+        model = self.db.get_talks_model("SC2011", "T105", "2011-08-14")
+        self.assertEqual(model.rowCount(), 1)
+        self.assertEqual(model.index(0, 0).data().toString(), "David Maxwell - Building NetBSD")
+        talk_id = model.index(0, 1).data().toString()
+
+        self.db.update_presentation(talk_id, Presentation("Building NetBSD", "David Maxwell", event="SC2011",
+                                                          room="T106", date="2011-08-14", startTime="10:00"))
+        self.assertEqual(self.db.get_talks_model("SC2011", "T105").rowCount(), 0)
+        self.assertEqual(self.db.get_rooms_model("SC2011").rowCount(), 1)
+
+        self.db.delete_presentation(talk_id)
+        self.assertEqual(self.db.get_events_model().rowCount(), 1)  # Only the default talk's event is left
+
+    def test_get_next_talk_by_room(self):
+        """Test that the next talk of a room skips talks that already started"""
+        today = QDate.currentDate().toString(Qt.ISODate)
+        self.db.insert_presentations([
+            Presentation("Keynote", "Jane Doe", room="T105", date=today, startTime="09:00:00", endTime="10:00:00"),
+            Presentation("Lightning talks", "John Doe", room="T105", date=today, startTime="11:00:00",
+                         endTime="11:30:00"),
+            Presentation("Other room", "John Doe", room="T106", date=today, startTime="10:00:00")])
+
+        after = QDateTime(QDate.currentDate(), QTime(9, 30))
+        self.assertEqual(self.db.get_next_talk_by_room("T105", after), (u'3', QTime(11, 0), QTime(11, 30)))
+
+        self.db.delete_presentation(3)
+        self.assertEqual(self.db.get_next_talk_by_room("T105", after), None)
+        after = QDateTime(QDate.currentDate(), QTime(8, 0))
+        self.assertEqual(self.db.get_next_talk_by_room("T105", after), (u'2', QTime(9, 0), QTime(10, 0)))
+
+    def test_search_presentations(self):
+        """Test that searches match word prefixes across columns and rank talks with more matches first"""
+        self.db.insert_presentation(Presentation("Building NetBSD", "David Maxwell", "Building NetBSD from source"))
+        self.db.insert_presentation(Presentation("Managing map data in a database", "Andrew Ross"))
+        self.db.insert_presentation(Presentation("Building maps", "Jane Doe"))
+
+        results = self.db.search_presentations("build")
+        self.assertEqual([presentation.title for talk_id, presentation in results], ["Building NetBSD", "Building maps"])
+
+        results = self.db.search_presentations('map "ross"')
+        self.assertEqual([presentation.speaker for talk_id, presentation in results], ["Andrew Ross"])
+        self.assertEqual(self.db.search_presentations("build", limit=1)[0][1].title, "Building NetBSD")
+        self.assertEqual(self.db.search_presentations(""), [])
+
+    def test_search_presentation_ids(self):
+        """Test that the ids of every match are returned in the order of search_presentations"""
+        self.db.insert_presentation(Presentation("Building NetBSD", "David Maxwell", "Building NetBSD from source"))
+        self.db.insert_presentation(Presentation("Building maps", "Jane Doe"))
+
+        self.assertEqual(self.db.search_presentation_ids("build"),
+                         [talk_id for talk_id, presentation in self.db.search_presentations("build")])
+        self.assertEqual(self.db.search_presentation_ids("build", limit=1), [u'2'])
+        self.assertEqual(self.db.search_presentation_ids(""), [])
+
+    def test_search_ranks_by_hits(self):
+        """Test that talks are ranked by their number of hits, however far into a column the hits are"""
+        self.db.insert_presentation(Presentation("Two hits", "David Maxwell", "x " * 50000 + "build build"))
+        self.db.insert_presentation(Presentation("Build build", "Builder"))
+
+        results = self.db.search_presentations("build")
+        self.assertEqual([presentation.title for talk_id, presentation in results], ["Build build", "Two hits"])
+
+    def test_search_follows_updates(self):
+        """Test that the full-text index is kept in sync with updated and deleted talks"""
+        self.db.insert_presentation(Presentation("Building NetBSD", "David Maxwell"))
+        talk_id = self.db.search_presentations("netbsd")[0][0]
+
+        self.db.update_presentation(talk_id, Presentation("Building FreeBSD", "David Maxwell"))
+        self.assertEqual(self.db.search_presentations("netbsd"), [])
+        self.assertEqual(self.db.search_presentations("freebsd")[0][0], talk_id)
+
+        self.db.delete_presentation(talk_id)
+        self.assertEqual(self.db.search_presentations("freebsd"), [])
+
+    def test_presentations_model_pages(self):
+        """Test that the presentations model loads pages on demand and writes edits to the database"""
+        self.db.insert_presentations(Presentation("Talk {}".format(i), "Speaker") for i in range(300))
+        model = self.db.get_presentations_model()
+        model.select()
+
+        self.assertEqual(model.rowCount(), PresentationsTableModel.PAGE_SIZE)
+        self.assertTrue(model.canFetchMore())
+        model.fetchMore()
+        self.assertEqual(model.rowCount(), 301)  # Including the default talk
+        self.assertFalse(model.canFetchMore())
+
+        self.assertTrue(model.setData(model.index(1, 2), "Another Speaker"))
+        self.assertEqual(self.db.get_presentation(model.talk_id(1)).speaker, "Another Speaker")
+
+        self.assertTrue(model.removeRow(1))
+        self.assertEqual(model.rowCount(), 300)
+
+    def test_presentations_model_add_row(self):
+        """Test that a talk added before the last page is loaded is shown once, in its own row"""
+        self.db.insert_presentations(Presentation("Talk {}".format(i), "Speaker") for i in range(300))
+        model = self.db.get_presentations_model()
+        model.select()
+
+        talk_id = self.db.insert_presentation(Presentation("New talk", "New speaker"))
+        row = model.add_row(talk_id)
+        self.assertEqual(row, PresentationsTableModel.PAGE_SIZE)
+        self.assertEqual(model.talk_id(row), talk_id)
+
+        model.fetchMore()
+        self.assertEqual(model.rowCount(), 302)  # Including the default talk
+        self.assertEqual([model.talk_id(row) for row in range(model.rowCount())].count(talk_id), 1)
+        self.assertEqual(model.add_row(talk_id), row)
+
+    def test_presentations_model_add_rows(self):
+        """Test that search hits on pages not loaded yet are added to the model in one go"""
+        self.db.insert_presentations(Presentation("Talk {}".format(i), "Speaker") for i in range(1200))
+        self.assertEqual(len(self.db.get_presentation_rows_by_ids(str(i) for i in range(1, 1300))), 1201)
+
+        model = self.db.get_presentations_model()
+        model.select()
+        talk_ids = self.db.search_presentation_ids("1100")
+        rows = model.add_rows(talk_ids)
+        self.assertEqual([model.talk_id(rows[talk_id]) for talk_id in talk_ids], talk_ids)
+        self.assertEqual(model.rowCount(), PresentationsTableModel.PAGE_SIZE + 1)
+
+    def test_presentations_filter_proxy(self):
+        """Test that the filter proxy only shows the talks of the given ids"""
+        self.db.insert_presentation(Presentation("Building NetBSD", "David Maxwell"))
+        self.db.insert_presentation(Presentation("Building maps", "Jane Doe"))
+        model = self.db.get_presentations_model()
+        model.select()
+        proxy = PresentationsFilterProxyModel()
+        proxy.setSourceModel(model)
+        self.assertEqual(proxy.rowCount(), 3)  # Including the default talk
+
+        proxy.set_talk_ids(self.db.search_presentation_ids("netbsd"))
+        self.assertEqual(proxy.rowCount(), 1)
+        self.assertEqual(model.talk_id(proxy.mapToSource(proxy.index(0, 0)).row()), u'2')
+
+        proxy.set_talk_ids(None)
+        self.assertEqual(proxy.rowCount(), 3)
+
+    def test_completion_model_follows_changes(self):
+        """Test that completion models are updated incrementally as talks change"""
+        model = self.db.get_completion_model("Room")
+        self.assertEqual(model.rowCount(), 0)  # The default talk has no room
+
+        self.db.insert_presentation(Presentation("Building NetBSD", "David Maxwell", room="T105"))
+        self.db.insert_presentation(Presentation("Managing map data in a database", "Andrew Ross", room="T105"))
+        self.assertEqual(model.rowCount(), 1)
+
+        talk_id = self.db.search_presentations("netbsd")[0][0]
+        self.db.update_presentation(talk_id, Presentation("Building NetBSD", "David Maxwell", room="a106"))
+        self.assertEqual([unicode(model.index(row, 0).data().toString()) for row in range(model.rowCount())],
+                         ["a106", "T105"])
+
+        self.db.delete_presentation(talk_id)
+        self.assertEqual(model.rowCount(), 1)
+        self.assertIs(self.db.get_completion_model("Room"), model)
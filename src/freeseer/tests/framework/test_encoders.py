@@ -0,0 +1,93 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import unittest
+
+from mock import patch
+
+from freeseer.framework import encoders
+from freeseer.framework.encoders import TheoraProfile
+from freeseer.framework.encoders import VP8Profile
+from freeseer.framework.encoders import X264Profile
+
+
+class Encoder(object):
+    """Element with a fixed set of properties that rejects any other property like GStreamer elements do."""
+
+    def __init__(self, *names):
+        self.props = dict.fromkeys(names)
+
+    def set_property(self, name, value):
+        if name not in self.props:
+            raise TypeError("object has no property '{}'".format(name))
+        self.props[name] = value
+
+
+class TestEncoders(unittest.TestCase):
+
+    @patch('multiprocessing.cpu_count', return_value=8)
+    def test_default_threads_leaves_a_core(self, cpu_count):
+        self.assertEqual(encoders.default_threads(), 7)
+        self.assertEqual(X264Profile().threads, 7)
+        self.assertEqual(X264Profile(threads=2).threads, 2)
+
+    @patch('multiprocessing.cpu_count', side_effect=NotImplementedError)
+    def test_default_threads_single_core(self, cpu_count):
+        self.assertEqual(encoders.default_threads(), 1)
+
+    def test_theora_has_no_threads(self):
+        profile = TheoraProfile(speed=2, rate_control='quality', quality=48)
+        self.assertEqual(profile.properties(), [('speed-level', 2), ('bitrate', 0), ('quality', 48)])
+
+    def test_keyframe_interval(self):
+        self.assertIn(('key-int-max', 60), X264Profile(keyframe_interval=60).properties())
+        self.assertNotIn('key-int-max', dict(X264Profile().properties()))
+
+    def test_x264_rate_control(self):
+        properties = dict(X264Profile(threads=4, speed='veryfast', bitrate=3000).properties())
+        self.assertEqual(properties, {'threads': 4, 'speed-preset': 'veryfast', 'pass': 'cbr', 'bitrate': 3000})
+
+        properties = dict(X264Profile(threads=4, rate_control='quality', quality=21).properties())
+        self.assertEqual(properties, {'threads': 4, 'pass': 'qual', 'quantizer': 21})
+
+    def test_x264_tune(self):
+        self.assertIn(('tune', 'zerolatency'), X264Profile(tune='zerolatency').properties())
+        self.assertNotIn('tune', dict(X264Profile().properties()))
+
+    def test_vp8(self):
+        properties = dict(VP8Profile(threads=7, bitrate=2400).properties())
+        self.assertEqual(properties['bitrate'], 2400000)
+        self.assertEqual(properties['mode'], VP8Profile.MODE_CBR)
+        self.assertEqual(properties['token-partitions'], 2)
+        self.assertEqual(dict(VP8Profile(threads=1).properties())['token-partitions'], 0)
+
+    def test_set_bitrate(self):
+        encoder = Encoder('bitrate')
+        VP8Profile(threads=1).set_bitrate(encoder, 800)
+        self.assertEqual(encoder.props['bitrate'], 800000)
+
+    def test_apply_skips_missing_properties(self):
+        encoder = Encoder('threads', 'speed', 'mode', 'bitrate')
+        VP8Profile(threads=4, speed=2).apply(encoder)
+        self.assertEqual(encoder.props, {'threads': 4, 'speed': 2, 'mode': VP8Profile.MODE_CBR, 'bitrate': 2400000})
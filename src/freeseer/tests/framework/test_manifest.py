@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from freeseer.framework.manifest import RecordingManifest
+
+
+class TestRecordingManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.video_dir = tempfile.mkdtemp()
+        self.manifest = RecordingManifest(os.path.join(self.video_dir, 'talk.ogg.manifest'), {'title': 'Talk'})
+
+    def tearDown(self):
+        shutil.rmtree(self.video_dir)
+
+    def record(self, filename, data='data'):
+        file_path = os.path.join(self.video_dir, filename)
+        with open(file_path, 'w') as video_fd:
+            video_fd.write(data)
+        return file_path
+
+    def load(self):
+        with open(self.manifest.path) as manifest_fd:
+            return json.load(manifest_fd)
+
+    def test_segments_are_saved(self):
+        first = self.record('talk.ogg')
+        self.manifest.add_segment(first)
+        self.manifest.add_segment(self.record('talk-0.ogg'))
+        self.manifest.finish_segment(first)
+
+        manifest = self.load()
+        self.assertEqual(manifest['metadata'], {'title': 'Talk'})
+        self.assertEqual([(segment['filename'], segment['complete']) for segment in manifest['segments']],
+                         [('talk.ogg', True), ('talk-0.ogg', False)])
+        self.assertFalse(os.path.exists(self.manifest.path + '.tmp'))
+
+    def test_removed_segment_is_dropped(self):
+        self.manifest.add_segment(self.record('talk.ogg'))
+        self.manifest.add_segment(os.path.join(self.video_dir, 'talk-0.ogg'))
+        self.manifest.finish_segment(os.path.join(self.video_dir, 'talk-0.ogg'))
+        self.assertEqual([segment['filename'] for segment in self.load()['segments']], ['talk.ogg'])
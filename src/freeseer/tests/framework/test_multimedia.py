@@ -22,20 +22,80 @@
 # For support, questions, suggestions or any other inquiries, visit:
 # http://wiki.github.com/Freeseer/freeseer/
 
+import os
 import shutil
+import socket
 import tempfile
+import threading
+import time
 import unittest
 
+from mock import Mock
+import gobject
 import pygst
 pygst.require("0.10")
 import gst
 
+from freeseer.framework.bitrate import BitrateController
+from freeseer.framework.buffering import StreamGuard
 from freeseer.framework.config.profile import ProfileManager
 from freeseer.framework.multimedia import Multimedia
 from freeseer.framework.plugin import PluginManager
 from freeseer import settings
 
 
+class IcecastStandIn(object):
+    """Local stand-in for an Icecast server, accepting sources and counting the bytes they send.
+
+    drop() closes the server and its connections like a server going down, start() with the same port brings it back.
+    """
+
+    def __init__(self):
+        self.port = 0
+        self.connections = 0
+        self.received = 0
+        self._sockets = []
+
+    def start(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(('127.0.0.1', self.port))
+        server.listen(1)
+        self.port = server.getsockname()[1]
+        self.received = 0
+        self._sockets.append(server)
+        thread = threading.Thread(target=self._serve, args=(server,))
+        thread.daemon = True
+        thread.start()
+
+    def drop(self):
+        for sock in self._sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+            sock.close()
+        self._sockets = []
+
+    def _serve(self, server):
+        try:
+            while True:
+                connection = server.accept()[0]
+                self._sockets.append(connection)
+                self.connections += 1
+                chunk = request = connection.recv(4096)
+                while chunk and '\r\n\r\n' not in request:
+                    chunk = connection.recv(4096)
+                    request += chunk
+                connection.sendall('HTTP/1.0 200 OK\r\n\r\n')
+                data = connection.recv(65536)
+                while data:
+                    self.received += len(data)
+                    data = connection.recv(65536)
+        except socket.error:
+            pass
+
+
 class TestMultimedia(unittest.TestCase):
 
     def setUp(self):
@@ -51,6 +111,15 @@ class TestMultimedia(unittest.TestCase):
         shutil.rmtree(self.temp_video_dir)
         shutil.rmtree(self.profile_manager._base_folder)
 
+    def iterate_until(self, condition, timeout=15):
+        """Runs the gobject main context until condition() is true, failing after timeout seconds."""
+        context = gobject.main_context_default()
+        deadline = time.time() + timeout
+        while not condition():
+            self.assertLess(time.time(), deadline)
+            context.iteration(False)
+            time.sleep(0.01)
+
     def test_load_backend(self):
         self.multimedia.load_backend(filename=u"test.ogg")
 
@@ -75,3 +144,203 @@ class TestMultimedia(unittest.TestCase):
         self.multimedia.stop()
         self.assertNotEqual(self.multimedia.current_state, self.multimedia.STOP)
         self.assertEqual(self.multimedia.player.get_state()[1], gst.STATE_NULL)
+
+    def test_preroll_keeps_sources_running(self):
+        self.multimedia.config.preroll = True
+        self.multimedia.load_backend(filename=u"test.ogg")
+        self.multimedia.record()
+        self.multimedia.stop()
+        self.assertEqual(self.multimedia.current_state, self.multimedia.STOP)
+        self.assertTrue(self.multimedia.prerolled)
+        self.assertEqual(self.multimedia.player.get_state()[1], gst.STATE_PLAYING)
+
+        self.multimedia.load_backend(filename=u"test2.ogg")
+        self.assertTrue(self.multimedia.pending_outputs)
+        self.multimedia.record()
+        self.assertFalse(self.multimedia.pending_outputs)
+        self.assertEqual(self.multimedia.current_state, self.multimedia.RECORD)
+
+        self.multimedia.shutdown()
+        self.assertFalse(self.multimedia.prerolled)
+        self.assertEqual(self.multimedia.player.get_state()[1], gst.STATE_NULL)
+
+    def test_shutdown_waits_for_detached_outputs(self):
+        self.multimedia.config.preroll = True
+        self.multimedia.load_backend(filename=u"test.ogg")
+        self.multimedia.record()
+        self.multimedia.stop()
+        self.multimedia.shutdown()
+        self.assertEqual(self.multimedia.detaching_outputs, set())
+        self.assertEqual(self.multimedia.player.get_state()[1], gst.STATE_NULL)
+
+    def test_add_output_before_load_backend(self):
+        self.assertFalse(self.multimedia.add_output("Video Preview"))
+        self.assertEqual(self.multimedia.output_names, {})
+
+    def test_add_remove_output(self):
+        self.multimedia.load_backend(filename=u"test.ogg")
+        self.multimedia.record()
+
+        self.assertTrue(self.multimedia.remove_output("Video Preview"))
+        self.assertNotIn("Video Preview", self.multimedia.output_names)
+        self.assertFalse(self.multimedia.remove_output("Video Preview"))
+        self.assertIn("Ogg Output", self.multimedia.output_names)
+
+        self.assertTrue(self.multimedia.add_output("Video Preview"))
+        self.assertIn("Video Preview", self.multimedia.output_names)
+        self.assertFalse(self.multimedia.add_output("Video Preview"))
+        self.multimedia.stop()
+
+    def test_next_segment(self):
+        self.multimedia.config.segment_duration = 30
+        self.multimedia.load_backend(filename=u"test")
+        self.multimedia.record()
+        first_file_path = self.multimedia.file_path
+        self.assertTrue(os.path.exists(first_file_path + '.manifest'))
+
+        self.assertTrue(self.multimedia.next_segment())
+        self.assertEqual(os.path.basename(first_file_path), 'test.ogg')
+        self.assertEqual(os.path.basename(self.multimedia.file_path), 'test-0.ogg')
+        self.assertEqual(len(self.multimedia.manifest.segments), 2)
+        self.assertEqual(len(self.multimedia.file_outputs), 1)
+        self.multimedia.stop()
+
+    def test_share_encoders(self):
+        self.multimedia.config.share_encoders = True
+        self.multimedia.config.record_to_stream = True
+        self.multimedia.config.record_to_stream_plugin = "Ogg Icecast"
+        # The default file and Icecast configurations encode with the same settings
+        self.multimedia.load_backend(filename=u"test.ogg")
+        self.assertEqual([factory for factory, properties in self.multimedia.video_encoders], ['theoraenc'])
+
+        queue, codec, tee = self.multimedia.video_encoders.values()[0]
+        self.assertEqual(len([pad for pad in tee.src_pads() if pad.is_linked()]), 2)
+        self.assertEqual(queue.get_property('max-size-time'), 2 * gst.SECOND)
+        # The stream drops raw video in front of the encoder, never encoded video in its own queue
+        self.assertEqual(int(queue.get_property('leaky')), 2)
+        bin = self.multimedia.output_names["Ogg Icecast"]
+        self.assertEqual(int(bin.get_by_name('videoqueue').get_property('leaky')), 0)
+        self.assertEqual(int(bin.get_by_name('audioqueue').get_property('leaky')), 2)
+
+        self.multimedia.unload_output_plugins()
+        self.assertEqual(self.multimedia.video_encoders, {})
+
+    def test_share_encoders_with_same_settings(self):
+        self.multimedia.config.share_encoders = True
+        self.multimedia.config.record_to_stream = True
+        self.multimedia.config.record_to_stream_plugin = "Ogg Icecast"
+        stream = self.multimedia.plugman.get_plugin_by_name("Ogg Icecast", "Output").plugin_object
+        stream.load_config(self.multimedia.plugman)
+        stream.config.video_rate_control = 'quality'
+        stream.config.save()
+        # The stream encodes for a quality and the file for a bitrate
+        self.multimedia.load_backend(filename=u"test.ogg")
+        self.assertEqual([factory for factory, properties in self.multimedia.video_encoders], ['theoraenc'] * 2)
+        for queue, codec, tee in self.multimedia.video_encoders.values():
+            self.assertEqual(len([pad for pad in tee.src_pads() if pad.is_linked()]), 1)
+
+    def test_buffer_policy(self):
+        self.multimedia.load_backend(filename=u"test.ogg")
+        queue = self.multimedia.output_names["Ogg Output"].get_by_name('videoqueue')
+        self.assertEqual(queue.get_property('max-size-time'), 2 * gst.SECOND)
+        self.assertEqual(queue.get_property('max-size-buffers'), 0)
+        self.assertEqual(int(queue.get_property('leaky')), 0)
+
+        plugman = self.multimedia.plugman
+        stream = plugman.get_plugin_by_name("Ogg Icecast", "Output").plugin_object
+        self.assertEqual(self.multimedia.get_buffer_policy(stream).leaky, 'downstream')
+        preview = plugman.get_plugin_by_name("Video Preview", "Output").plugin_object
+        self.assertIsNone(self.multimedia.get_buffer_policy(preview))
+
+    def test_stream_buffer(self):
+        self.multimedia.config.record_to_stream = True
+        self.multimedia.config.record_to_stream_plugin = "Ogg Icecast"
+        self.multimedia.load_backend(filename=u"test.ogg")
+
+        bin = self.multimedia.output_names["Ogg Icecast"]
+        guards = [element for element in bin.recurse() if isinstance(element, StreamGuard)]
+        self.assertEqual(len(guards), 1)
+        self.assertEqual(guards[0].get_pad('src').get_peer().get_parent_element(), bin.get_by_name('icecast'))
+        self.assertIn(guards[0], self.multimedia.stream_guards)
+
+        self.multimedia.unload_output_plugins()
+        self.assertEqual(self.multimedia.stream_guards, {})
+
+    def test_stream_reconnects_without_interrupting_file(self):
+        server = IcecastStandIn()
+        server.start()
+        self.addCleanup(server.drop)
+        self.multimedia.config.record_to_stream = True
+        self.multimedia.config.record_to_stream_plugin = "Ogg Icecast"
+        stream = self.multimedia.plugman.get_plugin_by_name("Ogg Icecast", "Output").plugin_object
+        stream.load_config(self.multimedia.plugman)
+        stream.config.ip = '127.0.0.1'
+        stream.config.port = server.port
+        stream.config.save()
+
+        self.multimedia.load_backend(filename=u"test.ogg")
+        self.multimedia.record()
+        guard = self.multimedia.stream_guards.keys()[0]
+        self.iterate_until(lambda: server.received > 0)
+
+        server.drop()
+        self.iterate_until(lambda: not guard.connected)
+        file_size = os.path.getsize(self.multimedia.file_path)
+
+        server.start()
+        self.iterate_until(lambda: guard.connected and server.received > 0)
+        self.assertEqual(server.connections, 2)
+        self.assertEqual(self.multimedia.current_state, self.multimedia.RECORD)
+        self.iterate_until(lambda: os.path.getsize(self.multimedia.file_path) > file_size)
+        self.multimedia.stop()
+
+    def test_bitrate_follows_stream_buffer(self):
+        # A slow connection fills the stream buffer before the sink while the queues before it stay empty
+        buffer = Mock()
+        buffer.get_factory.return_value.get_name.return_value = 'queue2'
+        buffer.get_property.return_value = self.multimedia.config.stream_buffer_time * gst.SECOND
+        self.multimedia.output_names["Ogg Icecast"] = Mock(recurse=Mock(return_value=[buffer]))
+        self.assertEqual(self.multimedia.get_output_fill("Ogg Icecast"), 1.0)
+
+        bitrates = []
+        controller = BitrateController(lambda: self.multimedia.get_output_fill("Ogg Icecast"), bitrates.append,
+                                       None, 200, 1000)
+        controller.check(controller.get_fill())
+        self.assertEqual(bitrates, [750])
+
+    def test_get_health(self):
+        self.multimedia.load_backend(filename=u"test.ogg")
+        self.multimedia.record()
+        health = self.multimedia.get_health()
+        self.assertTrue(health['queues'])
+        for counters in health['queues'].values():
+            self.assertTrue(0 <= counters['fill'] <= 1)
+        self.multimedia.stop()
+
+    def test_monitor_follows_outputs(self):
+        self.multimedia.load_backend(filename=u"test.ogg")
+        self.multimedia.monitor.start()
+        bin = self.multimedia.output_names["Ogg Output"]
+        queues = [element for element in bin.recurse() if element.get_factory().get_name() == 'queue']
+        self.assertTrue(queues)
+        for queue in queues:
+            self.assertIn(queue, self.multimedia.monitor._handlers)
+
+        self.multimedia.release_output(bin)
+        for queue in queues:
+            self.assertNotIn(queue, self.multimedia.monitor._handlers)
+        self.multimedia.monitor.stop()
+        self.assertEqual(self.multimedia.monitor._overruns, {})
+
+    def test_level_message(self):
+        percents = []
+        self.multimedia.set_audio_feedback_handler(percents.append)
+        self.assertTrue(self.multimedia.audio_level.get_property('message'))
+
+        structure = gst.Structure('level')
+        structure['rms'] = [-20.0, -10.0]
+        structure['peak'] = [-5.0, -2.0]
+        self.multimedia.on_message(None, gst.message_new_element(self.multimedia.audio_level, structure))
+
+        self.assertEqual(percents, [80])
+        self.assertEqual(self.multimedia.audio_levels, {'rms': [-20.0, -10.0], 'peak': [-5.0, -2.0]})
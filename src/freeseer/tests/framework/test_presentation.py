@@ -58,3 +58,7 @@ class TestPresentation(unittest.TestCase):
 
     def test_room_is_default(self):
         self.assertTrue(self.pres.room == "Default")
+
+    def test_fields_are_slots(self):
+        self.assertFalse(hasattr(self.pres, '__dict__'))
+        self.assertRaises(AttributeError, setattr, self.pres, 'not_a_field', 1)
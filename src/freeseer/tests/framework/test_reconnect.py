@@ -0,0 +1,73 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import unittest
+
+from mock import Mock
+from mock import patch
+
+from freeseer.framework.reconnect import StreamReconnector
+
+
+class TestStreamReconnector(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000
+        self.reconnector = StreamReconnector(clock=lambda: self.now)
+        self.reconnect = Mock()
+
+        patcher = patch('freeseer.framework.reconnect.gobject')
+        self.gobject = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_timeout(self):
+        """Runs the last scheduled reconnection and returns the number of seconds it waited for."""
+        seconds, callback, reconnect = self.gobject.timeout_add_seconds.call_args[0]
+        self.now += seconds
+        self.assertFalse(callback(reconnect))
+        return seconds
+
+    def test_delay_doubles_while_failing(self):
+        delays = []
+        for attempt in range(8):
+            self.reconnector.failed(self.reconnect)
+            delays.append(self.run_timeout())
+        self.assertEqual(delays, [1, 2, 4, 8, 16, 32, 60, 60])
+        self.assertEqual(self.reconnect.call_count, 8)
+
+    def test_delay_resets_after_stable_connection(self):
+        for attempt in range(4):
+            self.reconnector.failed(self.reconnect)
+            self.run_timeout()
+
+        self.now += StreamReconnector.MAX_DELAY + 1
+        self.assertEqual(self.reconnector.failed(self.reconnect), 1)
+
+    def test_stop_cancels_reconnection(self):
+        self.gobject.timeout_add_seconds.return_value = 42
+        self.reconnector.failed(self.reconnect)
+        self.reconnector.stop()
+        self.gobject.source_remove.assert_called_once_with(42)
+        self.reconnector.stop()
+        self.assertEqual(self.gobject.source_remove.call_count, 1)
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+# Copyright (C) 2014 Free and Open Source Software Learning Centre
+# http://fosslc.org
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import unittest
+
+from freeseer.framework.schedule import ScheduleIndex
+from freeseer.framework.schedule import time_to_seconds
+
+
+class TestScheduleIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.schedule = ScheduleIndex()
+        self.schedule.add(1, "SC2011", "T105", "2011-08-14", "13:00", "14:00", "Andrew Ross - Managing map data")
+        self.schedule.add(2, "SC2011", "T105", "2011-08-14", "10:00", "11:00", "David Maxwell - Building NetBSD")
+        self.schedule.add(3, "SC2011", "T106", "2011-08-13", "09:00", "10:00", "Jane Doe - Keynote")
+        self.schedule.add(4, "SC2010", "T105", "2010-08-14", "09:00", "10:00", "John Doe - Keynote")
+
+    def test_lists_are_sorted(self):
+        self.assertEqual(self.schedule.events(), ["SC2010", "SC2011"])
+        self.assertEqual(self.schedule.rooms("SC2011"), ["T105", "T106"])
+        self.assertEqual(self.schedule.dates("SC2011", "T105"), ["2011-08-14"])
+
+    def test_talks_sorted_by_start_time(self):
+        self.assertEqual(self.schedule.talks("SC2011", "T105", "2011-08-14"),
+                         [("David Maxwell - Building NetBSD", "2"), ("Andrew Ross - Managing map data", "1")])
+
+    def test_add_replaces_talk(self):
+        self.schedule.add(2, "SC2011", "T106", "2011-08-13", "08:00", "09:00", "David Maxwell - Building NetBSD")
+        self.assertEqual(self.schedule.talks("SC2011", "T105"), [("Andrew Ross - Managing map data", "1")])
+        self.assertEqual(self.schedule.talks("SC2011", "T106")[0], ("David Maxwell - Building NetBSD", "2"))
+
+    def test_remove_drops_empty_levels(self):
+        self.schedule.remove(4)
+        self.assertEqual(self.schedule.events(), ["SC2011"])
+        self.schedule.remove(4)  # Removing an unknown talk does nothing
+
+    def test_unknown_keys_are_empty(self):
+        self.assertEqual(self.schedule.rooms("Unknown"), [])
+        self.assertEqual(self.schedule.talks("SC2011", "Unknown"), [])
+
+    def test_next_talk_skips_started_talks(self):
+        self.assertEqual(self.schedule.next_talk("T105", "2011-08-14", 0), ("2", 36000, 39600))
+        self.assertEqual(self.schedule.next_talk("T105", "2011-08-14", 36000), ("2", 36000, 39600))
+        self.assertEqual(self.schedule.next_talk("T105", "2011-08-14", 36001), ("1", 46800, 50400))
+        self.assertEqual(self.schedule.next_talk("T105", "2011-08-14", 46801), None)
+        self.assertEqual(self.schedule.next_talk("T105", "2011-08-15", 0), None)
+
+    def test_next_talk_follows_room_across_events(self):
+        self.schedule.add(5, "Other", "T105", "2011-08-14", "11:30", "", "Jane Doe - Lightning talks")
+        self.assertEqual(self.schedule.next_talk("T105", "2011-08-14", 36001), ("5", 41400, 41400))
+        self.assertEqual(self.schedule.next_talk("T105", "2011-08-14", 36001, "SC2011"), ("1", 46800, 50400))
+        self.schedule.remove(5)
+        self.assertEqual(self.schedule.next_talk("T105", "2011-08-14", 36001), ("1", 46800, 50400))
+
+    def test_time_to_seconds(self):
+        self.assertEqual(time_to_seconds("10:30"), 37800)
+        self.assertEqual(time_to_seconds("10:30:15"), 37815)
+        self.assertEqual(time_to_seconds(""), None)
+        self.assertEqual(time_to_seconds("25:00"), None)
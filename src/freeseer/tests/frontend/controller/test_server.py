@@ -50,6 +50,9 @@ class MockMedia:
     def stop(self):
         self.num_times_stop_called += 1
 
+    def get_health(self):
+        return {'queues': {}, 'videorates': {}, 'latency': None}
+
 
 class TestServerApp:
     '''
@@ -149,6 +152,17 @@ class TestServerApp:
             'status': 'NULL',
         }
 
+    def test_get_recording_health(self, test_client, mock_media_dict):
+        '''
+        Tests GET request of the pipeline health of a recording
+        '''
+        response = test_client.get('/recordings/1/health')
+        assert response.status_code == 200
+        assert json.loads(response.data) == {'queues': {}, 'videorates': {}, 'latency': None}
+
+        response = test_client.get('/recordings/3/health')
+        assert response.status_code == 404
+
     def test_get_invalid_recording_id(self, test_client, mock_media_dict):
         '''
         Tests GET request with an invalid id (a non integer id)
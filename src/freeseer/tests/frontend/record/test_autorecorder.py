@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import unittest
+
+from mock import Mock
+from mock import patch
+from PyQt4.QtCore import QDateTime
+from PyQt4.QtCore import QTime
+
+from freeseer.frontend.record.AutoRecorder import AutoRecorder
+
+
+class TestAutoRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = Mock()
+        self.controller.record_talk_id.return_value = True
+        self.db = Mock()
+        self.recorder = AutoRecorder(self.controller, self.db, "T105", "SC2011")
+
+        patcher = patch('freeseer.frontend.record.AutoRecorder.gobject.timeout_add_seconds')
+        self.timeout_add_seconds = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_timeout(self):
+        """Runs the last scheduled timeout and returns the number of seconds it waited for."""
+        seconds, callback = self.timeout_add_seconds.call_args[0]
+        self.assertFalse(callback())
+        return seconds
+
+    def test_records_next_talk(self):
+        now = QDateTime.currentDateTime()
+        start, end = now.time().addSecs(60), now.time().addSecs(120)
+        self.db.get_next_talk_by_room.side_effect = [(u'2', start, end), None]
+
+        self.recorder.start()
+        self.assertEqual(self.db.get_next_talk_by_room.call_args[0][0], "T105")
+        self.assertEqual(self.db.get_next_talk_by_room.call_args[0][2], "SC2011")
+        self.assertIn(self.run_timeout(), (60, 61))
+        self.controller.record_talk_id.assert_called_once_with(u'2')
+        self.assertTrue(self.recorder.recording)
+
+        self.assertEqual(self.run_timeout(), 61)
+        self.controller.stop.assert_called_once_with()
+        self.assertFalse(self.recorder.recording)
+
+    def test_records_adjacent_talks(self):
+        now = QDateTime.currentDateTime()
+        start, end = now.time().addSecs(60), now.time().addSecs(120)
+        # Looked up from the end of the first talk, the second talk has already started
+        self.db.get_next_talk_by_room.side_effect = [(u'2', start, end),
+                                                     (u'3', now.time().addSecs(-5), now.time().addSecs(60)),
+                                                     None]
+
+        self.recorder.start()
+        self.run_timeout()
+        self.run_timeout()
+        after = self.db.get_next_talk_by_room.call_args_list[1][0][1]
+        self.assertEqual(after, QDateTime(now.date(), end))
+
+        self.assertEqual(self.controller.record_talk_id.call_args_list, [((u'2',), {}), ((u'3',), {})])
+        self.assertTrue(self.recorder.recording)
+        self.assertIn(self.run_timeout(), (60, 61))
+        self.assertEqual(self.controller.stop.call_count, 2)
+
+    def test_skips_ended_talks(self):
+        now = QDateTime.currentDateTime()
+        start, end = now.time().addSecs(60), now.time().addSecs(120)
+        self.db.get_next_talk_by_room.side_effect = [(u'2', now.time().addSecs(-120), now.time().addSecs(-60)),
+                                                     (u'3', start, end),
+                                                     None]
+
+        self.recorder._schedule_next_talk(now.addSecs(-180))
+        after = self.db.get_next_talk_by_room.call_args_list[1][0][1]
+        self.assertTrue(after.secsTo(QDateTime.currentDateTime()) in (0, 1))
+        self.assertFalse(self.controller.record_talk_id.called)
+
+        self.assertIn(self.run_timeout(), (60, 61))
+        self.controller.record_talk_id.assert_called_once_with(u'3')
+
+    def test_waits_for_next_day(self):
+        self.db.get_next_talk_by_room.return_value = None
+
+        self.recorder.start()
+        self.run_timeout()
+        self.db.invalidate_schedule.assert_called_once_with()
+        self.assertFalse(self.controller.record_talk_id.called)
+
+    def test_stop_cancels_and_stops_recording(self):
+        self.db.get_next_talk_by_room.return_value = (u'2', QTime.currentTime(), QTime.currentTime().addSecs(60))
+
+        self.recorder.start()
+        self.run_timeout()
+        with patch('freeseer.frontend.record.AutoRecorder.gobject.source_remove') as source_remove:
+            self.recorder.stop()
+            source_remove.assert_called_once_with(self.timeout_add_seconds.return_value)
+        self.controller.stop.assert_called_once_with()
@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# freeseer - vga/presentation capture software
+#
+#  Copyright (C) 2014  Free and Open Source Software Learning Centre
+#  http://fosslc.org
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# For support, questions, suggestions or any other inquiries, visit:
+# http://wiki.github.com/Freeseer/freeseer/
+
+import unittest
+
+from mock import Mock
+from mock import patch
+
+from freeseer.frontend.record.RecordingController import RecordingController
+
+
+class TestRecordingController(unittest.TestCase):
+
+    def setUp(self):
+        with patch('freeseer.frontend.record.RecordingController.PluginManager'), \
+                patch('freeseer.frontend.record.RecordingController.Multimedia'):
+            self.controller = RecordingController(Mock(), Mock(), Mock())
+        self.media = self.controller.media
+
+    def test_record_talk_id(self):
+        self.media.load_backend.return_value = (True, u'talk.ogg')
+        self.assertTrue(self.controller.record_talk_id(u'2'))
+        self.controller.db.get_presentation.assert_called_once_with(u'2')
+        self.media.record.assert_called_once_with()
+
+    def test_record_talk_id_fails_to_load(self):
+        self.media.load_backend.return_value = False
+        self.assertFalse(self.controller.record_talk_id(u'2'))
+        self.assertFalse(self.media.record.called)
+
+    def test_record_filename_fails_to_load(self):
+        self.media.load_backend.return_value = False
+        self.assertFalse(self.controller.record_filename(u'talk.ogg'))
+        self.assertFalse(self.media.record.called)
+        self.assertEqual(self.controller.load_backend(), (False, None))